@@ -1,17 +1,53 @@
 import os
+import json
 from functools import wraps
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from flask import (
     Flask, render_template, redirect, url_for,
-    session, flash, request, jsonify
+    session, flash, request, jsonify, g,
+    Response, make_response, stream_with_context
 )
-from flask_session import Session
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.http import is_resource_modified
 import oracledb
 
 from config import config
+from session_store import init_session
+from templating import init_templating, fragment_cache
+from metrics import request_metrics, query_budget
 from database.connection import get_db_connection, db
+from database.roles import roles
+from database.dashboard import dashboard_stats
+from database.system_stats import load_system_stats
+from database.pagination import fetch_page, fetch_list_page, estimate_count, page_json, ListParams
+from database.assets import parse_asset_upload, bulk_insert_assets, AssetImportError, ASSET_IMPORT_FIELDS
+from database.allocations import normalize_allocations, allocation_totals, allocation_params, load_allocations
+from database.holidays import business_calendar
+from database.slow_queries import slow_queries
+from database.statements import (
+    statements, USER_LOGIN, USER_EMAIL_TAKEN, USER_INSERT, USER_ADMIN_LIST, WILL_INSERT,
+    WILL_OWNED_STATUS, ASSET_ADD, ASSET_BY_ID, ASSET_ALLOCATED_PERCENT, ASSET_ALLOCATIONS,
+    ASSET_BENEFICIARIES, ALLOCATION_SAMPLE, BENEFICIARY_CHOICES, BENEFICIARY_INSERT,
+    BENEFICIARY_MY_ASSETS, BENEFICIARY_ASSETS, EXECUTOR_COUNT, EXECUTOR_INSERT, HEALTH_PING
+)
+from database.transfers import (
+    WILL_ACCESS, pending_transfers, execute_params, transfer_results,
+    TRANSFER_LIST_SQL, TRANSFER_COLUMNS, TRANSFER_INVOLVED_CLAUSE, TRANSFER_SORTS, TRANSFER_SEARCH_COLUMNS,
+    Transfer
+)
+from database.wills import (
+    WILL_PAGE_SQL, WILL_COLUMNS, WILL_SORTS, WILL_SEARCH_COLUMNS, WillSummary, attach_will_counts,
+    will_loader
+)
+from database.beneficiaries import (
+    BENEFICIARY_PAGE_SQL, BENEFICIARY_COLUMNS, BENEFICIARY_SORTS, BENEFICIARY_SEARCH_COLUMNS,
+    BeneficiarySummary, attach_beneficiary_totals
+)
+from database.audit import (
+    AUDIT_SELECT_SQL, AUDIT_FILTERS, EXPORT_FILTERS, EXPORT_FORMATS,
+    AuditEntry, audit_filter_clauses, audit_row_key, stream_audit_rows, audit
+)
 
 def create_app():
     env = os.getenv('FLASK_ENV', 'default')
@@ -20,9 +56,13 @@ def create_app():
     
     # Ensure upload folder exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
     
-    Session(app)
+    init_session(app)
+    db.init_app(app)
+    audit.init_app(app)
+    request_metrics.init_app(app, db)
+    slow_queries.init_app(app, request_metrics)
+    init_templating(app)
 
     # ─── Decorators ──────────────────────────────
     def login_required(f):
@@ -31,9 +71,25 @@ def create_app():
             if 'user_id' not in session:
                 flash('Please log in first.', 'warning')
                 return redirect(url_for('login'))
+            version = roles.version(session['user_id'])
+            if version is not None and version != session.get('role_version'):
+                refresh_session_roles(version)
             return f(*args, **kwargs)
         return wrapped
 
+    def refresh_session_roles(version):
+        """Re-resolve the signed-in user's roles after their role version moved"""
+        try:
+            primary_role, all_roles, role_version = roles.resolve(
+                session['user_id'], session.get('user_email'), version=version, strict=True)
+        except oracledb.Error as err:
+            print(f"Keeping session roles, refresh failed: {err}")
+            return
+        session['all_roles'] = all_roles
+        if session.get('user_role') not in all_roles:
+            session['user_role'] = primary_role
+        session['role_version'] = role_version
+
     def role_required(roles):
         def deco(f):
             @wraps(f)
@@ -51,84 +107,69 @@ def create_app():
             return wrapped
         return deco
 
-    # ─── Helper Functions ────────────────────────
-    def determine_user_role(user_id, email):
-        """Determine user role based on their presence in different tables"""
-        try:
-            with db.get_cursor() as cur:
-                # First check if user has an initial_role set during registration
-                cur.execute("SELECT initial_role FROM users WHERE user_id = :user_id", {'user_id': user_id})
-                initial_role_result = cur.fetchone()
-                initial_role = initial_role_result[0] if initial_role_result else None
-                
-                # If they registered as admin, they remain admin
-                if initial_role == 'admin':
-                    return 'admin'
-                
-                # Check if user owns any wills (testator)
-                cur.execute("SELECT COUNT(*) FROM wills WHERE user_id = :user_id", {'user_id': user_id})
-                will_count = cur.fetchone()[0]
-                
-                # Check if user is an executor
-                cur.execute("SELECT COUNT(*) FROM executors WHERE email = :email", {'email': email})
-                executor_count = cur.fetchone()[0]
-                
-                # Check if user is a beneficiary
-                cur.execute("SELECT COUNT(*) FROM beneficiaries WHERE email = :email", {'email': email})
-                beneficiary_count = cur.fetchone()[0]
-                
-                # Determine primary role (prioritize testator > executor > beneficiary > initial_role)
-                if will_count > 0:
-                    return 'testator'
-                elif executor_count > 0:
-                    return 'executor'
-                elif beneficiary_count > 0:
-                    return 'beneficiary'
-                elif initial_role:
-                    return initial_role  # Use their registered role
-                else:
-                    return 'user'  # Default role for users without specific assignments
-        except Exception as e:
-            print(f"Error determining user role: {e}")
-            return 'user'  # Default fallback role
+    def current_will_version():
+        """Cache version of the will probed by ``conditional_on_will``, if any"""
+        version = g.get('will_version')
+        return version.key if version is not None else None
 
-    def get_user_roles(user_id, email):
-        """Get all roles a user has (they might have multiple roles)"""
-        roles = []
-        try:
-            with db.get_cursor() as cur:
-                # Check initial role from registration
-                cur.execute("SELECT initial_role FROM users WHERE user_id = :user_id", {'user_id': user_id})
-                initial_role_result = cur.fetchone()
-                initial_role = initial_role_result[0] if initial_role_result else None
-                
-                if initial_role == 'admin':
-                    roles.append('admin')
-                
-                # Check testator role
-                cur.execute("SELECT COUNT(*) FROM wills WHERE user_id = :user_id", {'user_id': user_id})
-                if cur.fetchone()[0] > 0:
-                    roles.append('testator')
-                
-                # Check executor role
-                cur.execute("SELECT COUNT(*) FROM executors WHERE email = :email", {'email': email})
-                if cur.fetchone()[0] > 0:
-                    roles.append('executor')
-                
-                # Check beneficiary role
-                cur.execute("SELECT COUNT(*) FROM beneficiaries WHERE email = :email", {'email': email})
-                if cur.fetchone()[0] > 0:
-                    roles.append('beneficiary')
-                
-                # If no specific roles found, use initial role
-                if not roles and initial_role:
-                    roles.append(initial_role)
-                    
-        except Exception as e:
-            print(f"Error getting user roles: {e}")
-        
-        return roles if roles else ['user']
+    def conditional_on_will(f=None, calendar=False):
+        """Answer conditional GETs of a will view from its version probe.
+
+        The view's ``will_id`` (or ``asset_id``) argument is resolved to the
+        will's ``WillVersion`` in one indexed lookup. When the client's
+        ``If-None-Match``/``If-Modified-Since`` still matches, a 304 is
+        returned without running the view; otherwise the view's 200 response
+        gets the ETag and Last-Modified of that version. Missing wills and
+        viewers without access fall through to the view's own handling.
 
+        The ETag also covers the viewer's role and role version, so a
+        page rendered before a role change is not kept by a 304.
+
+        Views showing whether transfers are allowed today pass
+        ``calendar=True``: their ETag also covers the date and the holidays
+        version, so a 304 never keeps yesterday's eligibility.
+        """
+        if f is None:
+            return lambda f: conditional_on_will(f, calendar=calendar)
+
+        @wraps(f)
+        def wrapped(**kwargs):
+            # A pending flash message must reach the page
+            if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                return f(**kwargs)
+            try:
+                version = will_loader.probe(session.get('user_email'),
+                                            will_id=kwargs.get('will_id'),
+                                            asset_id=kwargs.get('asset_id'))
+            except oracledb.Error:
+                return f(**kwargs)
+            if version is None or not version.can_view(session.get('user_id'),
+                                                       session.get('all_roles', [])):
+                return f(**kwargs)
+            
+            # The page shows the viewer's roles (navigation, role-gated actions)
+            variant = (request.endpoint, session.get('user_id'), session.get('user_role'),
+                       session.get('role_version'))
+            if calendar:
+                variant += business_calendar.state(datetime.now())
+            etag = version.etag(*variant)
+            last_modified = version.last_updated_at.astimezone(timezone.utc) if version.last_updated_at else None
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = Response(status=304)
+            else:
+                g.will_version = version
+                response = make_response(f(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            # Browsers must revalidate; the page depends on who is signed in
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapped
+
+    # ─── Helper Functions ────────────────────────
     def safe_execute_procedure(cursor, proc_name, params):
         """Safely execute stored procedures with enhanced error handling"""
         try:
@@ -161,7 +202,7 @@ def create_app():
                 return False, "❌ Invalid Data: The specified record does not exist in the system."
             elif error_code == 21003:
                 return False, "🔒 Cannot Modify: This will has already been executed and cannot be changed."
-            elif error_code == 21004:
+            elif error_code in (21004, 20005):
                 return False, "📊 Allocation Error: Asset allocation cannot exceed 100%. Please adjust the percentages."
             elif error_code in (20091, 20092, 20093, 20094, 20095):
                 return False, f"📋 Will Approval Error: {error_message.split(':', 1)[-1].strip()}"
@@ -172,13 +213,53 @@ def create_app():
                 # For any other database errors, provide a clean generic message
                 return False, f"⚠️ Database Operation Failed: Please try again or contact support if the problem persists."
     
+    def wills_page(cur, params):
+        """Page of the wills the current user may list, or None without access"""
+        user_role = session.get('user_role')
+        all_roles = session.get('all_roles', [])
+        
+        if user_role == 'testator' or 'testator' in all_roles:
+            clauses = ["w.user_id = :user_id_param"]
+            binds = {'user_id_param': session['user_id']}
+        elif user_role == 'executor' or 'executor' in all_roles:
+            clauses = ["w.will_id IN (SELECT will_id FROM executors WHERE email = :exec_email)"]
+            binds = {'exec_email': session['user_email']}
+        elif user_role == 'admin' or 'admin' in all_roles:
+            clauses, binds = [], {}
+        else:
+            return None
+        
+        result = fetch_list_page(cur, WILL_PAGE_SQL, clauses, binds, 'w.will_id', 'will_id',
+                                 params, WILL_SEARCH_COLUMNS, record=WillSummary)
+        result.rows = attach_will_counts(cur, result.rows)
+        return result
+
+    def transfers_page(cur, params):
+        """Page of the transfers the current user is involved with"""
+        if 'admin' in session.get('all_roles', []):
+            clauses, binds = [], {}
+        else:
+            # Executors and testators see transfers of their own wills
+            clauses = [TRANSFER_INVOLVED_CLAUSE]
+            binds = {'exec_email': session['user_email'], 'user_id_param': session['user_id']}
+        return fetch_list_page(cur, TRANSFER_LIST_SQL, clauses, binds, 't.transfer_id', 'transfer_id',
+                               params, TRANSFER_SEARCH_COLUMNS, record=Transfer)
+
+    def beneficiaries_page(cur, params):
+        result = fetch_list_page(cur, BENEFICIARY_PAGE_SQL, [], {}, 'b.beneficiary_id', 'beneficiary_id',
+                                 params, BENEFICIARY_SEARCH_COLUMNS, record=BeneficiarySummary)
+        result.rows = attach_beneficiary_totals(cur, result.rows)
+        return result
+    
     # ─── Routes ───────────────────────────────────────
 
     @app.route('/')
+    @query_budget(0)
     def index():
         return render_template('index.html')
 
     @app.route('/login', methods=['GET','POST'])
+    @query_budget(2)
     def login():
         if request.method == 'POST':
             email = request.form.get('email')
@@ -190,12 +271,7 @@ def create_app():
             
             try:
                 with db.get_cursor() as cur:
-                    cur.execute("""
-                        SELECT user_id, full_name, email, password_hash
-                        FROM users
-                        WHERE email = :user_email
-                    """, {'user_email': email})
-                    row = cur.fetchone()
+                    row = USER_LOGIN.one(cur, {'user_email': email})
                     
                     if row:
                         user_id, full_name, user_email, stored_password = row
@@ -213,24 +289,27 @@ def create_app():
                             password_valid = check_password_hash(stored_password, password)
                         
                         if password_valid:
-                            # Determine user role based on their assignments
-                            primary_role = determine_user_role(user_id, user_email)
-                            all_roles = get_user_roles(user_id, user_email)
+                            # Determine user roles based on their assignments
+                            primary_role, all_roles, role_version = roles.resolve(user_id, user_email)
                             
                             session.update({
                                 'user_id': user_id,
                                 'user_name': full_name,
                                 'user_email': user_email,
                                 'user_role': primary_role,
-                                'all_roles': all_roles  # Store all roles for advanced permissions
+                                'all_roles': all_roles,  # Store all roles for advanced permissions
+                                'role_version': role_version  # Compared with users.role_version per request
                             })
                             session.permanent = True
+                            audit.log('LOGIN', 'USERS', user_id)
                             
                             flash(f'Welcome, {full_name}! Logged in as {primary_role}.', 'success')
                             return redirect(url_for('dashboard'))
                         else:
+                            audit.log('LOGIN', 'USERS', user_id, status='DENIED', user=email)
                             flash('Invalid password.', 'danger')
                     else:
+                        audit.log('LOGIN', 'USERS', status='DENIED', user=email)
                         flash('Invalid email address.', 'danger')
                         
             except oracledb.Error as err:
@@ -239,6 +318,7 @@ def create_app():
         return render_template('login.html')
 
     @app.route('/register', methods=['GET','POST'])
+    @query_budget(2)
     def register():
         if request.method == 'POST':
             full_name = request.form.get('full_name')
@@ -275,8 +355,7 @@ def create_app():
             try:
                 with db.get_cursor() as cur:
                     # Check if email already exists
-                    cur.execute("SELECT COUNT(*) FROM users WHERE email = :user_email", {'user_email': email})
-                    if cur.fetchone()[0] > 0:
+                    if USER_EMAIL_TAKEN.scalar(cur, {'user_email': email}) > 0:
                         flash('Email already registered.', 'warning')
                         return render_template('register.html')
                     
@@ -284,16 +363,7 @@ def create_app():
                     password_hash = generate_password_hash(password)
                     
                     # Insert new user with hashed password and initial role
-                    cur.execute("""
-                        INSERT INTO users (
-                            full_name, email, password_hash, phone_number,
-                            date_of_birth, address, initial_role
-                        ) VALUES (
-                            :user_name, :user_email, :password_hash, :user_phone,
-                            CASE WHEN :user_dob IS NOT NULL THEN TO_DATE(:user_dob,'YYYY-MM-DD') ELSE NULL END, 
-                            :user_addr, :initial_role
-                        )
-                    """, {
+                    USER_INSERT.execute(cur, {
                         'user_name': full_name,
                         'user_email': email,
                         'password_hash': password_hash,
@@ -303,6 +373,7 @@ def create_app():
                         'initial_role': initial_role
                     })
                     
+                audit.log('REGISTER', 'USERS', new_values=json.dumps({'role': initial_role}), user=email)
                 flash('Registration successful! Please log in.', 'success')
                 return redirect(url_for('login'))
                 
@@ -312,6 +383,7 @@ def create_app():
         return render_template('register.html')
 
     @app.route('/dashboard')
+    @query_budget(6)
     @login_required
     def dashboard():
         role = session.get('user_role', 'user')
@@ -319,87 +391,7 @@ def create_app():
         stats = {}
         
         try:
-            with db.get_cursor() as cur:
-                if 'testator' in all_roles:
-                    # Get user's wills count
-                    cur.execute("SELECT COUNT(*) FROM wills WHERE user_id = :user_id_param", {'user_id_param': session['user_id']})
-                    stats['total_wills'] = cur.fetchone()[0]
-                    
-                    # Get total assets value
-                    cur.execute("""
-                        SELECT COUNT(*), NVL(SUM(value), 0) 
-                        FROM assets a
-                        JOIN wills w ON a.will_id = w.will_id
-                        WHERE w.user_id = :user_id_param
-                    """, {'user_id_param': session['user_id']})
-                    result = cur.fetchone()
-                    stats['total_assets'] = result[0]
-                    stats['total_assets_value'] = result[1]
-                    
-                    # Get pending wills
-                    cur.execute("""
-                        SELECT COUNT(*) FROM wills 
-                        WHERE user_id = :user_id_param AND status = :will_status
-                    """, {'user_id_param': session['user_id'], 'will_status': 'Draft'})
-                    stats['pending_wills'] = cur.fetchone()[0]
-                    
-                    # Get total beneficiaries assigned
-                    cur.execute("""
-                        SELECT COUNT(DISTINCT wab.beneficiary_id) 
-                        FROM will_asset_beneficiaries wab
-                        JOIN assets a ON wab.asset_id = a.asset_id
-                        JOIN wills w ON a.will_id = w.will_id
-                        WHERE w.user_id = :user_id_param
-                    """, {'user_id_param': session['user_id']})
-                    stats['total_beneficiaries'] = cur.fetchone()[0]
-
-                if 'executor' in all_roles:
-                    # Executor-specific stats
-                    cur.execute("SELECT COUNT(*) FROM executors WHERE email = :exec_email", 
-                               {'exec_email': session['user_email']})
-                    stats['assigned_wills'] = cur.fetchone()[0]
-                    
-                    # Get pending transfers for executor
-                    cur.execute("""
-                        SELECT COUNT(*) FROM transfer_logs t
-                        JOIN assets a ON t.asset_id = a.asset_id
-                        JOIN wills w ON a.will_id = w.will_id
-                        JOIN executors e ON w.will_id = e.will_id
-                        WHERE e.email = :exec_email AND t.transfer_status = :transfer_status
-                    """, {'exec_email': session['user_email'], 'transfer_status': 'Initiated'})
-                    stats['pending_transfers'] = cur.fetchone()[0]
-
-                if 'beneficiary' in all_roles:
-                    # Beneficiary-specific stats
-                    cur.execute("""
-                        SELECT COUNT(*), NVL(SUM(a.value * wab.share_percent/100), 0) 
-                        FROM will_asset_beneficiaries wab
-                        JOIN assets a ON wab.asset_id = a.asset_id
-                        JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
-                        WHERE b.email = :ben_email
-                    """, {'ben_email': session['user_email']})
-                    result = cur.fetchone()
-                    stats['assigned_assets'] = result[0] if result else 0
-                    stats['total_value'] = result[1] if result else 0
-
-                if 'admin' in all_roles:
-                    # Admin-specific stats
-                    cur.execute("""
-                        SELECT 
-                            (SELECT COUNT(*) FROM users) as total_users,
-                            (SELECT COUNT(*) FROM wills) as total_wills,
-                            (SELECT COUNT(*) FROM assets) as total_assets,
-                            (SELECT COUNT(*) FROM transfer_logs) as total_transfers
-                        FROM dual
-                    """)
-                    admin_stats = cur.fetchone()
-                    stats.update({
-                        'system_users': admin_stats[0],
-                        'system_wills': admin_stats[1],
-                        'system_assets': admin_stats[2],
-                        'system_transfers': admin_stats[3]
-                    })
-
+            stats = dashboard_stats.get(session['user_id'], session['user_email'], all_roles)
         except oracledb.Error as err:
             flash(f"Dashboard load error: {err}", 'danger')
             print(f"Database error: {err}")  # For debugging
@@ -408,6 +400,7 @@ def create_app():
         return render_template('dashboard.html', role=role, all_roles=all_roles, stats=stats, today=today)
 
     @app.route('/switch-role/<role>')
+    @query_budget(2)
     @login_required
     def switch_role(role):
         """Allow users with multiple roles to switch between them"""
@@ -422,52 +415,29 @@ def create_app():
         return redirect(url_for('dashboard'))
 
     @app.route('/wills')
+    @query_budget(4)
     @login_required
     def list_wills():
-        user_role = session.get('user_role')
-        all_roles = session.get('all_roles', [])
+        params = ListParams(request.args, WILL_SORTS, 'created', app.config['LIST_PAGE_SIZE'])
         
         try:
-            with db.get_cursor() as cur:
-                if user_role == 'testator' or 'testator' in all_roles:
-                    cur.execute("""
-                        SELECT will_id, title, description, status, created_at,
-                               (SELECT COUNT(*) FROM assets WHERE will_id = w.will_id) as asset_count,
-                               (SELECT COUNT(*) FROM executors WHERE will_id = w.will_id) as executor_count
-                        FROM wills w
-                        WHERE user_id = :user_id_param
-                        ORDER BY created_at DESC
-                    """, {'user_id_param': session['user_id']})
-                elif user_role == 'executor' or 'executor' in all_roles:
-                    cur.execute("""
-                        SELECT DISTINCT w.will_id, w.title, w.description, w.status, w.created_at,
-                               (SELECT COUNT(*) FROM assets WHERE will_id = w.will_id) as asset_count,
-                               (SELECT COUNT(*) FROM executors WHERE will_id = w.will_id) as executor_count
-                        FROM wills w
-                        JOIN executors e ON w.will_id = e.will_id
-                        WHERE e.email = :exec_email
-                        ORDER BY w.created_at DESC
-                    """, {'exec_email': session['user_email']})
-                elif user_role == 'admin' or 'admin' in all_roles:
-                    cur.execute("""
-                        SELECT will_id, title, description, status, created_at,
-                               (SELECT COUNT(*) FROM assets WHERE will_id = w.will_id) as asset_count,
-                               (SELECT COUNT(*) FROM executors WHERE will_id = w.will_id) as executor_count
-                        FROM wills w
-                        ORDER BY created_at DESC
-                    """)
-                else:
+            with db.get_cursor(commit=False) as cur:
+                result = wills_page(cur, params)
+                if result is None:
                     flash('You do not have permission to view wills.', 'danger')
                     return redirect(url_for('dashboard'))
-                    
-                wills = cur.fetchall()
         except oracledb.Error as err:
             flash(f'Error fetching wills: {err}', 'danger')
-            wills = []
+            result = None
         
-        return render_template('wills/list.html', wills=wills)
+        return render_template('wills/list.html',
+                               wills=result.rows if result else [],
+                               result=result,
+                               params=params,
+                               page=request.args.get('page', 1, type=int))
 
     @app.route('/wills/create', methods=['GET','POST'])
+    @query_budget(3)
     @login_required
     @role_required(['testator'])
     def create_will():
@@ -481,15 +451,14 @@ def create_app():
             
             try:
                 with db.get_cursor() as cur:
-                    cur.execute("""
-                        INSERT INTO wills(user_id, title, description, status)
-                        VALUES(:user_id_param, :will_title, :will_desc, 'Draft')
-                    """, {
+                    WILL_INSERT.execute(cur, {
                         'user_id_param': session['user_id'], 
                         'will_title': title, 
                         'will_desc': description
                     })
                     
+                roles.invalidate(session['user_id'])   # may gain or lose the testator role
+                dashboard_stats.invalidate(session['user_id'])
                 flash('Will created successfully.', 'success')
                 return redirect(url_for('list_wills'))
             except oracledb.Error as err:
@@ -498,88 +467,29 @@ def create_app():
         return render_template('wills/create.html')
 
     @app.route('/wills/<int:will_id>')
+    @query_budget(7)
     @login_required
+    @conditional_on_will(calendar=True)
     def view_will(will_id):
         try:
-            with db.get_cursor(commit=False) as cur:
-                # Get will details
-                cur.execute("""
-                    SELECT w.*, u.full_name as owner_name
-                    FROM wills w
-                    JOIN users u ON w.user_id = u.user_id
-                    WHERE w.will_id = :will_id_param
-                """, {'will_id_param': will_id})
-                will = cur.fetchone()
-                
-                if not will:
-                    flash('Will not found.', 'danger')
-                    return redirect(url_for('list_wills'))
-                
-                # Check permission
-                user_role = session.get('user_role')
-                all_roles = session.get('all_roles', [])
-                user_email = session.get('user_email')
-                user_id = session.get('user_id')
-                
-                has_permission = False
-                if 'admin' in all_roles:
-                    has_permission = True
-                elif 'testator' in all_roles and will[1] == user_id:  # will[1] is user_id
-                    has_permission = True
-                elif 'executor' in all_roles:
-                    # Check if user is executor for this will
-                    cur.execute("SELECT COUNT(*) FROM executors WHERE will_id = :will_id AND email = :email", 
-                               {'will_id': will_id, 'email': user_email})
-                    if cur.fetchone()[0] > 0:
-                        has_permission = True
-                
-                if not has_permission:
-                    flash('You do not have permission to view this will.', 'danger')
-                    return redirect(url_for('list_wills'))
-                
-                # Get assets with allocation percentages
-                cur.execute("""
-                    SELECT a.asset_id, a.name, a.description, a.asset_type, a.value, a.location,
-                           NVL((SELECT SUM(share_percent) 
-                                FROM will_asset_beneficiaries 
-                                WHERE asset_id = a.asset_id), 0) as allocated_percent
-                    FROM assets a
-                    WHERE a.will_id = :will_id_param
-                    ORDER BY a.name
-                """, {'will_id_param': will_id})
-                assets = cur.fetchall()
-                
-                # Get executors
-                cur.execute("""
-                    SELECT executor_id, full_name, email, phone_number, relation, is_primary
-                    FROM executors 
-                    WHERE will_id = :will_id_param
-                    ORDER BY is_primary DESC, full_name
-                """, {'will_id_param': will_id})
-                executors = cur.fetchall()
-                
-                # Get asset-beneficiary mappings
-                cur.execute("""
-                    SELECT a.name as asset_name, b.full_name as beneficiary_name, 
-                           wab.share_percent, wab.conditions,
-                           a.value * wab.share_percent / 100 as estimated_value
-                    FROM will_asset_beneficiaries wab
-                    JOIN assets a ON wab.asset_id = a.asset_id
-                    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
-                    WHERE a.will_id = :will_id_param
-                    ORDER BY a.name, b.full_name
-                """, {'will_id_param': will_id})
-                allocations = cur.fetchall()
-                
+            will = will_loader.load(will_id, version=current_will_version())
         except oracledb.Error as err:
             flash(f'Fetch error: {err}', 'danger')
-            will, assets, executors, allocations = None, [], [], []
+            return render_template('wills/view.html', will=None)
+        
+        if will is None:
+            flash('Will not found.', 'danger')
+            return redirect(url_for('list_wills'))
+        
+        if not will.can_view(session.get('user_id'), session.get('user_email'),
+                             session.get('all_roles', [])):
+            flash('You do not have permission to view this will.', 'danger')
+            return redirect(url_for('list_wills'))
             
-        return render_template('wills/view.html',
-                               will=will, assets=assets, 
-                               executors=executors, allocations=allocations)
+        return render_template('wills/view.html', will=will)
 
     @app.route('/wills/<int:will_id>/approve', methods=['POST'])
+    @query_budget(3)
     @login_required
     @role_required(['testator'])
     def approve_will(will_id):
@@ -587,6 +497,7 @@ def create_app():
             with db.get_cursor() as cur:
                 success, error_msg = safe_execute_procedure(cur, 'approve_will', [will_id])
                 if success:
+                    dashboard_stats.invalidate(session['user_id'])
                     flash('Will approved successfully!', 'success')
                 else:
                     flash(error_msg, 'danger')
@@ -596,6 +507,7 @@ def create_app():
         return redirect(url_for('view_will', will_id=will_id))
 
     @app.route('/wills/<int:will_id>/assets/add', methods=['GET','POST'])
+    @query_budget(3)
     @login_required
     @role_required(['testator'])
     def add_asset(will_id):
@@ -611,18 +523,7 @@ def create_app():
             
             try:
                 with db.get_cursor() as cur:
-                    cur.execute("""
-                        INSERT INTO assets(
-                            will_id, name, description, asset_type,
-                            value, location, acquisition_date
-                        ) VALUES (
-                            :will_id_param, :asset_name, :asset_desc, :asset_type_param, 
-                            :asset_value, :asset_location, 
-                            CASE WHEN :acq_date IS NOT NULL 
-                                 THEN TO_DATE(:acq_date,'YYYY-MM-DD') 
-                                 ELSE NULL END
-                        )
-                    """, {
+                    ASSET_ADD.execute(cur, {
                         'will_id_param': will_id,
                         'asset_name': form_data.get('name'),
                         'asset_desc': form_data.get('description'),
@@ -632,6 +533,7 @@ def create_app():
                         'acq_date': form_data.get('acquisition_date') or None
                     })
                     
+                dashboard_stats.invalidate(session['user_id'])
                 flash('Asset added successfully.', 'success')
                 return redirect(url_for('view_will', will_id=will_id))
             except ValueError:
@@ -641,7 +543,69 @@ def create_app():
         
         return render_template('assets/add.html', will_id=will_id)
 
+    @app.route('/wills/<int:will_id>/assets/import', methods=['GET','POST'])
+    @query_budget(4)
+    @login_required
+    @role_required(['testator'])
+    def import_assets(will_id):
+        """Bulk-add assets to a will from an uploaded CSV/JSON file or a JSON body"""
+        wants_json = request.is_json or request.accept_mimetypes.best == 'application/json'
+        
+        def respond(report=None, error=None, status=200):
+            if wants_json:
+                if error:
+                    return jsonify({'error': error}), status
+                return jsonify(report), status
+            if error:
+                flash(error, 'danger')
+            return render_template('assets/import.html', will_id=will_id, report=report,
+                                   fields=ASSET_IMPORT_FIELDS), status
+        
+        if request.method == 'GET':
+            return respond()
+        
+        try:
+            if request.is_json:
+                rows = parse_asset_upload('upload.json', request.get_data())
+            else:
+                upload = request.files.get('file')
+                if not upload or not upload.filename:
+                    return respond(error='Please choose a CSV or JSON file.', status=400)
+                rows = parse_asset_upload(upload.filename, upload.read())
+        except AssetImportError as err:
+            return respond(error=str(err), status=400)
+        
+        if not rows:
+            return respond(error='The file contains no assets.', status=400)
+        max_rows = app.config['ASSET_IMPORT_MAX_ROWS']
+        if len(rows) > max_rows:
+            return respond(error=f'At most {max_rows} assets can be imported at once.', status=400)
+        
+        try:
+            with db.get_cursor() as cur:
+                status = WILL_OWNED_STATUS.scalar(cur, {'will_id_param': will_id,
+                                                        'user_id_param': session['user_id']})
+                if status is None:
+                    return respond(error='Will not found.', status=404)
+                if status not in ('Draft', 'Approved'):
+                    return respond(error=f'Assets cannot be added to a will with status {status}.',
+                                   status=409)
+                
+                report = bulk_insert_assets(cur, will_id, rows)
+        except oracledb.Error as err:
+            return respond(error=f'Import assets error: {err}', status=500)
+        
+        if report['imported']:
+            dashboard_stats.invalidate(session['user_id'])
+            audit.log('IMPORT', 'ASSETS', will_id,
+                      new_values=f"{report['imported']} imported, {report['failed']} failed")
+        if not wants_json:
+            flash(f"Imported {report['imported']} of {len(report['rows'])} assets.",
+                  'success' if not report['failed'] else 'warning')
+        return respond(report)
+
     @app.route('/assets/<int:asset_id>/assign', methods=['GET','POST'])
+    @query_budget(6)
     @login_required
     @role_required(['testator'])
     def assign_asset(asset_id):
@@ -672,6 +636,7 @@ def create_app():
                         conditions
                     ])
                     if success:
+                        dashboard_stats.invalidate(session['user_id'])
                         flash('Asset assigned successfully!', 'success')
                     else:
                         flash(error_msg, 'danger')
@@ -684,43 +649,20 @@ def create_app():
         try:
             with db.get_cursor(commit=False) as cur:
                 # Get asset details
-                cur.execute("""
-                    SELECT name, description, value, asset_type 
-                    FROM assets 
-                    WHERE asset_id = :asset_id_param
-                """, {'asset_id_param': asset_id})
-                asset = cur.fetchone()
+                asset = ASSET_BY_ID.one(cur, {'asset_id_param': asset_id})
                 
                 if not asset:
                     flash('Asset not found.', 'danger')
                     return redirect(url_for('dashboard'))
                 
                 # Get available beneficiaries
-                cur.execute("""
-                    SELECT beneficiary_id, full_name, relation, email
-                    FROM beneficiaries 
-                    ORDER BY full_name
-                """)
-                beneficiaries = cur.fetchall()
+                beneficiaries = BENEFICIARY_CHOICES.all(cur)
                 
                 # Get current allocations
-                cur.execute("""
-                    SELECT b.full_name, wab.share_percent, wab.conditions,
-                           (SELECT value FROM assets WHERE asset_id = :asset_id_param) * wab.share_percent / 100 as estimated_value
-                    FROM will_asset_beneficiaries wab
-                    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
-                    WHERE wab.asset_id = :asset_id_param
-                    ORDER BY wab.share_percent DESC
-                """, {'asset_id_param': asset_id})
-                current_allocations = cur.fetchall()
+                current_allocations = ASSET_ALLOCATIONS.all(cur, {'asset_id_param': asset_id})
                 
                 # Calculate remaining allocation
-                cur.execute("""
-                    SELECT NVL(SUM(share_percent), 0) 
-                    FROM will_asset_beneficiaries 
-                    WHERE asset_id = :asset_id_param
-                """, {'asset_id_param': asset_id})
-                allocated_percent = cur.fetchone()[0]
+                allocated_percent = ASSET_ALLOCATED_PERCENT.scalar(cur, {'asset_id_param': asset_id})
                 remaining_percent = 100 - allocated_percent
                 
         except oracledb.Error as err:
@@ -735,6 +677,7 @@ def create_app():
                                remaining_percent=remaining_percent)
 
     @app.route('/beneficiaries', methods=['GET','POST'])
+    @query_budget(4)
     @login_required
     @role_required(['testator'])
     def manage_beneficiaries():
@@ -750,18 +693,7 @@ def create_app():
             
             try:
                 with db.get_cursor() as cur:
-                    cur.execute("""
-                        INSERT INTO beneficiaries(
-                            full_name, relation, email, phone_number,
-                            address, date_of_birth, notes
-                        ) VALUES (
-                            :ben_name, :ben_relation, :ben_email, :ben_phone, :ben_address, 
-                            CASE WHEN :ben_dob IS NOT NULL 
-                                 THEN TO_DATE(:ben_dob,'YYYY-MM-DD') 
-                                 ELSE NULL END, 
-                            :ben_notes
-                        )
-                    """, {
+                    BENEFICIARY_INSERT.execute(cur, {
                         'ben_name': form_data.get('full_name'),
                         'ben_relation': form_data.get('relation'),
                         'ben_email': form_data.get('email'),
@@ -777,27 +709,23 @@ def create_app():
             
             return redirect(url_for('manage_beneficiaries'))
 
-        # GET: show beneficiaries list
+        # GET: show one page of the beneficiaries list
+        params = ListParams(request.args, BENEFICIARY_SORTS, 'name', app.config['LIST_PAGE_SIZE'])
         try:
             with db.get_cursor(commit=False) as cur:
-                cur.execute("""
-                    SELECT b.beneficiary_id, b.full_name, b.relation, b.email, b.phone_number,
-                           COUNT(wab.asset_id) as assigned_assets,
-                           NVL(SUM(a.value * wab.share_percent / 100), 0) as total_inheritance
-                    FROM beneficiaries b
-                    LEFT JOIN will_asset_beneficiaries wab ON b.beneficiary_id = wab.beneficiary_id
-                    LEFT JOIN assets a ON wab.asset_id = a.asset_id
-                    GROUP BY b.beneficiary_id, b.full_name, b.relation, b.email, b.phone_number
-                    ORDER BY b.full_name
-                """)
-                beneficiaries = cur.fetchall()
+                result = beneficiaries_page(cur, params)
         except oracledb.Error as err:
             flash(f'Fetch error: {err}', 'danger')
-            beneficiaries = []
+            result = None
         
-        return render_template('beneficiaries/list.html', beneficiaries=beneficiaries)
+        return render_template('beneficiaries/list.html',
+                               beneficiaries=result.rows if result else [],
+                               result=result,
+                               params=params,
+                               page=request.args.get('page', 1, type=int))
 
     @app.route('/wills/<int:will_id>/executors/add', methods=['GET','POST'])
+    @query_budget(4)
     @login_required
     @role_required(['testator'])
     def add_executor(will_id):
@@ -813,16 +741,9 @@ def create_app():
             try:
                 with db.get_cursor() as cur:
                     # Check if this is the first executor (make them primary)
-                    cur.execute("SELECT COUNT(*) FROM executors WHERE will_id = :will_id_param", {'will_id_param': will_id})
-                    is_first_executor = cur.fetchone()[0] == 0
+                    is_first_executor = EXECUTOR_COUNT.scalar(cur, {'will_id_param': will_id}) == 0
                     
-                    cur.execute("""
-                        INSERT INTO executors(
-                            will_id, full_name, email, phone_number, relation, is_primary
-                        ) VALUES (
-                            :will_id_param, :exec_name, :exec_email, :exec_phone, :exec_relation, :exec_primary
-                        )
-                    """, {
+                    EXECUTOR_INSERT.execute(cur, {
                         'will_id_param': will_id,
                         'exec_name': form_data.get('full_name'),
                         'exec_email': form_data.get('email'),
@@ -839,52 +760,27 @@ def create_app():
         return render_template('executors/add.html', will_id=will_id)
 
     @app.route('/transfers')
+    @query_budget(3)
     @login_required
     @role_required(['executor', 'admin', 'testator'])
     def list_transfers():
+        params = ListParams(request.args, TRANSFER_SORTS, 'date', app.config['LIST_PAGE_SIZE'])
+        
         try:
             with db.get_cursor(commit=False) as cur:
-                user_role = session.get('user_role')
-                all_roles = session.get('all_roles', [])
-                
-                if 'admin' in all_roles:
-                    cur.execute("""
-                        SELECT t.transfer_id, a.name as asset_name, b.full_name as beneficiary_name,
-                               t.transfer_date, t.transfer_status, t.approved_by, t.notes,
-                               a.value, wab.share_percent,
-                               (a.value * wab.share_percent / 100) as transfer_value
-                        FROM transfer_logs t
-                        JOIN assets a ON t.asset_id = a.asset_id
-                        JOIN beneficiaries b ON t.beneficiary_id = b.beneficiary_id
-                        LEFT JOIN will_asset_beneficiaries wab ON t.asset_id = wab.asset_id 
-                                                               AND t.beneficiary_id = wab.beneficiary_id
-                        ORDER BY t.transfer_date DESC
-                    """)
-                else:
-                    # For executors and testators, show transfers they're involved with
-                    cur.execute("""
-                        SELECT DISTINCT t.transfer_id, a.name as asset_name, b.full_name as beneficiary_name,
-                               t.transfer_date, t.transfer_status, t.approved_by, t.notes,
-                               a.value, wab.share_percent,
-                               (a.value * wab.share_percent / 100) as transfer_value
-                        FROM transfer_logs t
-                        JOIN assets a ON t.asset_id = a.asset_id
-                        JOIN beneficiaries b ON t.beneficiary_id = b.beneficiary_id
-                        JOIN wills w ON a.will_id = w.will_id
-                        LEFT JOIN executors e ON w.will_id = e.will_id
-                        LEFT JOIN will_asset_beneficiaries wab ON t.asset_id = wab.asset_id 
-                                                               AND t.beneficiary_id = wab.beneficiary_id
-                        WHERE e.email = :exec_email OR w.user_id = :user_id_param
-                        ORDER BY t.transfer_date DESC
-                    """, {'exec_email': session['user_email'], 'user_id_param': session['user_id']})
-                transfers = cur.fetchall()
+                result = transfers_page(cur, params)
         except oracledb.Error as err:
             flash(f'Transfers error: {err}', 'danger')
-            transfers = []
+            result = None
         
-        return render_template('transfers/list.html', transfers=transfers)
+        return render_template('transfers/list.html',
+                               transfers=result.rows if result else [],
+                               result=result,
+                               params=params,
+                               page=request.args.get('page', 1, type=int))
 
     @app.route('/transfers/initiate', methods=['POST'])
+    @query_budget(5)
     @login_required
     @role_required(['executor', 'admin', 'testator'])
     def initiate_transfer():
@@ -902,10 +798,16 @@ def create_app():
             flash('Invalid asset or beneficiary ID.', 'danger')
             return redirect(url_for('list_transfers'))
         
+        blocked = business_calendar.blocked_reason(datetime.now())
+        if blocked:
+            flash(blocked, 'warning')
+            return redirect(url_for('list_transfers'))
+        
         try:
             with db.get_cursor() as cur:
                 success, error_msg = safe_execute_procedure(cur, 'transfer_asset', [asset_id, beneficiary_id])
                 if success:
+                    dashboard_stats.invalidate(session['user_id'])
                     flash('Transfer initiated successfully.', 'success')
                 else:
                     flash(error_msg, 'warning' if 'weekend' in error_msg.lower() or 'holiday' in error_msg.lower() else 'danger')
@@ -914,45 +816,88 @@ def create_app():
         
         return redirect(url_for('list_transfers'))
 
+    @app.route('/wills/<int:will_id>/transfers/execute', methods=['POST'])
+    @query_budget(7)
+    @login_required
+    @role_required(['executor', 'admin', 'testator'])
+    def execute_will_transfers(will_id):
+        """Initiate every pending transfer of a will in one transaction"""
+        wants_json = request.is_json or request.accept_mimetypes.best == 'application/json'
+        
+        def respond(payload, status=200):
+            if wants_json:
+                return jsonify(payload), status
+            if 'error' in payload:
+                error = payload['error']
+                flash(error, 'warning' if 'weekend' in error.lower() or 'holiday' in error.lower() else 'danger')
+            else:
+                flash(f"Initiated {payload['initiated']} of {len(payload['results'])} transfers.",
+                      'success' if payload['initiated'] == len(payload['results']) else 'warning')
+            return redirect(url_for('list_transfers'))
+        
+        blocked = business_calendar.blocked_reason(datetime.now())
+        if blocked:
+            return respond({'error': blocked}, 409)
+        
+        try:
+            with db.get_cursor() as cur:
+                access = WILL_ACCESS.one(cur, {
+                    'will_id': will_id,
+                    'user_id': session['user_id'],
+                    'email': session['user_email']
+                })
+                if not access:
+                    return respond({'error': 'Will not found.'}, 404)
+                status, is_owner, is_executor = access
+                if not (is_owner or is_executor or 'admin' in session.get('all_roles', [])):
+                    return respond({'error': 'You are not an executor of this will.'}, 403)
+                
+                pending = pending_transfers(cur, will_id)
+                if not pending:
+                    return respond({'will_id': will_id, 'initiated': 0, 'results': []})
+                
+                params, results_var = execute_params(cur, will_id, pending)
+                success, error_msg = safe_execute_procedure(cur, 'transfer_pkg.execute_will_transfers', params)
+                if not success:
+                    return respond({'error': error_msg}, 409)
+                results = transfer_results(pending, results_var.getvalue())
+        except oracledb.Error as err:
+            return respond({'error': f'Transfer error: {err}'}, 500)
+        
+        initiated = sum(1 for r in results if r['status'] == 'initiated')
+        if initiated:
+            dashboard_stats.invalidate(session['user_id'])
+        return respond({'will_id': will_id, 'initiated': initiated, 'results': results})
+
     @app.route('/api/transfer-form/<int:asset_id>')
+    @query_budget(7)
     @login_required
+    @conditional_on_will(calendar=True)
     def get_transfer_form_data(asset_id):
         """API endpoint to get beneficiaries for an asset transfer form"""
         try:
             with db.get_cursor(commit=False) as cur:
                 # Get asset details
-                cur.execute("""
-                    SELECT a.name, a.value, a.asset_type
-                    FROM assets a
-                    WHERE a.asset_id = :asset_id_param
-                """, {'asset_id_param': asset_id})
-                asset = cur.fetchone()
+                asset = ASSET_BY_ID.one(cur, {'asset_id_param': asset_id})
                 
                 if not asset:
                     return jsonify({'error': 'Asset not found'}), 404
                 
                 # Get eligible beneficiaries for this asset
-                cur.execute("""
-                    SELECT b.beneficiary_id, b.full_name, b.relation, wab.share_percent
-                    FROM will_asset_beneficiaries wab
-                    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
-                    WHERE wab.asset_id = :asset_id_param
-                    ORDER BY b.full_name
-                """, {'asset_id_param': asset_id})
-                beneficiaries = cur.fetchall()
+                beneficiaries = ASSET_BENEFICIARIES.all(cur, {'asset_id_param': asset_id})
                 
                 return jsonify({
                     'asset': {
-                        'name': asset[0],
-                        'value': float(asset[1]) if asset[1] else 0,
-                        'type': asset[2]
+                        'name': asset.name,
+                        'value': asset.value or 0,
+                        'type': asset.asset_type
                     },
                     'beneficiaries': [
                         {
-                            'id': b[0],
-                            'name': b[1],
-                            'relation': b[2],
-                            'share_percent': float(b[3]) if b[3] else 0
+                            'id': b.beneficiary_id,
+                            'name': b.full_name,
+                            'relation': b.relation,
+                            'share_percent': b.share_percent or 0
                         } for b in beneficiaries
                     ]
                 })
@@ -960,6 +905,7 @@ def create_app():
             return jsonify({'error': str(err)}), 500
 
     @app.route('/documents/upload/<string:entity_type>/<int:entity_id>', methods=['GET', 'POST'])
+    @query_budget(3)
     @login_required
     def upload_document(entity_type, entity_id):
         """Enhanced document upload with proper PL/SQL integration"""
@@ -1003,27 +949,14 @@ def create_app():
         return render_template('documents/upload.html', entity_type=entity_type, entity_id=entity_id)
 
     @app.route('/assets/my')
+    @query_budget(3)
     @login_required
     @role_required(['beneficiary'])
     def view_my_assets():
         """View assets assigned to logged-in beneficiary"""
         try:
             with db.get_cursor(commit=False) as cur:
-                cur.execute("""
-                    SELECT a.name, a.description, a.asset_type, a.value, a.location,
-                           wab.share_percent, wab.conditions,
-                           (a.value * wab.share_percent / 100) as my_share_value,
-                           w.title as will_title, w.status as will_status,
-                           CASE WHEN tl.transfer_id IS NOT NULL THEN tl.transfer_status ELSE 'Not Transferred' END as transfer_status
-                    FROM will_asset_beneficiaries wab
-                    JOIN assets a ON wab.asset_id = a.asset_id
-                    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
-                    JOIN wills w ON a.will_id = w.will_id
-                    LEFT JOIN transfer_logs tl ON a.asset_id = tl.asset_id AND b.beneficiary_id = tl.beneficiary_id
-                    WHERE b.email = :ben_email
-                    ORDER BY w.title, a.name
-                """, {'ben_email': session['user_email']})
-                my_assets = cur.fetchall()
+                my_assets = BENEFICIARY_MY_ASSETS.all(cur, {'ben_email': session['user_email']})
         except oracledb.Error as err:
             flash(f'Error fetching assets: {err}', 'danger')
             my_assets = []
@@ -1031,123 +964,37 @@ def create_app():
         return render_template('beneficiaries/my_assets.html', assets=my_assets)
 
     @app.route('/reports/will-summary/<int:will_id>')
+    @query_budget(5)
     @login_required
+    @conditional_on_will
     def will_summary_report(will_id):
         """Generate comprehensive will summary report"""
         try:
-            with db.get_cursor(commit=False) as cur:
-                # Get will details
-                cur.execute("""
-                    SELECT w.*, u.full_name as owner_name, u.email as owner_email
-                    FROM wills w
-                    JOIN users u ON w.user_id = u.user_id
-                    WHERE w.will_id = :will_id_param
-                """, {'will_id_param': will_id})
-                will_details = cur.fetchone()
-                
-                if not will_details:
-                    flash('Will not found.', 'danger')
-                    return redirect(url_for('list_wills'))
-                
-                # Get summary statistics
-                cur.execute("""
-                    SELECT 
-                        COUNT(a.asset_id) as total_assets,
-                        NVL(SUM(a.value), 0) as total_value,
-                        COUNT(DISTINCT wab.beneficiary_id) as total_beneficiaries,
-                        COUNT(e.executor_id) as total_executors,
-                        COUNT(CASE WHEN e.is_primary = 'Y' THEN 1 END) as primary_executors
-                    FROM assets a
-                    LEFT JOIN will_asset_beneficiaries wab ON a.asset_id = wab.asset_id
-                    LEFT JOIN executors e ON a.will_id = e.will_id
-                    WHERE a.will_id = :will_id_param
-                """, {'will_id_param': will_id})
-                summary_stats = cur.fetchone()
-                
-                # Get asset allocation details
-                cur.execute("""
-                    SELECT a.name, a.asset_type, a.value,
-                           NVL(SUM(wab.share_percent), 0) as allocated_percent,
-                           COUNT(wab.beneficiary_id) as beneficiary_count
-                    FROM assets a
-                    LEFT JOIN will_asset_beneficiaries wab ON a.asset_id = wab.asset_id
-                    WHERE a.will_id = :will_id_param
-                    GROUP BY a.asset_id, a.name, a.asset_type, a.value
-                    ORDER BY a.name
-                """, {'will_id_param': will_id})
-                asset_allocations = cur.fetchall()
-                
-                # Get beneficiary summary
-                cur.execute("""
-                    SELECT b.full_name, b.relation,
-                           COUNT(wab.asset_id) as assigned_assets,
-                           NVL(SUM(a.value * wab.share_percent / 100), 0) as total_inheritance
-                    FROM beneficiaries b
-                    JOIN will_asset_beneficiaries wab ON b.beneficiary_id = wab.beneficiary_id
-                    JOIN assets a ON wab.asset_id = a.asset_id
-                    WHERE a.will_id = :will_id_param
-                    GROUP BY b.beneficiary_id, b.full_name, b.relation
-                    ORDER BY total_inheritance DESC
-                """, {'will_id_param': will_id})
-                beneficiary_summary = cur.fetchall()
-                
+            will = will_loader.load(will_id, version=current_will_version())
         except oracledb.Error as err:
             flash(f'Report generation error: {err}', 'danger')
             return redirect(url_for('view_will', will_id=will_id))
+        
+        if will is None:
+            flash('Will not found.', 'danger')
+            return redirect(url_for('list_wills'))
+        
+        if not will.can_view(session.get('user_id'), session.get('user_email'),
+                             session.get('all_roles', [])):
+            flash('You do not have permission to view this will.', 'danger')
+            return redirect(url_for('list_wills'))
             
-        return render_template('reports/will_summary.html',
-                               will=will_details,
-                               stats=summary_stats,
-                               assets=asset_allocations,
-                               beneficiaries=beneficiary_summary)
+        return render_template('reports/will_summary.html', will=will, stats=will.stats())
 
     @app.route('/admin/system-stats')
+    @query_budget(6)
     @login_required
     @role_required(['admin'])
     def system_statistics():
         """System-wide statistics dashboard"""
         try:
             with db.get_cursor(commit=False) as cur:
-                # Overall system stats
-                cur.execute("""
-                    SELECT 
-                        (SELECT COUNT(*) FROM users) as total_users,
-                        (SELECT COUNT(*) FROM wills) as total_wills,
-                        (SELECT COUNT(*) FROM assets) as total_assets,
-                        (SELECT COUNT(*) FROM beneficiaries) as total_beneficiaries,
-                        (SELECT COUNT(*) FROM executors) as total_executors,
-                        (SELECT COUNT(*) FROM transfer_logs) as total_transfers,
-                        (SELECT NVL(SUM(value), 0) FROM assets) as total_asset_value
-                    FROM dual
-                """)
-                system_stats = cur.fetchone()
-                
-                # Will status distribution
-                cur.execute("""
-                    SELECT status, COUNT(*) as count
-                    FROM wills
-                    GROUP BY status
-                    ORDER BY status
-                """)
-                will_status_dist = cur.fetchall()
-                
-                # Recent activity
-                cur.execute("""
-                    SELECT 'Will Created' as activity, w.title as description, w.created_at as activity_date
-                    FROM wills w
-                    WHERE w.created_at >= SYSDATE - 30
-                    UNION ALL
-                    SELECT 'Transfer Initiated' as activity, 
-                           a.name || ' to ' || b.full_name as description, 
-                           t.transfer_date as activity_date
-                    FROM transfer_logs t
-                    JOIN assets a ON t.asset_id = a.asset_id
-                    JOIN beneficiaries b ON t.beneficiary_id = b.beneficiary_id
-                    WHERE t.transfer_date >= SYSDATE - 30
-                    ORDER BY activity_date DESC
-                    FETCH FIRST 20 ROWS ONLY
-                """)
-                recent_activity = cur.fetchall()
+                system_stats, will_status_dist, recent_activity = load_system_stats(cur)
                 
         except oracledb.Error as err:
             flash(f'Error loading statistics: {err}', 'danger')
@@ -1161,6 +1008,7 @@ def create_app():
                                recent_activity=recent_activity)
 
     @app.route('/executors/<int:executor_id>/set-primary', methods=['POST'])
+    @query_budget(3)
     @login_required
     @role_required(['testator'])
     def set_primary_executor(executor_id):
@@ -1178,6 +1026,7 @@ def create_app():
         return redirect(request.referrer or url_for('dashboard'))
 
     @app.route('/wills/<int:will_id>/delete', methods=['POST'])
+    @query_budget(3)
     @login_required
     @role_required(['testator'])
     def delete_will(will_id):
@@ -1194,6 +1043,8 @@ def create_app():
                     confirm_text if confirm_text else None
                 ])
                 if success:
+                    roles.invalidate(session['user_id'])   # may gain or lose the testator role
+                    dashboard_stats.invalidate(session['user_id'])
                     flash('Will deleted successfully.', 'success')
                     return redirect(url_for('list_wills'))
                 else:
@@ -1204,65 +1055,78 @@ def create_app():
         return redirect(url_for('view_will', will_id=will_id))
 
     @app.route('/audit/logs')
+    @query_budget(5)
     @login_required
     @role_required(['admin'])
     def view_audit_logs():
         """View system audit logs"""
-        page = int(request.args.get('page', 1))
+        page = request.args.get('page', 1, type=int)
         per_page = 50
-        offset = (page - 1) * per_page
+        filters = {name: request.args.get(name, '').strip() for name in AUDIT_FILTERS}
+        active_filters = {name: value for name, value in filters.items() if value}
         
         try:
             with db.get_cursor(commit=False) as cur:
-                # Get total count
-                cur.execute("SELECT COUNT(*) FROM audit_log")
-                total_logs = cur.fetchone()[0]
+                clauses, binds = audit_filter_clauses(filters)
                 
-                # Get paginated logs
-                cur.execute("""
-                    SELECT audit_id, user_name, action, action_table, record_id,
-                           old_values, new_values, timestamp, status, ip_address
-                    FROM (
-                        SELECT a.*, ROW_NUMBER() OVER (ORDER BY timestamp DESC) as rn
-                        FROM audit_log a
-                    ) 
-                    WHERE rn > :offset AND rn <= :limit
-                """, {'offset': offset, 'limit': offset + per_page})
-                logs = cur.fetchall()
+                # Keyset page on (timestamp, audit_id)
+                result = fetch_page(cur, AUDIT_SELECT_SQL, clauses, binds,
+                                    'timestamp', 'audit_id', audit_row_key, per_page,
+                                    after=request.args.get('after'),
+                                    before=request.args.get('before'),
+                                    record=AuditEntry)
+                logs = result.rows
                 
-                has_next = total_logs > (page * per_page)
-                has_prev = page > 1
+                # Bounded count instead of COUNT(*) over the whole table
+                total_logs, total_kind = estimate_count(cur, 'audit_log', clauses, binds)
                 
         except oracledb.Error as err:
             flash(f'Error loading audit logs: {err}', 'danger')
             logs = []
-            has_next = False
-            has_prev = False
-            total_logs = 0
+            result = None
+            total_logs, total_kind = 0, 'exact'
             
         return render_template('admin/audit_logs.html',
                                logs=logs,
                                page=page,
-                               has_next=has_next,
-                               has_prev=has_prev,
-                               total_logs=total_logs)
+                               has_next=result.has_next if result else False,
+                               has_prev=result.has_prev if result else False,
+                               next_cursor=result.next_cursor if result else None,
+                               prev_cursor=result.prev_cursor if result else None,
+                               filters=filters,
+                               active_filters=active_filters,
+                               total_logs=total_logs,
+                               total_kind=total_kind)
+
+    @app.route('/audit/logs/export')
+    @query_budget(2)
+    @login_required
+    @role_required(['admin'])
+    def export_audit_logs():
+        """Stream the (optionally filtered) audit log as CSV or NDJSON"""
+        fmt = request.args.get('format', 'csv').lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f'Unsupported export format: {fmt}'}), 400
+        
+        filters = {name: request.args.get(name, '').strip() for name in EXPORT_FILTERS}
+        content_type = EXPORT_FORMATS[fmt][0]
+        filename = f"audit_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        
+        audit.log('EXPORT', 'AUDIT_LOG', new_values=json.dumps(dict(filters, format=fmt)))
+        rows = stream_audit_rows(db, filters, fmt, app.config['AUDIT_EXPORT_ARRAYSIZE'])
+        return Response(stream_with_context(rows),
+                        mimetype=content_type,
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
 
     @app.route('/admin/users')
+    @query_budget(3)
     @login_required
     @role_required(['admin'])
     def manage_users():
         """Admin interface to manage all users"""
         try:
             with db.get_cursor(commit=False) as cur:
-                cur.execute("""
-                    SELECT u.user_id, u.full_name, u.email, u.initial_role, u.created_at,
-                           (SELECT COUNT(*) FROM wills WHERE user_id = u.user_id) as wills_count,
-                           (SELECT COUNT(*) FROM executors WHERE email = u.email) as executor_count,
-                           (SELECT COUNT(*) FROM beneficiaries WHERE email = u.email) as beneficiary_count
-                    FROM users u
-                    ORDER BY u.created_at DESC
-                """)
-                users = cur.fetchall()
+                users = USER_ADMIN_LIST.all(cur)
         except oracledb.Error as err:
             flash(f'Error fetching users: {err}', 'danger')
             users = []
@@ -1270,33 +1134,24 @@ def create_app():
         return render_template('admin/users.html', users=users)
 
     @app.route('/admin/test-weekend-transfer')
+    @query_budget(6)
     @login_required
     @role_required(['admin'])
     def test_weekend_transfer():
         """Test weekend transfer blocking for demonstration"""
         try:
-            with db.get_cursor() as cur:
-                # First check if it's actually a weekend
-                cur.execute("SELECT TO_NUMBER(TO_CHAR(SYSDATE, 'D')) FROM dual")
-                day_number = cur.fetchone()[0]
-                is_weekend = day_number in [1, 7]  # 1=Sunday, 7=Saturday
-                
-                # Get day name for display
-                cur.execute("SELECT TO_CHAR(SYSDATE, 'Day') FROM dual")
-                day_name = cur.fetchone()[0].strip()
-                
-                if is_weekend:
-                    flash(f'🚫 Weekend Blocking Active: Today is {day_name}. Transfer restrictions are in effect as designed.', 'warning')
-                else:
+            today = datetime.now()
+            day_name = today.strftime('%A')
+            holiday_name = business_calendar.holiday_name(today)
+            
+            if business_calendar.is_weekend(today):
+                flash(f'🚫 Weekend Blocking Active: Today is {day_name}. Transfer restrictions are in effect as designed.', 'warning')
+            elif holiday_name:
+                flash(f'🚫 Holiday Blocking Active: Today is {holiday_name}. Transfer restrictions are in effect as designed.', 'warning')
+            else:
+                with db.get_cursor() as cur:
                     # Get any asset and beneficiary for testing
-                    cur.execute("""
-                        SELECT wab.asset_id, wab.beneficiary_id, a.name, b.full_name
-                        FROM will_asset_beneficiaries wab
-                        JOIN assets a ON wab.asset_id = a.asset_id
-                        JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
-                        WHERE ROWNUM = 1
-                    """)
-                    test_data = cur.fetchone()
+                    test_data = ALLOCATION_SAMPLE.one(cur)
                     
                     if test_data:
                         asset_id, beneficiary_id, asset_name, beneficiary_name = test_data
@@ -1315,45 +1170,43 @@ def create_app():
         return redirect(url_for('system_statistics'))
 
     @app.route('/api/weekend-check')
+    @query_budget(4)
     @login_required
     def check_weekend_status():
         """API endpoint to check if it's currently weekend"""
-        try:
-            with db.get_cursor() as cur:
-                cur.execute("""
-                    SELECT 
-                        TO_NUMBER(TO_CHAR(SYSDATE, 'D')) as day_number,
-                        TO_CHAR(SYSDATE, 'Day') as day_name,
-                        TO_CHAR(SYSDATE, 'DD-MON-YYYY') as date_str,
-                        CASE WHEN TO_NUMBER(TO_CHAR(SYSDATE, 'D')) IN (1, 7) 
-                             THEN 'true' 
-                             ELSE 'false' 
-                        END as is_weekend
-                    FROM dual
-                """)
-                result = cur.fetchone()
-                
-                return jsonify({
-                    'day_number': result[0],
-                    'day_name': result[1].strip(),
-                    'date': result[2],
-                    'is_weekend': result[3] == 'true',
-                    'status': 'Weekend transfers blocked' if result[3] == 'true' else 'Weekday transfers allowed'
-                })
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+        today = datetime.now()
+        is_weekend = business_calendar.is_weekend(today)
+        holiday_name = business_calendar.holiday_name(today)
+        
+        return jsonify({
+            'day_number': today.isoweekday() % 7 + 1,  # 1=Sunday ... 7=Saturday, as Oracle 'D'
+            'day_name': today.strftime('%A'),
+            'date': today.strftime('%d-%b-%Y').upper(),
+            'is_weekend': is_weekend,
+            'is_holiday': holiday_name is not None,
+            'holiday_name': holiday_name,
+            'next_business_day': business_calendar.next_business_day(today).isoformat(),
+            'status': ('Weekend transfers blocked' if is_weekend else
+                       'Holiday transfers blocked' if holiday_name else
+                       'Weekday transfers allowed')
+        })
 
     @app.context_processor
     def inject_template_vars():
         """Inject commonly used variables into all templates"""
+        # Runs for every render_template; keep it to one clock read
+        now = datetime.now()
         return {
-            'current_year': datetime.now().year,
+            'current_year': now.year,
             'app_version': '1.0.0',
-            'is_weekend': datetime.now().weekday() >= 5
+            'is_weekend': now.weekday() >= 5
         }
 
     @app.route('/logout')
+    @query_budget(0)
     def logout():
+        if 'user_id' in session:
+            audit.log('LOGOUT', 'USERS', session['user_id'])
         session.clear()
         flash('Logged out successfully.', 'info')
         return redirect(url_for('index'))
@@ -1369,71 +1222,188 @@ def create_app():
 
     # Additional utility routes
     @app.route('/health')
+    @query_budget(1)
     def health_check():
         """Simple health check endpoint"""
         try:
             with db.get_cursor(commit=False) as cur:
-                cur.execute("SELECT 1 FROM dual")
-                result = cur.fetchone()
-                if result:
+                if HEALTH_PING.scalar(cur):
                     return jsonify({'status': 'healthy', 'database': 'connected'}), 200
         except Exception as e:
             return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
 
+    @app.route('/api/wills')
+    @query_budget(4)
+    @login_required
+    def api_list_wills():
+        """API endpoint returning one keyset page of the wills list"""
+        params = ListParams(request.args, WILL_SORTS, 'created', app.config['LIST_PAGE_SIZE'])
+        try:
+            with db.get_cursor(commit=False) as cur:
+                result = wills_page(cur, params)
+        except oracledb.Error as err:
+            return jsonify({'error': str(err)}), 500
+        if result is None:
+            return jsonify({'error': 'You do not have permission to view wills.'}), 403
+        return jsonify(page_json(result, WILL_COLUMNS, params))
+
+    @app.route('/api/transfers')
+    @query_budget(3)
+    @login_required
+    @role_required(['executor', 'admin', 'testator'])
+    def api_list_transfers():
+        """API endpoint returning one keyset page of the transfers list"""
+        params = ListParams(request.args, TRANSFER_SORTS, 'date', app.config['LIST_PAGE_SIZE'])
+        try:
+            with db.get_cursor(commit=False) as cur:
+                result = transfers_page(cur, params)
+        except oracledb.Error as err:
+            return jsonify({'error': str(err)}), 500
+        return jsonify(page_json(result, TRANSFER_COLUMNS, params))
+
+    @app.route('/api/beneficiaries')
+    @query_budget(4)
+    @login_required
+    @role_required(['testator'])
+    def api_list_beneficiaries():
+        """API endpoint returning one keyset page of the beneficiaries list"""
+        params = ListParams(request.args, BENEFICIARY_SORTS, 'name', app.config['LIST_PAGE_SIZE'])
+        try:
+            with db.get_cursor(commit=False) as cur:
+                result = beneficiaries_page(cur, params)
+        except oracledb.Error as err:
+            return jsonify({'error': str(err)}), 500
+        return jsonify(page_json(result, BENEFICIARY_COLUMNS, params))
+
+    @app.route('/api/admin/pool-stats')
+    @query_budget(2)
+    @login_required
+    @role_required(['admin'])
+    def pool_statistics():
+        """API endpoint exposing connection pool usage for monitoring"""
+        return jsonify(db.pool_stats())
+
+    @app.route('/api/admin/statement-stats')
+    @query_budget(2)
+    @login_required
+    @role_required(['admin'])
+    def statement_statistics():
+        """API endpoint exposing per-statement execution totals of the SQL registry"""
+        return jsonify(statements.stats())
+
+    @app.route('/admin/metrics')
+    @query_budget(2)
+    @login_required
+    @role_required(['admin'])
+    def request_metrics_export():
+        """Per-endpoint request metrics in the Prometheus text format"""
+        pool = db.pool_stats()
+        gauges = {f'dwm_db_pool_{name}': value for name, value in pool.items()
+                  if isinstance(value, (int, float)) and not isinstance(value, bool)}
+        gauges.update((f'dwm_fragment_cache_{name}', value)
+                      for name, value in fragment_cache.stats().items())
+        return Response(request_metrics.render(gauges),
+                        mimetype='text/plain; version=0.0.4')
+
+    @app.route('/admin/slow-queries', methods=['GET', 'POST'])
+    @query_budget(2)
+    @login_required
+    @role_required(['admin'])
+    def slow_query_log():
+        """Slowest statement fingerprints by total time, and the latest slow statements"""
+        if request.method == 'POST':
+            slow_queries.reset()
+            flash('Slow-query statistics cleared.', 'info')
+            return redirect(url_for('slow_query_log'))
+        return render_template('admin/slow_queries.html',
+                               top=slow_queries.top(request.args.get('limit', 25, type=int)),
+                               recent=list(slow_queries.recent),
+                               threshold_ms=slow_queries.threshold * 1000,
+                               explain_plans=slow_queries.explain_plans)
+
     @app.route('/api/will/<int:will_id>/stats')
+    @query_budget(5)
     @login_required
+    @conditional_on_will
     def get_will_stats(will_id):
         """API endpoint to get will statistics"""
         try:
-            with db.get_cursor(commit=False) as cur:
-                cur.execute("""
-                    SELECT 
-                        COUNT(a.asset_id) as total_assets,
-                        NVL(SUM(a.value), 0) as total_value,
-                        COUNT(DISTINCT wab.beneficiary_id) as total_beneficiaries,
-                        AVG(CASE WHEN wab.share_percent IS NOT NULL THEN wab.share_percent ELSE 0 END) as avg_allocation
-                    FROM assets a
-                    LEFT JOIN will_asset_beneficiaries wab ON a.asset_id = wab.asset_id
-                    WHERE a.will_id = :will_id_param
-                """, {'will_id_param': will_id})
-                stats = cur.fetchone()
-                
-                if stats:
-                    return jsonify({
-                        'total_assets': stats[0],
-                        'total_value': float(stats[1]) if stats[1] else 0,
-                        'total_beneficiaries': stats[2],
-                        'avg_allocation': float(stats[3]) if stats[3] else 0
-                    })
-                else:
+            will = will_loader.load(will_id, version=current_will_version())
+        except oracledb.Error as err:
+            return jsonify({'error': str(err)}), 500
+        
+        if will is None:
+            return jsonify({'error': 'Will not found'}), 404
+        if not will.can_view(session.get('user_id'), session.get('user_email'),
+                             session.get('all_roles', [])):
+            return jsonify({'error': 'You do not have permission to view this will.'}), 403
+        
+        stats = will.stats()
+        return jsonify({
+            'total_assets': stats['total_assets'],
+            'total_value': stats['total_value'],
+            'total_beneficiaries': stats['total_beneficiaries'],
+            'avg_allocation': stats['avg_allocation']
+        })
+
+    @app.route('/api/wills/<int:will_id>/allocations', methods=['GET','POST'])
+    @query_budget(5)
+    @login_required
+    @role_required(['testator'])
+    def will_allocations(will_id):
+        """API endpoint to read or replace a will's whole allocation matrix"""
+        rows = []
+        if request.method == 'POST':
+            rows, errors = normalize_allocations(request.get_json(silent=True))
+            if errors:
+                return jsonify({'error': 'Invalid allocations', 'details': errors}), 400
+        
+        try:
+            with db.get_cursor() as cur:
+                status = WILL_OWNED_STATUS.scalar(cur, {'will_id_param': will_id,
+                                                        'user_id_param': session['user_id']})
+                if status is None:
                     return jsonify({'error': 'Will not found'}), 404
-                    
+                
+                if request.method == 'POST':
+                    if status == 'Executed':
+                        return jsonify({'error': 'Will already executed'}), 409
+                    success, error_msg = safe_execute_procedure(
+                        cur, 'allocation_pkg.allocate_will_assets',
+                        allocation_params(cur, will_id, rows))
+                    if not success:
+                        return jsonify({'error': error_msg}), 400
+                
+                matrix = load_allocations(cur, will_id)
         except oracledb.Error as err:
             return jsonify({'error': str(err)}), 500
+        
+        if request.method == 'POST':
+            dashboard_stats.invalidate(session['user_id'])
+            return jsonify({
+                'will_id': will_id,
+                'applied': len(rows),
+                'totals': {str(asset_id): total for asset_id, total in allocation_totals(rows).items()},
+                'allocations': matrix
+            })
+        return jsonify({'will_id': will_id, 'allocations': matrix})
 
     @app.route('/api/beneficiary/<int:beneficiary_id>/assets')
+    @query_budget(3)
     @login_required
     def get_beneficiary_assets(beneficiary_id):
         """API endpoint to get assets for a specific beneficiary"""
         try:
             with db.get_cursor(commit=False) as cur:
-                cur.execute("""
-                    SELECT a.asset_id, a.name, a.asset_type, a.value, wab.share_percent,
-                           (a.value * wab.share_percent / 100) as inheritance_value
-                    FROM will_asset_beneficiaries wab
-                    JOIN assets a ON wab.asset_id = a.asset_id
-                    WHERE wab.beneficiary_id = :ben_id_param
-                    ORDER BY a.name
-                """, {'ben_id_param': beneficiary_id})
-                assets = cur.fetchall()
+                assets = BENEFICIARY_ASSETS.all(cur, {'ben_id_param': beneficiary_id})
                 
                 return jsonify([{
-                    'asset_id': asset[0],
-                    'name': asset[1],
-                    'type': asset[2],
-                    'total_value': float(asset[3]) if asset[3] else 0,
-                    'share_percent': float(asset[4]) if asset[4] else 0,
-                    'inheritance_value': float(asset[5]) if asset[5] else 0
+                    'asset_id': asset.asset_id,
+                    'name': asset.name,
+                    'type': asset.asset_type,
+                    'total_value': asset.value or 0,
+                    'share_percent': asset.share_percent or 0,
+                    'inheritance_value': asset.inheritance_value or 0
                 } for asset in assets])
                 
         except oracledb.Error as err:
@@ -0,0 +1,142 @@
+# benchmarks/bench_records.py
+
+"""Memory and render time of row records against positional tuples.
+
+Builds ``--rows`` rows of the transfers list two ways, as the tuples the
+driver returns by default and as ``Transfer`` records made by the row
+factory, and reports for each:
+
+  build_ms    time to fetch the rows, column values included
+  kib         memory held by the rows (tracemalloc, after fetching)
+  render_ms   median time to render a table of them, over ``--renders`` runs
+
+The tuple rows are rendered by an index-style template (``transfer[9]``),
+the records by the same template written with attributes
+(``transfer.transfer_value``). Results are printed as a table and written
+as JSON (``--output``).
+
+Usage: python benchmarks/bench_records.py [--rows N] [--renders N]
+       [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jinja2 import Environment  # noqa: E402
+from database.transfers import Transfer  # noqa: E402
+
+ROW_TEMPLATES = {
+    'tuples': """{% for transfer in transfers %}
+<tr><td>{{ transfer[1] }}</td><td>{{ transfer[2] }}</td>
+<td>{{ transfer[3].strftime('%b %d, %Y') if transfer[3] else 'N/A' }}</td>
+<td>{% if transfer[9] %}RWF {{ "{:,.0f}".format(transfer[9]) }} ({{ transfer[8] }}%){% endif %}</td>
+<td>{{ transfer[4] }}</td><td>{{ transfer[5] or '-' }}</td></tr>
+{% endfor %}""",
+    'records': """{% for transfer in transfers %}
+<tr><td>{{ transfer.asset_name }}</td><td>{{ transfer.beneficiary_name }}</td>
+<td>{{ transfer.transfer_date.strftime('%b %d, %Y') if transfer.transfer_date else 'N/A' }}</td>
+<td>{% if transfer.transfer_value %}RWF {{ "{:,.0f}".format(transfer.transfer_value) }} ({{ transfer.share_percent }}%){% endif %}</td>
+<td>{{ transfer.transfer_status }}</td><td>{{ transfer.approved_by or '-' }}</td></tr>
+{% endfor %}""",
+}
+
+ROW_TYPES = {
+    'tuples':  lambda *row: row,
+    'records': Transfer,
+}
+
+
+def fetched_rows(count, seed):
+    """Column values as the driver hands them to a row factory, NUMBERs as Decimal."""
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    for n in range(count):
+        value = Decimal(rng.randrange(100000, 50000000))
+        share = Decimal(rng.choice(('10', '25', '33.5', '50', '100')))
+        yield (n + 1, f'Asset {n}', f'Beneficiary {n % 97}',
+               started + timedelta(hours=n), rng.choice(('Initiated', 'Completed')),
+               rng.choice((None, 'Executor')), None, value, share, value * share / 100)
+
+
+def build(kind, count, seed):
+    """Fetch ``count`` rows as ``kind``; return them with the build time and bytes held.
+
+    Column values are made inside the measurement, as the driver makes
+    them, so the tuples are charged for the Decimals they keep and the
+    records only for the floats they convert them to.
+    """
+    make = ROW_TYPES[kind]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        rows = [make(*values) for values in fetched_rows(count, seed)]
+        elapsed = time.perf_counter() - started
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return rows, elapsed, held
+
+
+def render(kind, rows, renders):
+    template = Environment(autoescape=True).from_string(ROW_TEMPLATES[kind])
+    template.render(transfers=rows)   # warm up
+    timings = []
+    for _ in range(renders):
+        started = time.perf_counter()
+        template.render(transfers=rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--renders', type=int, default=10, help='timed renders per row type')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {
+        'config': {'rows': args.rows, 'renders': args.renders,
+                   'python': platform.python_version()},
+        'rows': {},
+    }
+
+    print(f"{'rows':<10}{'build_ms':>10}{'KiB':>10}{'B/row':>8}{'render_ms':>11}", file=sys.stderr)
+    for kind in ROW_TYPES:
+        rows, built, held = build(kind, args.rows, args.seed)
+        result = results['rows'][kind] = {
+            'build_ms':  round(built * 1000, 3),
+            'kib':       round(held / 1024, 1),
+            'bytes_row': round(held / args.rows, 1),
+            'render_ms': round(render(kind, rows, args.renders) * 1000, 3),
+        }
+        print(f"{kind:<10}{result['build_ms']:>10.2f}{result['kib']:>10.1f}"
+              f"{result['bytes_row']:>8.1f}{result['render_ms']:>11.2f}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+# benchmarks/bench_routes.py
+
+"""Load test of the hot routes against the in-memory Oracle stand-in.
+
+The app is built with ``create_app()``; its pool is a ``FakePool`` answered
+by ``benchmarks/standin.py``, seeded to the requested size. Every route is
+driven through the Flask test client as a random signed-in user and
+reported with:
+
+  p50/p95/p99/mean   latency in ms
+  queries            statements per request (including audit writes)
+  standin_ms         time the stand-in spent answering, per request
+  alloc_kib          peak memory allocated per request (tracemalloc)
+  rps                requests per second over all threads
+
+Injected ``--latency-ms`` is slept per statement to stand in for the
+network and the server. Results are printed as a table and written as
+JSON (``--output``); ``--baseline`` compares them with an earlier run and
+exits with status 1 on regressions.
+
+Usage: python benchmarks/bench_routes.py [--users N] [--iterations N]
+       [--threads N] [--latency-ms MS] [--routes login,wills,...]
+       [--output results.json] [--baseline results.json]
+
+Run from any directory. Passwords are hashed with a cheap method by
+default so ``login`` measures the route, not the hash; pass
+``--hash-method`` with the production method to include it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from database.connection import db  # noqa: E402
+from database.roles import roles, RoleResolver  # noqa: E402
+from database.dashboard import dashboard_stats  # noqa: E402
+from database.wills import will_loader  # noqa: E402
+from database.holidays import business_calendar  # noqa: E402
+from templating import fragment_cache  # noqa: E402
+from standin import StandIn, StandInData, PASSWORD  # noqa: E402
+
+# name -> (method, path, who is signed in)
+ROUTES = {
+    'login':      ('POST', '/login', None),
+    'dashboard':  ('GET', '/dashboard', 'user'),
+    'wills':      ('GET', '/wills', 'user'),
+    'will':       ('GET', '/wills/{will_id}', 'user'),
+    'transfers':  ('GET', '/transfers', 'user'),
+    'audit_logs': ('GET', '/audit/logs', 'admin'),
+}
+
+# Relative p95 growth and absolute growth in queries that count as regressions
+DEFAULT_TOLERANCE = 0.2
+
+
+def sign_in(client, data, user):
+    primary_role, all_roles = RoleResolver.roles_from_flags(*data.roles_of(user[0]))
+    with client.session_transaction() as session:
+        session.update({
+            'user_id':      user[0],
+            'user_name':    user[1],
+            'user_email':   user[2],
+            'user_role':    primary_role,
+            'all_roles':    all_roles,
+            'role_version': data.role_version(user[0]),
+        })
+
+
+def prepare(route, client, data, rng):
+    """Set up the session for one request of ``route``; return ``(method, path, kwargs)``."""
+    method, path, who = route
+    if who is None:
+        user = rng.choice(data.users)
+        return method, path, {'data': {'email': user[2], 'password': PASSWORD}}
+    user = data.users[0] if who == 'admin' else rng.choice(data.users[1:])
+    sign_in(client, data, user)
+    if '{will_id}' in path:
+        path = path.format(will_id=rng.choice(data.wills_by_user[user[0]])[0])
+    return method, path, {}
+
+
+def clear_caches():
+    roles.cache.clear()
+    roles.versions.clear()
+    dashboard_stats.cache.clear()
+    will_loader.cache.clear()
+    business_calendar.invalidate()
+    fragment_cache.clear()
+
+
+def drive(app, standin, name, iterations, seed, cold, samples):
+    """Run ``iterations`` requests of ``name`` on one client, appending to ``samples``."""
+    client = app.test_client()
+    rng = random.Random(seed)
+    for _ in range(iterations):
+        method, path, kwargs = prepare(ROUTES[name], client, standin.data, rng)
+        if cold:
+            clear_caches()
+        standin.reset_counters()
+        started = time.perf_counter()
+        try:
+            status = client.open(path, method=method, **kwargs).status_code
+        except Exception as err:  # the error page itself failed
+            status = f'error: {err.__class__.__name__}'
+        elapsed = time.perf_counter() - started
+        statements, answering = standin.counters()
+        samples.append((elapsed, statements, answering, status))
+
+
+def allocations(app, standin, name, iterations, seed, cold):
+    """Median peak KiB allocated per request, over ``iterations`` requests."""
+    client = app.test_client()
+    rng = random.Random(seed)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            method, path, kwargs = prepare(ROUTES[name], client, standin.data, rng)
+            if cold:
+                clear_caches()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                client.open(path, method=method, **kwargs)
+            except Exception:
+                pass  # reported by drive()
+            peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return statistics.median(peaks)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def bench(app, standin, name, args):
+    drive(app, standin, name, args.warmup, args.seed, args.cold, [])
+
+    samples = []
+    per_thread = max(1, args.iterations // args.threads)
+    threads = [threading.Thread(target=drive, args=(app, standin, name, per_thread,
+                                                    args.seed + n, args.cold, samples))
+               for n in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    return {
+        'method':     ROUTES[name][0],
+        'path':       ROUTES[name][1],
+        'requests':   len(samples),
+        'statuses':   sorted({str(sample[3]) for sample in samples}),
+        'p50_ms':     round(percentile(latencies, 0.50), 3),
+        'p95_ms':     round(percentile(latencies, 0.95), 3),
+        'p99_ms':     round(percentile(latencies, 0.99), 3),
+        'mean_ms':    round(statistics.mean(latencies), 3),
+        'queries':    round(statistics.mean(sample[1] for sample in samples), 2),
+        'standin_ms': round(statistics.mean(sample[2] for sample in samples) * 1000, 3),
+        'alloc_kib':  round(allocations(app, standin, name, args.alloc_iterations,
+                                        args.seed, args.cold), 1),
+        'rps':        round(len(samples) / wall, 1),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    found = []
+    for name, route in results['routes'].items():
+        base = baseline.get('routes', {}).get(name)
+        if base is None:
+            continue
+        if route['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            found.append(f"{name}: p95 {base['p95_ms']} -> {route['p95_ms']} ms")
+        if route['queries'] > base['queries']:
+            found.append(f"{name}: queries {base['queries']} -> {route['queries']}")
+    return found
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--wills-per-user', type=int, default=2)
+    parser.add_argument('--assets-per-will', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=300, help='requests per route')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per route')
+    parser.add_argument('--alloc-iterations', type=int, default=20,
+                        help='requests per route traced for allocations')
+    parser.add_argument('--threads', type=int, default=1, help='concurrent clients')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='injected per statement')
+    parser.add_argument('--pool-max', type=int, help='ORACLE_POOL_MAX override')
+    parser.add_argument('--routes', default=','.join(ROUTES),
+                        help=f"comma separated, from {', '.join(ROUTES)}")
+    parser.add_argument('--cold', action='store_true', help='clear in-process caches before each request')
+    parser.add_argument('--env', default='production', help='FLASK_ENV of the app')
+    parser.add_argument('--hash-method', default='pbkdf2:sha256:1000')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='relative p95 growth allowed against --baseline')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    names = [name.strip() for name in args.routes.split(',') if name.strip()]
+    unknown = [name for name in names if name not in ROUTES]
+    if unknown:
+        sys.exit(f"Unknown routes: {', '.join(unknown)}")
+
+    data = StandInData(users=args.users, wills_per_user=args.wills_per_user,
+                       assets_per_will=args.assets_per_will, seed=args.seed,
+                       hash_method=args.hash_method)
+    standin = StandIn(data)
+    db.pooled = True
+    db.pool_factory = standin.pool_factory(latency=args.latency_ms / 1000)
+    if args.pool_max:
+        db.pool_params['max'] = args.pool_max
+
+    os.environ['FLASK_ENV'] = args.env
+    app = create_app()
+    app.config['SESSION_COOKIE_SECURE'] = False   # the test client talks plain http
+
+    results = {
+        'config': {
+            'users': args.users, 'wills': len(data.wills), 'assets': len(data.assets),
+            'transfers': len(data.transfers), 'audit_rows': len(data.audit),
+            'iterations': args.iterations, 'threads': args.threads,
+            'latency_ms': args.latency_ms, 'pool_max': db.pool_params['max'],
+            'cold': args.cold, 'env': args.env, 'hash_method': args.hash_method,
+            'python': platform.python_version(),
+        },
+        'routes': {},
+    }
+
+    print(f"{'route':<12}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'standin':>9}"
+          f"{'alloc KiB':>11}{'rps':>9}", file=sys.stderr)
+    for name in names:
+        route = results['routes'][name] = bench(app, standin, name, args)
+        print(f"{name:<12}{route['p50_ms']:>9.2f}{route['p95_ms']:>9.2f}{route['p99_ms']:>9.2f}"
+              f"{route['queries']:>9.2f}{route['standin_ms']:>9.2f}{route['alloc_kib']:>11.1f}"
+              f"{route['rps']:>9.1f}", file=sys.stderr)
+
+    results['pool'] = db.pool_stats()
+    results['unanswered'] = sorted(standin.unanswered)
+    if standin.unanswered:
+        print(f"{len(standin.unanswered)} statement(s) not answered by the stand-in, "
+              f"see 'unanswered'", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
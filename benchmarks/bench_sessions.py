@@ -0,0 +1,118 @@
+# benchmarks/bench_sessions.py
+
+"""Compare the session backends of session_store.py.
+
+Each backend serves the payload a signed-in user carries (id, name, email,
+role, all roles) through the app's session interface:
+
+  read   open the session from the request cookie
+  write  open it, change the active role and save it
+
+Usage: python benchmarks/bench_sessions.py [iterations] [backend ...]
+Run from the repository root. The redis backend is skipped when the
+``redis`` package or server is unavailable.
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from config import DevelopmentConfig  # noqa: E402
+from session_store import SESSION_BACKENDS, init_session  # noqa: E402
+
+PAYLOAD = {
+    'user_id':   42,
+    'user_name': 'Jean Claude Habimana',
+    'user_email': 'jean.claude@example.rw',
+    'user_role': 'testator',
+    'all_roles': ['testator', 'executor', 'beneficiary'],
+}
+
+
+def make_app(backend, file_dir):
+    app = Flask(__name__)
+    app.config.from_object(DevelopmentConfig)
+    app.config.update(SESSION_BACKEND=backend, SESSION_FILE_DIR=file_dir)
+    init_session(app)
+    return app
+
+
+def session_cookie(app):
+    """Cookie header of a freshly saved signed-in session."""
+    interface = app.session_interface
+    with app.test_request_context('/'):
+        from flask import request
+        session = interface.open_session(app, request)
+        session.update(PAYLOAD)
+        response = app.response_class()
+        interface.save_session(app, session, response)
+    return response.headers['Set-Cookie'].split(';', 1)[0]
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def bench(backend, iterations, file_dir):
+    app = make_app(backend, file_dir)
+    interface = app.session_interface
+    cookie = session_cookie(app)
+    roles = ['executor', 'testator']
+
+    def read():
+        with app.test_request_context('/', headers={'Cookie': cookie}):
+            from flask import request
+            session = interface.open_session(app, request)
+            assert session['user_id'] == 42
+
+    def write():
+        with app.test_request_context('/', headers={'Cookie': cookie}):
+            from flask import request
+            session = interface.open_session(app, request)
+            session['user_role'] = roles[len(session['user_role']) % 2]
+            interface.save_session(app, session, app.response_class())
+
+    return timed(read, iterations), timed(write, iterations)
+
+
+def baseline(iterations):
+    """Cost of the request context alone, subtracted from every result."""
+    app = Flask(__name__)
+    return timed(lambda: app.test_request_context('/').__enter__().pop(), iterations)[0]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    backends = sys.argv[2:] or list(SESSION_BACKENDS)
+    file_dir = tempfile.mkdtemp(prefix='bench_sessions_')
+    overhead = baseline(iterations)
+    print(f"{'backend':<12}{'read mean':>12}{'read p95':>12}{'write mean':>12}{'write p95':>12}")
+    print(f"(µs per operation over {iterations} iterations, request context overhead "
+          f"of {overhead:.1f} µs subtracted)")
+    try:
+        for backend in backends:
+            try:
+                (r_mean, r_p95), (w_mean, w_p95) = bench(backend, iterations, file_dir)
+            except Exception as err:  # redis not installed or not running
+                print(f"{backend:<12}skipped: {err}")
+                continue
+            print(f"{backend:<12}{r_mean - overhead:>12.1f}{r_p95 - overhead:>12.1f}"
+                  f"{w_mean - overhead:>12.1f}{w_p95 - overhead:>12.1f}")
+    finally:
+        shutil.rmtree(file_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
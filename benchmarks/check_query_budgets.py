@@ -0,0 +1,84 @@
+# benchmarks/check_query_budgets.py
+
+"""Check the ``@query_budget`` of every view.
+
+Every route must declare a budget. The routes below are then driven
+against the in-memory stand-in (see standin.py) with the in-process caches
+cleared before each request, so every cache miss is paid, and the most
+statements each view ran is compared with its budget.
+
+Usage: python benchmarks/check_query_budgets.py [users] [iterations]
+Exits with status 1 when a route has no budget or went over it.
+"""
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import request  # noqa: E402
+from app import create_app  # noqa: E402
+from database.connection import db  # noqa: E402
+from metrics import request_metrics  # noqa: E402
+from standin import StandIn, StandInData  # noqa: E402
+from bench_routes import ROUTES, prepare, clear_caches  # noqa: E402
+
+# Driven on top of the benchmark routes: name -> (method, path, who is signed in)
+CHECKED = dict(ROUTES, **{
+    'api_wills':     ('GET', '/api/wills', 'user'),
+    'api_transfers': ('GET', '/api/transfers', 'user'),
+    'will_summary':  ('GET', '/reports/will-summary/{will_id}', 'user'),
+    'will_stats':    ('GET', '/api/will/{will_id}/stats', 'user'),
+    'weekend_check': ('GET', '/api/weekend-check', 'user'),
+    'users':         ('GET', '/admin/users', 'admin'),
+})
+
+
+def missing_budgets(app):
+    return sorted(endpoint for endpoint, view in app.view_functions.items()
+                  if endpoint != 'static' and not hasattr(view, 'query_budget'))
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    standin = StandIn(StandInData(users=users))
+    db.pooled = True
+    db.pool_factory = standin.pool_factory()
+    app = create_app()
+
+    used = {}   # endpoint -> most statements seen
+
+    @app.after_request
+    def capture(response):
+        stats = request_metrics.current()
+        if stats is not None and request.endpoint:
+            used[request.endpoint] = max(used.get(request.endpoint, 0), stats.statements)
+        return response
+
+    client = app.test_client()
+    rng = random.Random(42)
+    for route in CHECKED.values():
+        for _ in range(iterations):
+            method, path, kwargs = prepare(route, client, standin.data, rng)
+            clear_caches()
+            client.open(path, method=method, **kwargs)
+
+    failures = [f'{endpoint}: no @query_budget' for endpoint in missing_budgets(app)]
+    print(f"{'endpoint':<26}{'budget':>8}{'used':>8}")
+    for endpoint, statements in sorted(used.items()):
+        budget = app.view_functions[endpoint].query_budget[0]
+        flag = '' if statements <= budget else '  OVER'
+        print(f"{endpoint:<26}{budget:>8}{statements:>8}{flag}")
+        if flag:
+            failures.append(f'{endpoint}: {statements} statements, budget {budget}')
+    for line in failures:
+        print(f"FAIL {line}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
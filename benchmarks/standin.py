@@ -0,0 +1,638 @@
+# benchmarks/standin.py
+
+"""In-memory stand-in for the Oracle schema, for benchmarks.
+
+``StandInData`` seeds users, wills, assets, beneficiaries, allocations,
+executors, transfers and audit rows shaped like
+``database/sql/sample_data_tue_27066_japhet_digitalwill_db.sql`` (names,
+asset types and values, relations, allocation splits), scaled to any
+number of users.
+
+``StandIn`` answers the statements of every route from that data. It is
+the ``responder`` of a ``database.fake.FakePool``, so requests still go
+through the real ``db.get_cursor()`` and connection pool::
+
+    standin = StandIn(StandInData(users=500))
+    db.pool_factory = standin.pool_factory(latency=0.001)
+
+Lists honour their clauses, search, sort and keyset position; audit log
+filters are ignored. Inserts and procedure calls are acknowledged but
+leave the data as seeded. Statements it does not know return no rows and
+are listed in ``standin.unanswered``.
+"""
+
+import os
+import re
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+
+from database.fake import FakePool, FakeResult
+from database.statements import (
+    USER_EMAIL_TAKEN, USER_INSERT, USER_ADMIN_LIST, WILL_INSERT, WILL_OWNED_STATUS,
+    ASSET_ADD, ASSET_BY_ID, ASSET_ALLOCATED_PERCENT, ASSET_ALLOCATIONS, ASSET_BENEFICIARIES,
+    ALLOCATION_SAMPLE, BENEFICIARY_CHOICES, BENEFICIARY_INSERT, BENEFICIARY_MY_ASSETS,
+    BENEFICIARY_ASSETS, EXECUTOR_COUNT, EXECUTOR_INSERT, HEALTH_PING
+)
+from database.roles import ROLE_FLAGS_SQL, ROLE_VERSION_SQL
+from database.dashboard import ROLE_STATS_SQL
+from database.wills import (
+    WILL_PAGE_SQL, WILL_COLUMNS, WILL_SORTS, WILL_HEADER_SQL, WILL_DETAIL_SQL
+)
+from database.transfers import (
+    TRANSFER_LIST_SQL, TRANSFER_COLUMNS, TRANSFER_SORTS, TRANSFER_INVOLVED_CLAUSE,
+    WILL_ACCESS_SQL, PENDING_TRANSFERS_SQL
+)
+from database.beneficiaries import (
+    BENEFICIARY_PAGE_SQL, BENEFICIARY_COLUMNS, BENEFICIARY_SORTS, BENEFICIARY_TOTALS_SQL
+)
+from database.assets import ASSET_INSERT_SQL
+from database.allocations import ALLOCATIONS_SQL
+from database.system_stats import COUNTERS_SQL, RECENT_ACTIVITY_SQL, STATUS_PREFIX
+from database.audit import AUDIT_SELECT_SQL, AUDIT_INSERT_SQL
+from database.holidays import HOLIDAYS_SQL, VERSION_SQL as HOLIDAYS_VERSION_SQL
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'database', 'sql', 'sample_data_tue_27066_japhet_digitalwill_db.sql')
+
+PASSWORD = 'benchmark'
+
+INSERT_RE = re.compile(r"INSERT INTO (\w+)\s*\(([^)]*)\)\s*VALUES\s*\((.*?)\);", re.S | re.I)
+VALUE_RE = re.compile(r"'(?:[^']|'')*'|TO_DATE\([^)]*\)|SYSDATE(?:\s*-\s*\d+)?|-?\d+(?:\.\d+)?|NULL", re.I)
+ASSIGN_RE = re.compile(r"assign_asset_to_beneficiary\((\d+),\s*(\d+),\s*(\d+)")
+ORDER_RE = re.compile(r"ORDER BY (\S+) (ASC|DESC) NULLS (?:FIRST|LAST), \S+ (?:ASC|DESC)\s+FETCH FIRST :k_limit")
+
+# Row index of each column lists can be searched on
+WILL_SEARCH_INDEXES = (1, 2)            # title, description
+TRANSFER_SEARCH_INDEXES = (1, 2, 6)     # asset name, beneficiary name, notes
+BENEFICIARY_SEARCH_INDEXES = (1, 2, 3)  # name, relation, email
+AUDIT_SORT = {'timestamp': 7}
+
+# Statements and procedures that change data; acknowledged with no rows
+WRITES = (USER_INSERT.sql, WILL_INSERT.sql, ASSET_ADD.sql, ASSET_INSERT_SQL,
+          BENEFICIARY_INSERT.sql, EXECUTOR_INSERT.sql)
+PROCEDURES = ('approve_will', 'assign_asset_to_beneficiary', 'transfer_asset', 'add_document',
+              'set_primary_executor', 'delete_draft_will', 'allocation_pkg.allocate_will_assets')
+
+
+def _sql_value(token):
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    upper = token.upper()
+    if upper.startswith('TO_DATE'):
+        return datetime.strptime(re.search(r"'([^']*)'", token).group(1), '%Y-%m-%d')
+    if upper.startswith('SYSDATE'):
+        days = re.search(r"\d+", token)
+        return datetime.now() - timedelta(days=int(days.group())) if days else datetime.now()
+    if upper == 'NULL':
+        return None
+    return float(token) if '.' in token else int(token)
+
+
+def sample_shapes(path=SAMPLE_DATA):
+    """Rows of the sample data script: ``{table: [row dict, ...]}``.
+
+    Allocations (made through ``assign_asset_to_beneficiary`` calls) come
+    back under ``'shares'`` as the list of share percentages of each asset.
+    """
+    with open(path, encoding='utf-8') as f:
+        script = f.read()
+    tables = {}
+    for table, columns, values in INSERT_RE.findall(script):
+        names = [name.strip().lower() for name in columns.split(',')]
+        row = dict(zip(names, (_sql_value(v) for v in VALUE_RE.findall(values))))
+        rows = tables.setdefault(table.lower(), [])
+        if row not in rows:
+            rows.append(row)
+    shares = {}
+    for asset_id, _, share in ASSIGN_RE.findall(script):
+        shares.setdefault(asset_id, []).append(int(share))
+    tables['shares'] = list(shares.values())
+    return tables
+
+
+class StandInData:
+    """Seeded tables, as tuples in the column order of the app's queries.
+
+    Every user is a testator with ``wills_per_user`` wills of
+    ``assets_per_will`` assets; the executors of a will and most of the
+    beneficiaries are other users, so executor and beneficiary roles occur
+    as they would in production. User 1 is an admin.
+    """
+
+    def __init__(self, users=200, wills_per_user=2, assets_per_will=5,
+                 transfer_ratio=0.3, audit_per_user=20, seed=42,
+                 hash_method='pbkdf2:sha256:1000', path=SAMPLE_DATA):
+        shapes = sample_shapes(path)
+        rng = random.Random(seed)
+        now = datetime.now().replace(microsecond=0)
+        password_hash = generate_password_hash(PASSWORD, method=hash_method)
+
+        self.users = []           # (user_id, full_name, email, password_hash, initial_role)
+        self.wills = []           # (will_id, user_id, title, description, status, created_at, last_updated_at, scn)
+        self.assets = []          # (asset_id, will_id, name, description, asset_type, value, location)
+        self.beneficiaries = []   # (beneficiary_id, full_name, relation, email)
+        self.allocations = []     # (asset_id, beneficiary_id, share_percent, conditions)
+        self.executors = []       # (executor_id, will_id, full_name, email, phone_number, relation, is_primary)
+        self.transfers = []       # (transfer_id, asset_id, beneficiary_id, transfer_date, status, approved_by, notes)
+        self.audit = []           # (audit_id, user_name, action, action_table, record_id, old, new, timestamp, status, ip)
+        self.holidays = [(row['holiday_date'], row['description'], row.get('is_recurring', 'N'))
+                         for row in shapes['holidays']]
+
+        sample_users = shapes['users']
+        for user_id in range(1, users + 1):
+            template = sample_users[(user_id - 1) % len(sample_users)]
+            name = f"{template['full_name']} {user_id}"
+            email = f"user{user_id}.{template['email']}"
+            self.users.append((user_id, name, email, password_hash,
+                               'admin' if user_id == 1 else 'testator'))
+
+        for n in range(users):
+            beneficiary = shapes['beneficiaries'][n % len(shapes['beneficiaries'])]
+            # Two thirds of the beneficiaries hold an account
+            email = self.users[(n * 7 + 3) % users][2] if n % 3 else f"heir{n + 1}@example.rw"
+            self.beneficiaries.append((n + 1, f"{beneficiary['full_name']} {n + 1}",
+                                       beneficiary['relation'], email))
+
+        sample_wills = shapes['wills']
+        sample_assets = shapes['assets']
+        sample_executors = shapes['executors']
+        for user_id, *_ in self.users:
+            for _ in range(wills_per_user):
+                template = sample_wills[len(self.wills) % len(sample_wills)]
+                will_id = len(self.wills) + 1
+                created = now - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86399))
+                updated = created + timedelta(days=rng.randint(0, 30))
+                self.wills.append((will_id, user_id, template['title'], template.get('description'),
+                                   rng.choice(('Draft', 'Draft', 'Approved', 'Executed')),
+                                   created, updated, will_id * 1000))
+
+                for number in range(1 + (will_id % 2)):
+                    executor = sample_executors[(will_id + number) % len(sample_executors)]
+                    email = self.users[(user_id + number * 11) % users][2]
+                    self.executors.append((len(self.executors) + 1, will_id, executor['full_name'],
+                                           email, executor.get('phone_number'),
+                                           executor.get('relation'), 'Y' if number == 0 else 'N'))
+
+                for _ in range(assets_per_will):
+                    asset = sample_assets[len(self.assets) % len(sample_assets)]
+                    asset_id = len(self.assets) + 1
+                    self.assets.append((asset_id, will_id, asset['name'], asset.get('description'),
+                                        asset['asset_type'],
+                                        round(asset['value'] * rng.uniform(0.5, 1.5), -3),
+                                        asset.get('location')))
+                    shares = shapes['shares'][asset_id % len(shapes['shares'])]
+                    heirs = rng.sample(range(1, users + 1), min(len(shares), users))
+                    for beneficiary_id, share in zip(heirs, shares):
+                        self.allocations.append((asset_id, beneficiary_id, share, None))
+                        if rng.random() < transfer_ratio:
+                            self.transfers.append((
+                                len(self.transfers) + 1, asset_id, beneficiary_id,
+                                updated + timedelta(days=rng.randint(1, 60)),
+                                rng.choice(('Initiated', 'Completed', 'Completed')),
+                                self.users[(user_id + 11) % users][2], None))
+
+        actions = ('LOGIN', 'CREATE', 'UPDATE', 'VIEW', 'DELETE')
+        tables = ('USERS', 'WILLS', 'ASSETS', 'BENEFICIARIES', 'TRANSFER_LOGS')
+        for audit_id in range(1, users * audit_per_user + 1):
+            user = self.users[rng.randrange(users)]
+            self.audit.append((audit_id, user[2], rng.choice(actions), rng.choice(tables),
+                               rng.randint(1, len(self.wills)), None, None,
+                               now - timedelta(seconds=audit_id * 97), 'SUCCESS', '127.0.0.1'))
+        self.audit.reverse()
+
+        self._index()
+
+    def _index(self):
+        self.user_by_id = {row[0]: row for row in self.users}
+        self.user_by_email = {row[2]: row for row in self.users}
+        self.will_by_id = {row[0]: row for row in self.wills}
+        self.asset_by_id = {row[0]: row for row in self.assets}
+        self.beneficiary_by_id = {row[0]: row for row in self.beneficiaries}
+        self.wills_by_user = _group(self.wills, 1)
+        self.assets_by_will = _group(self.assets, 1)
+        self.executors_by_will = _group(self.executors, 1)
+        self.allocations_by_asset = _group(self.allocations, 0)
+        self.transfers_by_will = {}
+        for row in self.transfers:
+            self.transfers_by_will.setdefault(self.asset_by_id[row[1]][1], []).append(row)
+        self.wills_by_executor = {}
+        for row in self.executors:
+            self.wills_by_executor.setdefault(row[3], set()).add(row[1])
+        self.beneficiary_ids_by_email = {}
+        for row in self.beneficiaries:
+            self.beneficiary_ids_by_email.setdefault(row[3], set()).add(row[0])
+
+    def role_version(self, user_id):
+        """``users.role_version``; the seeded data never changes roles."""
+        return 0 if user_id in self.user_by_id else None
+
+    def roles_of(self, user_id):
+        """``(initial_role, is_testator, is_executor, is_beneficiary)``."""
+        user = self.user_by_id.get(user_id)
+        if user is None:
+            return None, 0, 0, 0
+        email = user[2]
+        return (user[4], int(user_id in self.wills_by_user),
+                int(email in self.wills_by_executor), int(email in self.beneficiary_ids_by_email))
+
+
+def _group(rows, index):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[index], []).append(row)
+    return groups
+
+
+class StandIn:
+    """Answers the app's statements from a ``StandInData``."""
+
+    def __init__(self, data):
+        self.data = data
+        self.unanswered = set()
+        self._local = threading.local()
+        self._sorted = {}
+        self._handlers = [
+            (lambda sql: sql == ROLE_FLAGS_SQL, self._role_flags),
+            (lambda sql: sql == ROLE_VERSION_SQL, self._role_version),
+            (lambda sql: 'password_hash' in sql and sql.lstrip().startswith('SELECT'), self._login),
+            (lambda sql: sql == AUDIT_INSERT_SQL, lambda sql, binds: []),
+            (lambda sql: sql in WRITES or sql in PROCEDURES, lambda sql, binds: []),
+            (lambda sql: sql == 'transfer_pkg.execute_will_transfers', self._execute_transfers),
+            (lambda sql: sql == USER_EMAIL_TAKEN.sql, self._email_taken),
+            (lambda sql: sql == USER_ADMIN_LIST.sql, self._admin_users),
+            (lambda sql: sql == HEALTH_PING.sql, lambda sql, binds: [(1,)]),
+            (lambda sql: sql in ROLE_STATS_SQL.values(), self._dashboard),
+            (lambda sql: sql.startswith(WILL_PAGE_SQL), self._will_page),
+            (lambda sql: 'SUM(is_asset)' in sql, self._will_counts),
+            (lambda sql: 'AS is_executor' in sql and 'ORA_ROWSCN' in sql, self._will_version),
+            (lambda sql: sql == WILL_HEADER_SQL, self._will_header),
+            (lambda sql: sql == WILL_DETAIL_SQL, self._will_detail),
+            (lambda sql: sql == WILL_OWNED_STATUS.sql, self._will_owned_status),
+            (lambda sql: sql == WILL_ACCESS_SQL, self._will_access),
+            (lambda sql: sql == EXECUTOR_COUNT.sql, self._executor_count),
+            (lambda sql: sql == ASSET_BY_ID.sql, self._asset),
+            (lambda sql: sql == ASSET_ALLOCATED_PERCENT.sql, self._asset_allocated),
+            (lambda sql: sql == ASSET_ALLOCATIONS.sql, self._asset_allocations),
+            (lambda sql: sql == ASSET_BENEFICIARIES.sql, self._asset_beneficiaries),
+            (lambda sql: sql == ALLOCATION_SAMPLE.sql, self._allocation_sample),
+            (lambda sql: sql == ALLOCATIONS_SQL, self._will_allocations),
+            (lambda sql: sql == PENDING_TRANSFERS_SQL, self._pending_transfers),
+            (lambda sql: sql.startswith(BENEFICIARY_PAGE_SQL), self._beneficiary_page),
+            (lambda sql: sql.startswith(BENEFICIARY_TOTALS_SQL.split('{')[0]), self._beneficiary_totals),
+            (lambda sql: sql == BENEFICIARY_CHOICES.sql, self._beneficiary_choices),
+            (lambda sql: sql == BENEFICIARY_MY_ASSETS.sql, self._my_assets),
+            (lambda sql: sql == BENEFICIARY_ASSETS.sql, self._beneficiary_assets),
+            (lambda sql: sql == COUNTERS_SQL, self._stat_counters),
+            (lambda sql: sql == RECENT_ACTIVITY_SQL, self._recent_activity),
+            (lambda sql: sql.startswith(TRANSFER_LIST_SQL), self._transfer_page),
+            (lambda sql: sql.startswith(AUDIT_SELECT_SQL), self._audit_page),
+            (lambda sql: 'FROM user_tables' in sql, self._num_rows),
+            (lambda sql: sql.startswith('SELECT COUNT(*) FROM (SELECT 1 FROM '), self._capped_count),
+            (lambda sql: sql == HOLIDAYS_VERSION_SQL, lambda sql, binds: [(1,)]),
+            (lambda sql: sql == HOLIDAYS_SQL, lambda sql, binds: list(self.data.holidays)),
+        ]
+
+    def pool_factory(self, latency=0):
+        """``db.pool_factory`` serving this data; ``latency`` as for ``FakePool``."""
+        return lambda **params: FakePool(responder=self, latency=latency,
+                                         record_statements=False, **params)
+
+    # ─── Per-thread counters ────────────────────
+
+    def reset_counters(self):
+        self._local.statements = 0
+        self._local.seconds = 0.0
+
+    def counters(self):
+        """``(statements, seconds spent answering)`` since ``reset_counters``."""
+        return getattr(self._local, 'statements', 0), getattr(self._local, 'seconds', 0.0)
+
+    def __call__(self, sql, binds):
+        started = time.perf_counter()
+        try:
+            for matches, handler in self._handlers:
+                if matches(sql):
+                    return handler(sql, binds or {})
+            self.unanswered.add(' '.join(sql.split())[:100])
+            return []
+        finally:
+            self._local.statements = getattr(self._local, 'statements', 0) + 1
+            self._local.seconds = (getattr(self._local, 'seconds', 0.0)
+                                   + time.perf_counter() - started)
+
+    # ─── Users and roles ────────────────────────
+
+    def _login(self, sql, binds):
+        user = self.data.user_by_email.get(binds.get('user_email'))
+        return [user[:4]] if user else []
+
+    def _role_flags(self, sql, binds):
+        return [self.data.roles_of(binds['user_id']) + (self.data.role_version(binds['user_id']),)]
+
+    def _role_version(self, sql, binds):
+        version = self.data.role_version(binds['user_id'])
+        return [] if version is None else [(version,)]
+
+    def _email_taken(self, sql, binds):
+        return [(int(binds['user_email'] in self.data.user_by_email),)]
+
+    def _admin_users(self, sql, binds):
+        data = self.data
+        executors = {}
+        for row in data.executors:
+            executors[row[3]] = executors.get(row[3], 0) + 1
+        created = datetime(2024, 1, 1)
+        rows = [(user_id, name, email, role, created + timedelta(days=user_id),
+                 len(data.wills_by_user.get(user_id, [])), executors.get(email, 0),
+                 len(data.beneficiary_ids_by_email.get(email, ())))
+                for user_id, name, email, _, role in data.users]
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+
+    def _dashboard(self, sql, binds):
+        data = self.data
+        if sql == ROLE_STATS_SQL['testator']:
+            wills = data.wills_by_user.get(binds['user_id'], [])
+            assets = [a for w in wills for a in data.assets_by_will.get(w[0], [])]
+            heirs = {wab[1] for a in assets for wab in data.allocations_by_asset.get(a[0], [])}
+            return FakeResult([(len(wills), sum(1 for w in wills if w[4] == 'Draft'), len(assets),
+                                sum(a[5] for a in assets), len(heirs))],
+                              ('total_wills', 'pending_wills', 'total_assets',
+                               'total_assets_value', 'total_beneficiaries'))
+        if sql == ROLE_STATS_SQL['executor']:
+            will_ids = data.wills_by_executor.get(binds['email'], set())
+            transfers = [t for will_id in will_ids for t in data.transfers_by_will.get(will_id, [])]
+            return FakeResult([(len(will_ids),
+                                sum(1 for t in transfers if t[4] == 'Initiated'),
+                                sum(1 for t in transfers if t[4] == 'Completed'))],
+                              ('assigned_wills', 'pending_transfers', 'completed_transfers'))
+        if sql == ROLE_STATS_SQL['beneficiary']:
+            ids = data.beneficiary_ids_by_email.get(binds['email'], set())
+            shares = [(data.asset_by_id[wab[0]][5], wab[2])
+                      for wab in data.allocations if wab[1] in ids]
+            return FakeResult([(len(shares), sum(value * share / 100 for value, share in shares))],
+                              ('assigned_assets', 'total_value'))
+        return FakeResult([(len(data.users), len(data.wills), len(data.assets), len(data.transfers))],
+                          ('system_users', 'system_wills', 'system_assets', 'system_transfers'))
+
+    # ─── Wills ──────────────────────────────────
+
+    def _will_page(self, sql, binds):
+        data = self.data
+        if 'user_id_param' in binds:
+            scope = ('user', binds['user_id_param'])
+            wills = data.wills_by_user.get(binds['user_id_param'], [])
+        elif 'exec_email' in binds:
+            scope = ('executor', binds['exec_email'])
+            wills = [data.will_by_id[i] for i in data.wills_by_executor.get(binds['exec_email'], ())]
+        else:
+            scope, wills = ('all',), data.wills
+        rows = [(w[0],) + w[2:6] for w in wills]
+        return self._keyset(scope, rows, sql, binds, _sort_indexes(WILL_SORTS, WILL_COLUMNS),
+                            WILL_SEARCH_INDEXES)
+
+    def _will_counts(self, sql, binds):
+        data = self.data
+        return [(will_id, len(data.assets_by_will.get(will_id, [])),
+                 len(data.executors_by_will.get(will_id, [])))
+                for will_id in binds.values()]
+
+    def _will_version(self, sql, binds):
+        data = self.data
+        will_id = binds.get('will_id')
+        if will_id is None:
+            asset = data.asset_by_id.get(binds.get('asset_id'))
+            will_id = asset[1] if asset else None
+        will = data.will_by_id.get(will_id)
+        if will is None:
+            return []
+        is_executor = int(will_id in data.wills_by_executor.get(binds.get('email'), ()))
+        return [(will[0], will[6], will[7], will[1], is_executor)]
+
+    def _will_header(self, sql, binds):
+        will = self.data.will_by_id.get(binds['will_id'])
+        if will is None:
+            return []
+        user = self.data.user_by_id[will[1]]
+        return [will[:8] + (user[1], user[2])]
+
+    def _will_detail(self, sql, binds):
+        data = self.data
+        assets = []
+        for asset in sorted(data.assets_by_will.get(binds['will_id'], []), key=lambda a: (a[2], a[0])):
+            shares = data.allocations_by_asset.get(asset[0], [])
+            if not shares:
+                assets.append((asset[0],) + asset[2:] + (None,) * 5)
+            for asset_id, beneficiary_id, share, conditions in sorted(
+                    shares, key=lambda wab: data.beneficiary_by_id[wab[1]][1]):
+                beneficiary = data.beneficiary_by_id[beneficiary_id]
+                assets.append((asset[0],) + asset[2:] +
+                              (beneficiary_id, beneficiary[1], beneficiary[2], share, conditions))
+        executors = [(e[0],) + e[2:] for e in data.executors_by_will.get(binds['will_id'], [])]
+        executors.sort(key=lambda e: (e[5] != 'Y', e[1]))
+        return [assets, executors]
+
+    def _will_owned_status(self, sql, binds):
+        will = self.data.will_by_id.get(binds['will_id_param'])
+        return [(will[4],)] if will and will[1] == binds['user_id_param'] else []
+
+    def _will_access(self, sql, binds):
+        will = self.data.will_by_id.get(binds['will_id'])
+        if will is None:
+            return []
+        is_executor = int(will[0] in self.data.wills_by_executor.get(binds['email'], ()))
+        return [(will[4], int(will[1] == binds['user_id']), is_executor)]
+
+    def _executor_count(self, sql, binds):
+        return [(len(self.data.executors_by_will.get(binds['will_id_param'], [])),)]
+
+    # ─── Assets and allocations ─────────────────
+
+    def _asset(self, sql, binds):
+        asset = self.data.asset_by_id.get(binds['asset_id_param'])
+        return [(asset[2], asset[3], asset[5], asset[4])] if asset else []
+
+    def _asset_shares(self, asset_id):
+        """``(allocation, beneficiary)`` pairs of an asset."""
+        data = self.data
+        return [(wab, data.beneficiary_by_id[wab[1]])
+                for wab in data.allocations_by_asset.get(asset_id, [])]
+
+    def _asset_allocated(self, sql, binds):
+        return [(sum(wab[2] for wab in self.data.allocations_by_asset.get(binds['asset_id_param'], [])),)]
+
+    def _asset_allocations(self, sql, binds):
+        asset = self.data.asset_by_id.get(binds['asset_id_param'])
+        rows = [(beneficiary[1], wab[2], wab[3], asset[5] * wab[2] / 100)
+                for wab, beneficiary in self._asset_shares(binds['asset_id_param'])]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def _asset_beneficiaries(self, sql, binds):
+        rows = [(beneficiary[0], beneficiary[1], beneficiary[2], wab[2])
+                for wab, beneficiary in self._asset_shares(binds['asset_id_param'])]
+        return sorted(rows, key=lambda row: row[1])
+
+    def _allocation_sample(self, sql, binds):
+        data = self.data
+        asset_id, beneficiary_id, _, _ = data.allocations[0]
+        return [(asset_id, beneficiary_id, data.asset_by_id[asset_id][2],
+                 data.beneficiary_by_id[beneficiary_id][1])]
+
+    def _will_allocations(self, sql, binds):
+        return sorted(wab for asset in self.data.assets_by_will.get(binds['will_id'], [])
+                      for wab in self.data.allocations_by_asset.get(asset[0], []))
+
+    def _pending_transfers(self, sql, binds):
+        data = self.data
+        started = {(t[1], t[2]) for t in data.transfers_by_will.get(binds['will_id'], [])
+                   if t[4] in ('Initiated', 'Completed')}
+        rows = [(asset[0], asset[2], beneficiary[0], beneficiary[1], wab[2])
+                for asset in data.assets_by_will.get(binds['will_id'], [])
+                for wab, beneficiary in self._asset_shares(asset[0])
+                if (wab[0], wab[1]) not in started]
+        return sorted(rows, key=lambda row: (row[1], row[3]))
+
+    def _execute_transfers(self, sql, params):
+        # One 'STATUS: message' result per pending allocation
+        will_id, asset_ids, beneficiary_ids, results = params
+        results.setvalue(0, ['INITIATED'] * len(asset_ids.getvalue()))
+        return []
+
+    # ─── Beneficiaries ──────────────────────────
+
+    def _beneficiary_page(self, sql, binds):
+        rows = [row + (None,) for row in self.data.beneficiaries]   # no phone numbers
+        return self._keyset(('beneficiaries',), rows, sql, binds,
+                            _sort_indexes(BENEFICIARY_SORTS, BENEFICIARY_COLUMNS),
+                            BENEFICIARY_SEARCH_INDEXES)
+
+    def _beneficiary_totals(self, sql, binds):
+        data = self.data
+        totals = {}
+        for asset_id, beneficiary_id, share, _ in data.allocations:
+            count, value = totals.get(beneficiary_id, (0, 0))
+            totals[beneficiary_id] = (count + 1, value + data.asset_by_id[asset_id][5] * share / 100)
+        return [(ben_id,) + totals[ben_id] for ben_id in binds.values() if ben_id in totals]
+
+    def _beneficiary_choices(self, sql, binds):
+        return sorted(self.data.beneficiaries, key=lambda row: row[1])
+
+    def _my_assets(self, sql, binds):
+        data = self.data
+        ids = data.beneficiary_ids_by_email.get(binds['ben_email'], set())
+        transfers = {(t[1], t[2]): t[4] for t in data.transfers}
+        rows = []
+        for asset_id, beneficiary_id, share, conditions in data.allocations:
+            if beneficiary_id not in ids:
+                continue
+            asset = data.asset_by_id[asset_id]
+            will = data.will_by_id[asset[1]]
+            rows.append((asset[2], asset[3], asset[4], asset[5], asset[6], share, conditions,
+                         asset[5] * share / 100, will[2], will[4],
+                         transfers.get((asset_id, beneficiary_id), 'Not Transferred')))
+        return sorted(rows, key=lambda row: (row[8], row[0]))
+
+    def _beneficiary_assets(self, sql, binds):
+        data = self.data
+        rows = [(asset_id,) + (data.asset_by_id[asset_id][2], data.asset_by_id[asset_id][4],
+                               data.asset_by_id[asset_id][5], share,
+                               data.asset_by_id[asset_id][5] * share / 100)
+                for asset_id, beneficiary_id, share, _ in data.allocations
+                if beneficiary_id == binds['ben_id_param']]
+        return sorted(rows, key=lambda row: row[1])
+
+    # ─── System statistics ──────────────────────
+
+    def _stat_counters(self, sql, binds):
+        data = self.data
+        rows = [('users', len(data.users)), ('wills', len(data.wills)),
+                ('assets', len(data.assets)), ('beneficiaries', len(data.beneficiaries)),
+                ('executors', len(data.executors)), ('transfers', len(data.transfers)),
+                ('asset_value', sum(asset[5] for asset in data.assets))]
+        statuses = {}
+        for will in data.wills:
+            statuses[will[4]] = statuses.get(will[4], 0) + 1
+        return rows + [(STATUS_PREFIX + status, count) for status, count in statuses.items()]
+
+    def _recent_activity(self, sql, binds):
+        data = self.data
+        since = datetime.now() - timedelta(days=30)
+        rows = [('Will Created', will[2], will[5]) for will in data.wills if will[5] >= since]
+        rows += [('Asset Transferred', data.asset_by_id[t[1]][2], t[3])
+                 for t in data.transfers if t[3] >= since]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:20]
+
+    # ─── Transfers and audit log ────────────────
+
+    def _transfer_page(self, sql, binds):
+        data = self.data
+        if TRANSFER_INVOLVED_CLAUSE in sql:
+            will_ids = {w[0] for w in data.wills_by_user.get(binds['user_id_param'], [])}
+            will_ids |= data.wills_by_executor.get(binds['exec_email'], set())
+            scope = ('involved', binds['user_id_param'], binds['exec_email'])
+            transfers = [t for will_id in will_ids for t in data.transfers_by_will.get(will_id, [])]
+        else:
+            scope, transfers = ('all',), data.transfers
+        rows = []
+        for transfer_id, asset_id, beneficiary_id, day, status, approved_by, notes in transfers:
+            asset = data.asset_by_id[asset_id]
+            share = next(wab[2] for wab in data.allocations_by_asset[asset_id] if wab[1] == beneficiary_id)
+            rows.append((transfer_id, asset[2], data.beneficiary_by_id[beneficiary_id][1], day,
+                         status, approved_by, notes, asset[5], share, asset[5] * share / 100))
+        return self._keyset(scope, rows, sql, binds, _sort_indexes(TRANSFER_SORTS, TRANSFER_COLUMNS),
+                            TRANSFER_SEARCH_INDEXES)
+
+    def _audit_page(self, sql, binds):
+        if not ORDER_RE.search(sql):
+            # The export: the whole log, oldest first
+            return sorted(self.data.audit, key=lambda row: (row[7], row[0]))
+        return self._keyset(('audit',), self.data.audit, sql, binds, AUDIT_SORT, ())
+
+    def _num_rows(self, sql, binds):
+        table = getattr(self.data, binds['table_name'].lower().replace('audit_log', 'audit'), None)
+        return [(len(table),)] if table is not None else [(None,)]
+
+    def _capped_count(self, sql, binds):
+        table = re.search(r"FROM \(SELECT 1 FROM (\w+)", sql).group(1)
+        rows = getattr(self.data, table.lower().replace('audit_log', 'audit'))
+        return [(min(len(rows), binds['count_cap']),)]
+
+    # ─── Keyset pages ───────────────────────────
+
+    def _keyset(self, scope, rows, sql, binds, sort_indexes, search_indexes):
+        """The rows ``fetch_page`` asks for: filtered, sorted and limited."""
+        column, direction = ORDER_RE.search(sql).groups()
+        index = sort_indexes[column]
+        descending = direction == 'DESC'
+
+        def key(row):
+            return (row[index] is None, row[index], row[0])
+
+        search = binds.get('q_search')
+        if search:
+            term = re.sub(r"\\(.)", r"\1", search[1:-1])
+            rows = [row for row in rows
+                    if any(term in str(row[i] or '').upper() for i in search_indexes)]
+            ordered = sorted(rows, key=key, reverse=descending)
+        else:
+            # Sorted lists are kept per scope; the data does not change
+            cache_key = (scope, index, descending)
+            ordered = self._sorted.get(cache_key)
+            if ordered is None:
+                ordered = self._sorted[cache_key] = sorted(rows, key=key, reverse=descending)
+
+        if 'k_id' in binds:
+            # NULL sorts highest, as in fetch_page's seek predicate
+            value = binds.get('k_sort')
+            position = (value is None, value, binds['k_id'])
+            ordered = [row for row in ordered
+                       if (key(row) < position if descending else key(row) > position)]
+        return ordered[:binds['k_limit']]
+
+
+def _sort_indexes(sorts, columns):
+    """Sort column -> row index, from a ``*_SORTS`` mapping and its ``*_COLUMNS``."""
+    return {column: columns.index(field) for column, field, _ in sorts.values()}
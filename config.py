@@ -3,13 +3,22 @@
 import os
 from datetime import timedelta
 
+# Public placeholder; never good enough to sign cookie sessions outside development
+DEFAULT_SECRET_KEY = 'dev-secret-key-change-in-production'
+
 class Config:
     """Base configuration for Digital Will Management System"""
 
     # Flask session & security
-    SECRET_KEY               = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    SESSION_TYPE             = 'filesystem'
+    SECRET_KEY               = os.getenv('SECRET_KEY', DEFAULT_SECRET_KEY)
+    # cookie | memory | redis | filesystem (see session_store.py); server-side until a real SECRET_KEY is set
+    SESSION_BACKEND          = os.getenv('SESSION_BACKEND', 'cookie' if os.getenv('SECRET_KEY') else 'memory')
+    SESSION_KEY_PREFIX       = 'session:'
+    SESSION_USE_SIGNER       = True
+    SESSION_MEMORY_THRESHOLD = int(os.getenv('SESSION_MEMORY_THRESHOLD', 10000))   # sessions held by the memory backend
+    SESSION_REDIS_URL        = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
     SESSION_FILE_DIR         = os.path.join(os.path.dirname(__file__), 'flask_session')
+    SESSION_FILE_THRESHOLD   = int(os.getenv('SESSION_FILE_THRESHOLD', 500))
     SESSION_PERMANENT         = True
     PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
     SESSION_COOKIE_HTTPONLY  = True
@@ -25,6 +34,50 @@ class Config:
         r'C:\oracle\instantclient_21_3'
     )
 
+    # Oracle connection pool (oracledb.create_pool)
+    ORACLE_POOL_ENABLED       = os.getenv('ORACLE_POOL_ENABLED', 'true').lower() == 'true'
+    ORACLE_POOL_MIN           = int(os.getenv('ORACLE_POOL_MIN', 2))
+    ORACLE_POOL_MAX           = int(os.getenv('ORACLE_POOL_MAX', 10))
+    ORACLE_POOL_INCREMENT     = int(os.getenv('ORACLE_POOL_INCREMENT', 1))
+    ORACLE_POOL_PING_INTERVAL = int(os.getenv('ORACLE_POOL_PING_INTERVAL', 60))    # seconds idle before ping on acquire; 0 = always
+    ORACLE_POOL_WAIT_TIMEOUT  = int(os.getenv('ORACLE_POOL_WAIT_TIMEOUT', 5000))   # ms to wait for a free connection
+    ORACLE_STMT_CACHE_SIZE    = int(os.getenv('ORACLE_STMT_CACHE_SIZE', 40))
+
+    # In-process caches (seconds)
+    ROLE_CACHE_TTL            = int(os.getenv('ROLE_CACHE_TTL', 300))
+    ROLE_VERSION_TTL          = int(os.getenv('ROLE_VERSION_TTL', 5))      # how late another worker's role change is seen
+    DASHBOARD_CACHE_TTL       = int(os.getenv('DASHBOARD_CACHE_TTL', 60))
+    HOLIDAY_CACHE_TTL         = int(os.getenv('HOLIDAY_CACHE_TTL', 300))
+    WILL_CACHE_TTL            = int(os.getenv('WILL_CACHE_TTL', 300))
+    FRAGMENT_CACHE_TTL        = int(os.getenv('FRAGMENT_CACHE_TTL', 600))
+    FRAGMENT_CACHE_ENABLED    = os.getenv('FRAGMENT_CACHE_ENABLED', 'true').lower() == 'true'
+
+    # Compiled template bytecode shared by the workers (see templating.py); '' disables
+    TEMPLATE_BYTECODE_DIR     = os.getenv('TEMPLATE_BYTECODE_DIR',
+                                          os.path.join(os.path.dirname(__file__), 'template_cache'))
+
+    # Audit log export: rows per fetchmany() round trip
+    AUDIT_EXPORT_ARRAYSIZE    = int(os.getenv('AUDIT_EXPORT_ARRAYSIZE', 1000))
+
+    # Wills, transfers and beneficiaries lists: default rows per page
+    LIST_PAGE_SIZE            = int(os.getenv('LIST_PAGE_SIZE', 25))
+
+    # Request metrics: Server-Timing header with each response's figures
+    METRICS_DEBUG_HEADER      = os.getenv('METRICS_DEBUG_HEADER', 'false').lower() == 'true'
+
+    # @query_budget: raise instead of logging when a view goes over its budget
+    QUERY_BUDGET_STRICT       = os.getenv('QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+
+    # Slow-query log: threshold, recent entries kept for /admin/slow-queries,
+    # and opt-in DBMS_XPLAN capture of the worst new statements per request
+    SLOW_QUERY_MS             = float(os.getenv('SLOW_QUERY_MS', 500))
+    SLOW_QUERY_RECENT         = int(os.getenv('SLOW_QUERY_RECENT', 100))
+    SLOW_QUERY_EXPLAIN        = os.getenv('SLOW_QUERY_EXPLAIN', 'false').lower() == 'true'
+    SLOW_QUERY_EXPLAIN_TOP    = int(os.getenv('SLOW_QUERY_EXPLAIN_TOP', 3))
+
+    # Bulk asset import: rows accepted per upload
+    ASSET_IMPORT_MAX_ROWS     = int(os.getenv('ASSET_IMPORT_MAX_ROWS', 1000))
+
     # File upload settings (if you need)
     UPLOAD_FOLDER     = os.path.join(os.path.dirname(__file__), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
@@ -33,6 +86,7 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG   = True
     TESTING = False
+    METRICS_DEBUG_HEADER = True
 
 class ProductionConfig(Config):
     DEBUG   = False
@@ -43,6 +97,7 @@ class TestingConfig(Config):
     DEBUG            = True
     TESTING          = True
     WTF_CSRF_ENABLED = False
+    QUERY_BUDGET_STRICT = True
 
 config = {
     'development': DevelopmentConfig,
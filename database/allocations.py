@@ -0,0 +1,105 @@
+# database/allocations.py
+
+"""Whole-will allocation matrices.
+
+A matrix maps each asset of a will to its beneficiaries and their share
+percentages. It is validated here in one pass and applied by
+``allocation_pkg.allocate_will_assets`` as parallel PL/SQL arrays, so a
+will with 50 assets and 5 heirs is one procedure call instead of 250.
+"""
+
+import oracledb
+from database.statements import statements, LIST
+
+ALLOCATIONS_SQL = """
+    SELECT wab.asset_id, wab.beneficiary_id, wab.share_percent, wab.conditions
+    FROM will_asset_beneficiaries wab
+    JOIN assets a ON wab.asset_id = a.asset_id
+    WHERE a.will_id = :will_id
+    ORDER BY wab.asset_id, wab.beneficiary_id
+"""
+ALLOCATIONS = statements.define('allocations.of_will', ALLOCATIONS_SQL, LIST, rows=500)
+
+
+def normalize_allocations(payload):
+    """Return ``(rows, errors)`` for a request payload.
+
+    ``payload['allocations']`` is either a list of
+    ``{asset_id, beneficiary_id, share_percent, conditions}`` objects or a
+    matrix ``{asset_id: {beneficiary_id: share_percent}}``. Rows are
+    ``(asset_id, beneficiary_id, share_percent, conditions)`` tuples; every
+    problem found is reported, not only the first.
+    """
+    allocations = payload.get('allocations') if isinstance(payload, dict) else None
+    if isinstance(allocations, dict):
+        allocations = [
+            {'asset_id': asset_id, 'beneficiary_id': beneficiary_id, 'share_percent': share}
+            for asset_id, shares in allocations.items()
+            if isinstance(shares, dict)
+            for beneficiary_id, share in shares.items()
+        ]
+    if not isinstance(allocations, list) or not allocations:
+        return [], ['allocations must be a non-empty list or matrix.']
+
+    rows, errors = [], []
+    seen = set()
+    for number, item in enumerate(allocations, start=1):
+        if not isinstance(item, dict):
+            errors.append(f'Allocation {number}: must be an object.')
+            continue
+        try:
+            asset_id = int(item.get('asset_id'))
+            beneficiary_id = int(item.get('beneficiary_id'))
+            share = float(item.get('share_percent'))
+        except (TypeError, ValueError):
+            errors.append(f'Allocation {number}: asset_id, beneficiary_id and '
+                          f'share_percent must be numbers.')
+            continue
+        if share <= 0 or share > 100:
+            errors.append(f'Allocation {number}: share percentage must be between 0 and 100.')
+            continue
+        if (asset_id, beneficiary_id) in seen:
+            errors.append(f'Allocation {number}: beneficiary {beneficiary_id} is listed '
+                          f'twice for asset {asset_id}.')
+            continue
+        seen.add((asset_id, beneficiary_id))
+        rows.append((asset_id, beneficiary_id, share, item.get('conditions') or None))
+
+    errors.extend(f'Asset {asset_id}: total share {total:g}% exceeds 100%.'
+                  for asset_id, total in allocation_totals(rows).items() if total > 100)
+    return rows, errors
+
+
+def allocation_totals(rows):
+    totals = {}
+    for asset_id, _, share, _ in rows:
+        totals[asset_id] = totals.get(asset_id, 0) + share
+    return totals
+
+
+def allocation_params(cur, will_id, rows):
+    """Parameters of ``allocation_pkg.allocate_will_assets`` for ``rows``.
+
+    Each column is bound as one PL/SQL associative array, so the whole
+    matrix travels in a single call.
+    """
+    asset_ids, beneficiary_ids, shares, conditions = (list(col) for col in zip(*rows))
+    return [
+        will_id,
+        cur.arrayvar(oracledb.DB_TYPE_NUMBER, asset_ids),
+        cur.arrayvar(oracledb.DB_TYPE_NUMBER, beneficiary_ids),
+        cur.arrayvar(oracledb.DB_TYPE_NUMBER, shares),
+        cur.arrayvar(oracledb.DB_TYPE_VARCHAR, conditions, 4000)
+    ]
+
+
+def load_allocations(cur, will_id):
+    """Current allocation matrix of a will: ``{asset_id: [allocation, ...]}``."""
+    matrix = {}
+    for asset_id, beneficiary_id, share, conditions in ALLOCATIONS.all(cur, {'will_id': will_id}):
+        matrix.setdefault(asset_id, []).append({
+            'beneficiary_id': beneficiary_id,
+            'share_percent':  float(share),
+            'conditions':     conditions
+        })
+    return matrix
@@ -0,0 +1,132 @@
+# database/assets.py
+
+"""Bulk asset import for a will.
+
+Uploaded rows are validated in Python first; the valid ones go to the
+database in a single ``executemany`` with ``batcherrors=True``, so a bad
+row reported by Oracle (a check constraint, a trigger) does not stop the
+others and the whole import costs one round trip and one commit.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from database.statements import statements, WRITE
+
+# Options of the asset_type select in assets/add.html
+ASSET_TYPES = ('Real Estate', 'Financial', 'Vehicle', 'Personal',
+               'Business', 'Investment', 'Other')
+
+ASSET_IMPORT_FIELDS = ('name', 'asset_type', 'value', 'description',
+                       'location', 'acquisition_date')
+
+ASSET_INSERT_SQL = """
+    INSERT INTO assets(
+        will_id, name, description, asset_type,
+        value, location, acquisition_date
+    ) VALUES (
+        :will_id_param, :asset_name, :asset_desc, :asset_type_param,
+        :asset_value, :asset_location, :acq_date
+    )"""
+ASSET_IMPORT = statements.define('assets.import', ASSET_INSERT_SQL, WRITE)
+
+
+class AssetImportError(ValueError):
+    """The upload could not be read as CSV or JSON rows."""
+
+
+def parse_asset_upload(filename, data):
+    """Return the uploaded rows as a list of dicts.
+
+    ``data`` is the raw upload; ``.json`` files (or content starting with
+    ``[``/``{``) are read as a JSON list of objects, anything else as CSV
+    with a header row.
+    """
+    try:
+        text = data.decode('utf-8-sig') if isinstance(data, bytes) else data
+    except UnicodeDecodeError:
+        raise AssetImportError('File must be UTF-8 encoded.')
+
+    stripped = text.lstrip()
+    if (filename or '').lower().endswith('.json') or stripped[:1] in ('[', '{'):
+        try:
+            rows = json.loads(text)
+        except ValueError as err:
+            raise AssetImportError(f'Invalid JSON: {err}')
+        if isinstance(rows, dict):
+            rows = rows.get('assets')
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise AssetImportError('JSON must be a list of asset objects.')
+        return rows
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise AssetImportError('CSV file is empty.')
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    return list(reader)
+
+
+def validate_asset_row(row):
+    """Return ``(binds, None)`` for a valid row or ``(None, error message)``."""
+    values = {field: str(row.get(field) or '').strip() for field in ASSET_IMPORT_FIELDS}
+
+    if not values['name']:
+        return None, 'Name is required.'
+    if values['asset_type'] not in ASSET_TYPES:
+        return None, f"Asset type must be one of: {', '.join(ASSET_TYPES)}."
+    try:
+        value = float(values['value'])
+    except ValueError:
+        return None, 'Invalid value format for asset value.'
+    if value < 0:
+        return None, 'Asset value cannot be negative.'
+
+    acq_date = None
+    if values['acquisition_date']:
+        try:
+            acq_date = datetime.strptime(values['acquisition_date'], '%Y-%m-%d')
+        except ValueError:
+            return None, 'Acquisition date must be YYYY-MM-DD.'
+
+    return {
+        'asset_name':       values['name'],
+        'asset_desc':       values['description'] or None,
+        'asset_type_param': values['asset_type'],
+        'asset_value':      value,
+        'asset_location':   values['location'] or None,
+        'acq_date':         acq_date
+    }, None
+
+
+def bulk_insert_assets(cur, will_id, rows):
+    """Insert ``rows`` into the will and return the per-row report.
+
+    Report rows are ``{'row': n, 'name': ..., 'status': 'imported'|'error',
+    'error': message}`` with ``n`` counting data rows from 1.
+    """
+    report = []
+    batch = []
+    for number, row in enumerate(rows, start=1):
+        binds, error = validate_asset_row(row)
+        entry = {'row': number, 'name': str(row.get('name') or '').strip()}
+        if error:
+            entry.update(status='error', error=error)
+        else:
+            entry.update(status='imported', error=None)
+            batch.append((entry, dict(binds, will_id_param=will_id)))
+        report.append(entry)
+
+    if batch:
+        ASSET_IMPORT.executemany(cur, [binds for _, binds in batch], batcherrors=True)
+        for error in cur.getbatcherrors():
+            entry = batch[error.offset][0]
+            entry.update(status='error', error=error.message)
+
+    imported = sum(1 for entry in report if entry['status'] == 'imported')
+    return {
+        'will_id':  will_id,
+        'imported': imported,
+        'failed':   len(report) - imported,
+        'rows':     report
+    }
@@ -0,0 +1,230 @@
+# database/audit.py
+
+import csv
+import io
+import json
+from datetime import datetime
+import oracledb
+from flask import g, session, request, has_request_context
+from database.connection import db
+from database.statements import statements, WRITE
+from database.records import Record
+
+AUDIT_SELECT_SQL = """
+    SELECT audit_id, user_name, action, action_table, record_id,
+           old_values, new_values, timestamp, status, ip_address
+    FROM audit_log"""
+
+# Stamped with the database clock, like the rows written by triggers and
+# log_audit, so the trail stays in order whatever the web hosts' clocks say
+AUDIT_INSERT_SQL = """
+    INSERT INTO audit_log (
+        user_name, action, action_table, record_id,
+        old_values, new_values, status, ip_address, timestamp
+    ) VALUES (
+        :user_name, :action, :action_table, :record_id,
+        :old_values, :new_values, :status, :ip_address, SYSTIMESTAMP
+    )"""
+AUDIT_INSERT = statements.define('audit.insert', AUDIT_INSERT_SQL, WRITE)
+
+AUDIT_COLUMNS = ('audit_id', 'user_name', 'action', 'action_table', 'record_id',
+                 'old_values', 'new_values', 'timestamp', 'status', 'ip_address')
+
+# Filter form fields of admin/audit_logs.html
+AUDIT_FILTERS = ('action', 'table', 'status', 'date')
+# Extra filters accepted by the export endpoint
+EXPORT_FILTERS = AUDIT_FILTERS + ('from', 'to')
+
+
+def audit_filter_clauses(filters):
+    """Turn the audit log filter values into SQL predicates and binds.
+
+    Every predicate leads one of the ``idx_audit_log_*`` indexes; the date
+    filter is a half-open range on ``timestamp`` rather than ``TRUNC()`` so
+    it stays sargable.
+    """
+    clauses, binds = [], {}
+    if filters.get('action'):
+        clauses.append("action = :f_action")
+        binds['f_action'] = filters['action']
+    if filters.get('table'):
+        clauses.append("action_table = :f_table")
+        binds['f_table'] = filters['table']
+    if filters.get('status'):
+        # Trigger errors are logged as 'ERROR: <message>'
+        clauses.append("status LIKE :f_status || '%'")
+        binds['f_status'] = filters['status']
+    day = _parse_day(filters.get('date'))
+    if day is not None:
+        clauses.append("timestamp >= :f_day AND timestamp < :f_day + 1")
+        binds['f_day'] = day
+    date_from = _parse_day(filters.get('from'))
+    if date_from is not None:
+        clauses.append("timestamp >= :f_from")
+        binds['f_from'] = date_from
+    date_to = _parse_day(filters.get('to'))
+    if date_to is not None:
+        # Inclusive of the whole 'to' day
+        clauses.append("timestamp < :f_to + 1")
+        binds['f_to'] = date_to
+    return clauses, binds
+
+
+def _parse_day(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+class AuditEntry(Record):
+    """Row of the audit log page."""
+
+    __slots__ = AUDIT_COLUMNS
+
+    def __init__(self, audit_id, user_name, action, action_table, record_id,
+                 old_values, new_values, timestamp, status, ip_address):
+        self.audit_id = audit_id
+        self.user_name = user_name
+        self.action = action
+        self.action_table = action_table
+        self.record_id = record_id
+        self.old_values = old_values
+        self.new_values = new_values
+        self.timestamp = timestamp
+        self.status = status
+        self.ip_address = ip_address
+
+
+def audit_row_key(row):
+    """Keyset position of an audit entry: (timestamp, audit_id)."""
+    return row.timestamp, row.audit_id
+
+
+def _lobs_as_strings(cursor, metadata):
+    """Fetch CLOB old/new values inline instead of one LOB round trip per value."""
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def _csv_chunk(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows):
+    return ''.join(
+        json.dumps(dict(zip(AUDIT_COLUMNS, row)), default=_json_default) + '\n'
+        for row in rows
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+EXPORT_FORMATS = {
+    'csv':    ('text/csv', _csv_chunk),
+    'ndjson': ('application/x-ndjson', _ndjson_chunk)
+}
+
+
+def stream_audit_rows(database, filters, fmt, arraysize):
+    """Yield the filtered audit log, oldest first, as CSV or NDJSON text chunks.
+
+    Rows are pulled ``arraysize`` at a time with ``fetchmany`` and written
+    out immediately, so memory use does not depend on the export size.
+    """
+    encode = EXPORT_FORMATS[fmt][1]
+    clauses, binds = audit_filter_clauses(filters)
+    sql = AUDIT_SELECT_SQL
+    if clauses:
+        sql += "\nWHERE " + "\n  AND ".join(clauses)
+    sql += "\nORDER BY timestamp, audit_id"
+
+    with database.get_cursor(commit=False) as cur:
+        cur.arraysize = arraysize
+        cur.prefetchrows = arraysize + 1
+        cur.outputtypehandler = _lobs_as_strings
+        cur.execute(sql, binds)
+        if fmt == 'csv':
+            yield _csv_chunk([AUDIT_COLUMNS])
+        while True:
+            rows = cur.fetchmany()
+            if not rows:
+                break
+            yield encode(rows)
+
+
+def request_identity():
+    """``(client_identifier, clientinfo)`` for the current web request.
+
+    Tagged on the request connection so ``audit_pkg`` records the web user
+    and client IP instead of the schema user.
+    """
+    if not has_request_context():
+        return '', ''
+    return session.get('user_email') or '', request.remote_addr or ''
+
+
+class AuditTrail:
+    """Application-level audit entries, written once per request.
+
+    ``log`` only appends to a list on ``flask.g``; the entries are inserted
+    with a single ``executemany`` when the request is torn down, so a route
+    that audits several actions costs one round trip and one commit. After
+    a failed request they are written on a connection of their own.
+    """
+
+    def __init__(self, database=db):
+        self.database = database
+
+    def init_app(self, app):
+        self.database.client_identity = request_identity
+        app.teardown_request(self.flush)
+
+    def log(self, action, table, record_id=None, old_values=None,
+            new_values=None, status='SUCCESS', user=None):
+        entries = g.setdefault('_audit_entries', [])
+        entries.append({
+            'user_name':    user or session.get('user_email'),
+            'action':       action,
+            'action_table': table,
+            'record_id':    record_id,
+            'old_values':   old_values,
+            'new_values':   new_values,
+            'status':       status,
+            'ip_address':   request.remote_addr
+        })
+
+    def flush(self, exc=None):
+        entries = g.pop('_audit_entries', None)
+        if not entries:
+            return
+        try:
+            if exc is None:
+                with self.database.get_cursor() as cur:
+                    AUDIT_INSERT.executemany(cur, entries)
+                return
+            # The request failed: its connection may hold work that must not
+            # be committed along with the entries
+            conn = self.database.get_connection()
+            try:
+                AUDIT_INSERT.executemany(conn.cursor(), entries)
+                conn.commit()
+            finally:
+                self.database.release_connection(conn)
+        except oracledb.Error as err:
+            print(f"Error writing audit entries: {err}")
+
+
+audit = AuditTrail()
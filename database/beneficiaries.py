@@ -0,0 +1,57 @@
+# database/beneficiaries.py
+
+from database.pagination import in_list
+from database.records import Record, to_float
+
+# Beneficiary list rows are BeneficiarySummary records;
+# attach_beneficiary_totals() fills in assigned_assets and total_inheritance.
+BENEFICIARY_PAGE_SQL = """
+    SELECT b.beneficiary_id, b.full_name, b.relation, b.email, b.phone_number
+    FROM beneficiaries b"""
+
+BENEFICIARY_COLUMNS = ('beneficiary_id', 'full_name', 'relation', 'email', 'phone_number',
+                       'assigned_assets', 'total_inheritance')
+
+# name -> (sort column, record attribute, descending by default)
+BENEFICIARY_SORTS = {
+    'name':     ('b.full_name', 'full_name', False),
+    'relation': ('b.relation', 'relation', False),
+}
+
+BENEFICIARY_SEARCH_COLUMNS = ('b.full_name', 'b.relation', 'b.email')
+
+# Allocation totals of the beneficiaries on one page only
+BENEFICIARY_TOTALS_SQL = """
+    SELECT wab.beneficiary_id, COUNT(*), NVL(SUM(a.value * wab.share_percent / 100), 0)
+    FROM will_asset_beneficiaries wab
+    JOIN assets a ON wab.asset_id = a.asset_id
+    WHERE wab.beneficiary_id IN ({ids})
+    GROUP BY wab.beneficiary_id
+"""
+
+
+class BeneficiarySummary(Record):
+    """Row of the beneficiaries list."""
+
+    __slots__ = BENEFICIARY_COLUMNS
+
+    def __init__(self, beneficiary_id, full_name, relation, email, phone_number):
+        self.beneficiary_id = beneficiary_id
+        self.full_name = full_name
+        self.relation = relation
+        self.email = email
+        self.phone_number = phone_number
+        self.assigned_assets = 0
+        self.total_inheritance = 0.0
+
+
+def attach_beneficiary_totals(cur, rows):
+    """Fill in the assigned asset count and inheritance value of a page of beneficiaries."""
+    if not rows:
+        return rows
+    by_id = {row.beneficiary_id: row for row in rows}
+    placeholders, binds = in_list(list(by_id), 'ben_')
+    cur.execute(BENEFICIARY_TOTALS_SQL.format(ids=placeholders), binds)
+    for ben_id, count, total in cur.fetchall():
+        by_id[ben_id].assigned_assets, by_id[ben_id].total_inheritance = count, to_float(total)
+    return rows
@@ -1,8 +1,10 @@
 # database/connection.py
 
+import time
+import threading
 import oracledb
 from contextlib import contextmanager
-from flask import g
+from flask import g, has_app_context
 from config import Config
 
 # (Optional) thick mode initialization
@@ -13,32 +15,179 @@ if Config.ORACLE_THICK_MODE:
         print(f"Failed to init Oracle thick client: {e}")
 
 class DatabaseConnection:
-    """Helper for Oracle connections using oracledb."""
+    """Helper for Oracle connections using oracledb.
 
-    def __init__(self):
+    With ``Config.ORACLE_POOL_ENABLED`` the connections come from a session
+    pool created lazily on first use; otherwise every ``get_cursor`` block
+    opens and closes its own standalone connection.
+
+    Inside an application context all ``get_cursor`` blocks share one
+    connection held on ``flask.g``; it is handed back when the context is
+    torn down (see ``init_app``). Each outermost block still ends its own
+    transaction as before: ``commit=True`` commits, ``commit=False`` rolls
+    back whatever it left open, and an error rolls back. Blocks nested in
+    another (a loader called inside a route's block) do neither; the
+    outermost block decides for the whole unit of work.
+    """
+
+    def __init__(self, pooled=None, pool_factory=None):
         self.params = {
             'user':     Config.ORACLE_USER,
             'password': Config.ORACLE_PASSWORD,
             'dsn':      Config.ORACLE_DSN
         }
+        self.pooled = Config.ORACLE_POOL_ENABLED if pooled is None else pooled
+        self.pool_params = {
+            'min':           Config.ORACLE_POOL_MIN,
+            'max':           Config.ORACLE_POOL_MAX,
+            'increment':     Config.ORACLE_POOL_INCREMENT,
+            'ping_interval': Config.ORACLE_POOL_PING_INTERVAL,
+            'stmtcachesize': Config.ORACLE_STMT_CACHE_SIZE,
+            'getmode':       oracledb.POOL_GETMODE_TIMEDWAIT,
+            'wait_timeout':  Config.ORACLE_POOL_WAIT_TIMEOUT
+        }
+        # oracledb.create_pool by default; database.fake.FakePool in tests
+        self.pool_factory = pool_factory or oracledb.create_pool
+        self._pool = None
+        # Optional callable returning (client_identifier, clientinfo) for the
+        # request connection; set by database.audit.AuditTrail.init_app
+        self.client_identity = None
+        # Optional object with wrap(cursor) and block_done(cursor, seconds),
+        # told about every get_cursor block; set by metrics.RequestMetrics.init_app
+        self.cursor_observer = None
+        self._lock = threading.Lock()
+        self._acquires = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self.pool_factory(**self.params, **self.pool_params)
+        return self._pool
 
     def get_connection(self):
-        return oracledb.connect(**self.params)
+        if not self.pooled:
+            return oracledb.connect(**self.params)
+
+        pool = self.pool
+        saturated = pool.busy >= pool.max
+        started = time.perf_counter()
+        try:
+            conn = pool.acquire()
+        except oracledb.Error:
+            with self._lock:
+                self._timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._acquires += 1
+            self._wait_time += waited
+            if saturated:
+                self._waits += 1
+        return conn
+
+    def release_connection(self, conn):
+        if self.pooled:
+            self.pool.release(conn)
+        else:
+            conn.close()
+
+    def init_app(self, app):
+        """Release the request-scoped connection when the app context ends."""
+        app.teardown_appcontext(self.close_request_connection)
+
+    def request_connection(self):
+        """Return the connection shared by the current app context."""
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = g._db_conn = self.get_connection()
+            if self.client_identity is not None:
+                # Sent along with the next round trip, no extra call
+                conn.client_identifier, conn.clientinfo = self.client_identity()
+        return conn
+
+    def close_request_connection(self, exc=None):
+        conn = g.pop('_db_conn', None)
+        if conn is None:
+            return
+        try:
+            # Only work outside any get_cursor block can still be open
+            if getattr(conn, 'transaction_in_progress', True):
+                conn.rollback()
+        except oracledb.Error as err:
+            print(f"Error rolling back request connection: {err}")
+        finally:
+            if self.client_identity is not None:
+                # Pooled sessions are reused outside requests (CLI, jobs,
+                # get_connection()); they must not act as the last web user
+                try:
+                    conn.client_identifier = None
+                    conn.clientinfo = None
+                except oracledb.Error as err:
+                    print(f"Error clearing client identity: {err}")
+            self.release_connection(conn)
 
     @contextmanager
     def get_cursor(self, commit=True):
-        conn = self.get_connection()
+        scoped = has_app_context()
+        observer = self.cursor_observer
+        started = time.perf_counter()
+        conn = self.request_connection() if scoped else self.get_connection()
+        depth = g.get('_db_depth', 0) if scoped else 0
+        if scoped:
+            g._db_depth = depth + 1
         cur  = conn.cursor()
+        if observer is not None:
+            cur = observer.wrap(cur)
         try:
             yield cur
-            if commit:
-                conn.commit()
+            # Skip the round trip when the block changed nothing
+            if depth == 0 and getattr(conn, 'transaction_in_progress', True):
+                if commit:
+                    conn.commit()
+                else:
+                    conn.rollback()
         except:
-            conn.rollback()
+            if depth == 0:
+                conn.rollback()
             raise
         finally:
             cur.close()
-            conn.close()
+            if scoped:
+                g._db_depth = depth
+            else:
+                self.release_connection(conn)
+            if observer is not None:
+                observer.block_done(cur, time.perf_counter() - started)
+
+    def pool_stats(self):
+        """Snapshot of pool usage for monitoring."""
+        stats = {
+            'pooled':        self.pooled,
+            'acquires':      self._acquires,
+            'waits':         self._waits,
+            'timeouts':      self._timeouts,
+            'wait_time_ms':  round(self._wait_time * 1000, 3)
+        }
+        if self.pooled and self._pool is not None:
+            stats.update({
+                'busy':   self._pool.busy,
+                'open':   self._pool.opened,
+                'min':    self._pool.min,
+                'max':    self._pool.max
+            })
+        return stats
+
+    def close(self):
+        """Close the pool (if any); it is recreated on next use."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close(force=True)
+                self._pool = None
 
 # global instance
 db = DatabaseConnection()
@@ -0,0 +1,116 @@
+# database/dashboard.py
+
+from config import Config
+from util import TTLCache
+from database.connection import db
+from database.statements import statements, ROW
+
+# One combined statement per role; column aliases become the stats keys
+ROLE_STATS_SQL = {
+    'testator': """
+        SELECT w.total_wills, w.pending_wills,
+               a.total_assets, a.total_assets_value,
+               b.total_beneficiaries
+        FROM (SELECT COUNT(*) AS total_wills,
+                     COUNT(CASE WHEN status = 'Draft' THEN 1 END) AS pending_wills
+              FROM wills
+              WHERE user_id = :user_id) w
+        CROSS JOIN (SELECT COUNT(*) AS total_assets,
+                           NVL(SUM(a.value), 0) AS total_assets_value
+                    FROM assets a
+                    JOIN wills w ON a.will_id = w.will_id
+                    WHERE w.user_id = :user_id) a
+        CROSS JOIN (SELECT COUNT(DISTINCT wab.beneficiary_id) AS total_beneficiaries
+                    FROM will_asset_beneficiaries wab
+                    JOIN assets a ON wab.asset_id = a.asset_id
+                    JOIN wills w ON a.will_id = w.will_id
+                    WHERE w.user_id = :user_id) b
+    """,
+    'executor': """
+        SELECT e.assigned_wills, t.pending_transfers, t.completed_transfers
+        FROM (SELECT COUNT(*) AS assigned_wills
+              FROM executors
+              WHERE email = :email) e
+        CROSS JOIN (SELECT COUNT(CASE WHEN t.transfer_status = 'Initiated' THEN 1 END) AS pending_transfers,
+                           COUNT(CASE WHEN t.transfer_status = 'Completed' THEN 1 END) AS completed_transfers
+                    FROM transfer_logs t
+                    JOIN assets a ON t.asset_id = a.asset_id
+                    JOIN executors e ON a.will_id = e.will_id
+                    WHERE e.email = :email) t
+    """,
+    'beneficiary': """
+        SELECT COUNT(*) AS assigned_assets,
+               NVL(SUM(a.value * wab.share_percent / 100), 0) AS total_value
+        FROM will_asset_beneficiaries wab
+        JOIN assets a ON wab.asset_id = a.asset_id
+        JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
+        WHERE b.email = :email
+    """,
+    'admin': """
+        SELECT (SELECT COUNT(*) FROM users) AS system_users,
+               (SELECT COUNT(*) FROM wills) AS system_wills,
+               (SELECT COUNT(*) FROM assets) AS system_assets,
+               (SELECT COUNT(*) FROM transfer_logs) AS system_transfers
+        FROM dual
+    """
+}
+
+ROLE_STATS = {role: statements.define(f'dashboard.{role}', sql, ROW)
+              for role, sql in ROLE_STATS_SQL.items()}
+
+ROLE_BINDS = {
+    'testator':    ('user_id',),
+    'executor':    ('email',),
+    'beneficiary': ('email',),
+    'admin':       ()
+}
+
+
+class DashboardStats:
+    """Per-user dashboard statistics with a TTL and explicit invalidation.
+
+    Testator, executor and beneficiary figures are cached per user; the
+    system-wide admin figures are shared by every admin. Write routes call
+    ``invalidate`` for the acting user, which also drops the admin figures.
+    Figures belonging to *other* users touched by a write (e.g. the
+    executors of a will) refresh when their TTL runs out.
+    """
+
+    def __init__(self, database=db, ttl=None):
+        self.database = database
+        self.cache = TTLCache(ttl if ttl is not None else Config.DASHBOARD_CACHE_TTL)
+
+    def get(self, user_id, email, all_roles):
+        """Return the stats dict for every dashboard role the user holds."""
+        stats = {}
+        missing = []
+        for role in ROLE_STATS_SQL:
+            if role not in all_roles:
+                continue
+            cached = self.cache.get(self._key(role, user_id))
+            if cached is None:
+                missing.append(role)
+            else:
+                stats.update(cached)
+
+        if missing:
+            binds = {'user_id': user_id, 'email': email}
+            with self.database.get_cursor(commit=False) as cur:
+                for role in missing:
+                    row = ROLE_STATS[role].one(cur, {name: binds[name] for name in ROLE_BINDS[role]})
+                    columns = [col[0].lower() for col in cur.description]
+                    role_stats = dict(zip(columns, row))
+                    self.cache.set(self._key(role, user_id), role_stats)
+                    stats.update(role_stats)
+        return stats
+
+    def invalidate(self, user_id):
+        for role in ROLE_STATS_SQL:
+            self.cache.pop(self._key(role, user_id))
+
+    @staticmethod
+    def _key(role, user_id):
+        return 'system' if role == 'admin' else (role, user_id)
+
+
+dashboard_stats = DashboardStats()
@@ -0,0 +1,230 @@
+# database/fake.py
+
+"""In-memory stand-ins for oracledb pools, connections and cursors.
+
+They let the pooling logic in ``DatabaseConnection`` be exercised without a
+live database::
+
+    pool_db = DatabaseConnection(pooled=True, pool_factory=FakePool)
+    with pool_db.get_cursor() as cur:
+        cur.execute("SELECT 1 FROM dual")
+
+Cursors answer every statement through ``responder(sql, binds)``, which
+returns the list of rows to hand back (an empty list by default). For a
+PL/SQL block returning implicit results it returns one list of rows per
+result set instead. Returning a ``FakeResult`` also sets the cursor's
+``description``. Procedure calls reach it too, as ``responder(name,
+parameters)``; it may set their OUT variables and its rows are ignored.
+``latency`` (seconds, or ``latency(sql)``) is slept per statement to
+stand in for network and server time.
+"""
+
+import threading
+import time
+import oracledb
+
+
+class FakeResult(list):
+    """Rows of a statement along with their column names."""
+
+    def __init__(self, rows, columns):
+        super().__init__(rows)
+        self.columns = columns
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def getvalue(self, pos=0):
+        return self.value
+
+    def setvalue(self, pos, value):
+        self.value = value
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowcount = 0
+        self.description = None
+        self.statement = None
+        self.rowfactory = None
+        self._rows = []
+
+    def prepare(self, sql, tag=None, cache_statement=True):
+        self.statement = sql
+
+    def execute(self, sql, parameters=None, **kwargs):
+        if sql is None:
+            sql = self.statement   # run the prepared statement
+        self.statement = sql
+        self.rowfactory = None   # as oracledb, reset by every execute
+        binds = parameters if parameters is not None else kwargs
+        self.connection.record(sql, binds)
+        if not sql.lstrip().upper().startswith('SELECT'):
+            self.connection.transaction_in_progress = True
+        result = self.connection.pool.responder(sql, binds) or []
+        self.description = ([(name.upper(),) for name in result.columns]
+                            if isinstance(result, FakeResult) else None)
+        self._rows = list(result)
+        self.rowcount = len(self._rows)
+
+    def executemany(self, sql, seq_of_parameters, **kwargs):
+        sql = sql if sql is not None else self.statement
+        for params in seq_of_parameters:
+            self.execute(sql, params)
+        self._rows = []
+
+    def getbatcherrors(self):
+        return []
+
+    def arrayvar(self, typ, value, size=0):
+        return FakeVar([None] * value if isinstance(value, int) else list(value))
+
+    def __iter__(self):
+        while self._rows:
+            yield self._make(self._rows.pop(0))
+
+    def getimplicitresults(self):
+        results = []
+        for rows in self._rows:
+            result = FakeCursor(self.connection)
+            result._rows = list(rows)
+            results.append(result)
+        self._rows = []
+        return results
+
+    def callproc(self, name, parameters=None):
+        self.connection.record(name, parameters)
+        self.connection.transaction_in_progress = True
+        self.connection.pool.responder(name, parameters or [])
+        return parameters
+
+    def fetchone(self):
+        return self._make(self._rows.pop(0)) if self._rows else None
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return [self._make(row) for row in rows]
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return [self._make(row) for row in rows]
+
+    def _make(self, row):
+        return row if self.rowfactory is None else self.rowfactory(*row)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.transaction_in_progress = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def record(self, sql, binds):
+        pool = self.pool
+        if pool.latency:
+            time.sleep(pool.latency(sql) if callable(pool.latency) else pool.latency)
+        if pool.record_statements:
+            self.statements.append((sql, binds))
+
+    def commit(self):
+        self.commits += 1
+        self.transaction_in_progress = False
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.transaction_in_progress = False
+
+    def ping(self):
+        pass
+
+    def close(self):
+        self.pool.release(self)
+
+
+class FakePool:
+    """Mimics the slice of ``oracledb.ConnectionPool`` the app relies on.
+
+    Accepts the same keyword arguments as ``oracledb.create_pool`` so it can
+    be passed as ``pool_factory``; ``getmode``/``wait_timeout`` are honoured
+    so acquire timeouts can be reproduced. Long benchmark runs pass
+    ``record_statements=False`` so connections do not keep every statement.
+    """
+
+    def __init__(self, min=1, max=2, increment=1, getmode=oracledb.POOL_GETMODE_WAIT,
+                 wait_timeout=0, ping_interval=60, stmtcachesize=20,
+                 responder=None, latency=0, record_statements=True, **params):
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self.getmode = getmode
+        self.wait_timeout = wait_timeout
+        self.ping_interval = ping_interval
+        self.stmtcachesize = stmtcachesize
+        self.params = params
+        self.responder = responder or (lambda sql, binds: [])
+        self.latency = latency
+        self.record_statements = record_statements
+        self.pings = 0
+        self._idle = [FakeConnection(self) for _ in range(min)]
+        self._busy = set()
+        self._cond = threading.Condition()
+        self.closed = False
+
+    @property
+    def busy(self):
+        return len(self._busy)
+
+    @property
+    def opened(self):
+        return len(self._idle) + len(self._busy)
+
+    def acquire(self):
+        with self._cond:
+            deadline = time.monotonic() + self.wait_timeout / 1000
+            while not self._idle and self.opened >= self.max:
+                remaining = deadline - time.monotonic()
+                if self.getmode == oracledb.POOL_GETMODE_NOWAIT or (
+                        self.getmode == oracledb.POOL_GETMODE_TIMEDWAIT and remaining <= 0):
+                    raise oracledb.DatabaseError(
+                        "DPY-4005: timed out waiting for the connection pool to return a connection")
+                self._cond.wait(remaining if self.getmode == oracledb.POOL_GETMODE_TIMEDWAIT else None)
+            if self._idle:
+                conn = self._idle.pop()
+                if self.ping_interval == 0:
+                    conn.ping()
+                    self.pings += 1
+            else:
+                grow = min(self.increment, self.max - self.opened)
+                self._idle.extend(FakeConnection(self) for _ in range(grow - 1))
+                conn = FakeConnection(self)
+            self._busy.add(conn)
+            return conn
+
+    def release(self, conn):
+        with self._cond:
+            if conn in self._busy:
+                self._busy.discard(conn)
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def close(self, force=False):
+        with self._cond:
+            if self._busy and not force:
+                raise oracledb.DatabaseError("DPY-1005: unable to close pool with busy connections")
+            self._idle.clear()
+            self._busy.clear()
+            self.closed = True
@@ -0,0 +1,160 @@
+# database/holidays.py
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+import oracledb
+from config import Config
+from database.connection import db
+from database.statements import statements, SCALAR, LIST
+
+HOLIDAYS_SQL = "SELECT holiday_date, description, is_recurring FROM holidays"
+HOLIDAYS = statements.define('holidays.all', HOLIDAYS_SQL, LIST)
+
+# Bumped by trg_holidays_version on every change to holidays
+VERSION_SQL = """
+    SELECT stat_value FROM system_stat_counters
+    WHERE stat_key = 'holidays_version' AND stripe = 0
+"""
+HOLIDAYS_VERSION = statements.define('holidays.version', VERSION_SQL, SCALAR)
+
+ORA_TABLE_NOT_FOUND = 942
+
+
+class BusinessCalendar:
+    """Weekend/holiday calendar held in memory.
+
+    The ``holidays`` table is loaded once; recurring holidays are expanded
+    into concrete dates per year on first use, so ``holiday_name``,
+    ``is_business_day`` and ``next_business_day`` are dict lookups. Every
+    ``ttl`` seconds one single-row read of the ``holidays_version`` counter
+    tells whether the table changed and needs reloading.
+
+    Dates are the app server's local dates; the transfer trigger on the
+    database remains the authority.
+    """
+
+    def __init__(self, database=db, ttl=None):
+        self.database = database
+        self.ttl = ttl if ttl is not None else Config.HOLIDAY_CACHE_TTL
+        self._exact = {}        # date -> description
+        self._recurring = {}    # (month, day) -> description
+        self._blocked = {}      # date -> description, expanded per year
+        self._years = set()
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def holiday_name(self, day):
+        """Description of the holiday on ``day``, or None."""
+        day = _as_date(day)
+        self._refresh()
+        with self._lock:
+            if day.year not in self._years:
+                self._expand(day.year)
+            return self._blocked.get(day)
+
+    @staticmethod
+    def is_weekend(day):
+        return _as_date(day).weekday() >= 5
+
+    def is_business_day(self, day):
+        return not self.is_weekend(day) and self.holiday_name(day) is None
+
+    def next_business_day(self, day, include_today=True):
+        day = _as_date(day)
+        if not include_today:
+            day += timedelta(days=1)
+        while not self.is_business_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def blocked_reason(self, day):
+        """Why transfers are blocked on ``day`` (None on business days).
+
+        The wording matches the messages ``safe_execute_procedure`` shows
+        for the trigger's -20001/-20002 errors.
+        """
+        day = _as_date(day)
+        if self.is_weekend(day):
+            return (f"⚠️ Weekend Restriction: Asset transfers are not allowed on weekends. "
+                    f"Today is {day.strftime('%A')}. Please try again on a weekday (Monday-Friday).")
+        name = self.holiday_name(day)
+        if name is not None:
+            return (f"🎄 Holiday Restriction: Asset transfers are not allowed on public holidays. "
+                    f"Today is {name} ({day.strftime('%d-%b-%Y').upper()}). "
+                    f"Please try again on a regular business day.")
+        return None
+
+    def state(self, day):
+        """``(day, holidays version)``: everything ``blocked_reason(day)`` depends on.
+
+        Cache validators of responses showing the transfer eligibility of
+        ``day`` include it, so they change with the date and the holidays.
+        """
+        self._refresh()
+        return _as_date(day).isoformat(), self._version
+
+    def invalidate(self):
+        """Reload the holidays on next use."""
+        with self._lock:
+            self._checked_at = None
+            self._version = None
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.ttl:
+            return
+        try:
+            with self.database.get_cursor(commit=False) as cur:
+                version = self._read_version(cur)
+                if version is not None and version == self._version:
+                    self._checked_at = now
+                    return
+                rows = HOLIDAYS.all(cur)
+        except oracledb.Error as e:
+            print(f"Error loading holidays: {e}")
+            return  # Keep the current calendar and retry on next use
+
+        exact, recurring = {}, {}
+        for holiday_date, description, is_recurring in rows:
+            holiday_date = _as_date(holiday_date)
+            if is_recurring == 'Y':
+                recurring[(holiday_date.month, holiday_date.day)] = description
+            else:
+                exact[holiday_date] = description
+        with self._lock:
+            self._exact, self._recurring = exact, recurring
+            self._blocked, self._years = {}, set()
+            self._version = version
+            self._checked_at = now
+
+    @staticmethod
+    def _read_version(cur):
+        """Current holidays version, or None to reload on every TTL expiry."""
+        try:
+            version = HOLIDAYS_VERSION.scalar(cur)
+        except oracledb.DatabaseError as err:
+            error_obj, = err.args
+            if getattr(error_obj, 'code', None) != ORA_TABLE_NOT_FOUND:
+                raise
+            return None
+        return version if version is not None else 0
+
+    def _expand(self, year):
+        for (month, day), description in self._recurring.items():
+            try:
+                self._blocked[date(year, month, day)] = description
+            except ValueError:
+                pass  # 29 February outside leap years
+        for holiday_date, description in self._exact.items():
+            if holiday_date.year == year:
+                self._blocked[holiday_date] = description
+        self._years.add(year)
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+business_calendar = BusinessCalendar()
@@ -0,0 +1,254 @@
+# database/pagination.py
+
+"""Keyset (seek) pagination helpers.
+
+Pages are addressed by an opaque cursor holding the sort key of the last
+(or first) row shown, so fetching any page costs an index range scan of
+``per_page`` rows instead of numbering the whole table.
+
+NULL sort values order as the highest value (``NULLS LAST`` ascending,
+``NULLS FIRST`` descending, as in the indexes), and the seek predicate
+places them the same way, so rows without a value are paged like any
+other. A cursor also names the sort and direction it was made for and is
+ignored under any other.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from database.statements import statements, ROW
+
+# Optimizer statistics row count of a table
+TABLE_NUM_ROWS = statements.define('pagination.num_rows', """
+    SELECT num_rows FROM user_tables WHERE table_name = :table_name
+""", ROW)
+
+
+class Page:
+    def __init__(self, rows, has_next, has_prev, next_cursor, prev_cursor):
+        self.rows = rows
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+class ListParams:
+    """Sort, search and page position of a list request.
+
+    ``sorts`` maps each sortable name of a list to ``(sort column, record
+    attribute, descending by default)``; unknown names fall back to
+    ``default_sort``.
+    """
+
+    def __init__(self, args, sorts, default_sort, per_page, max_per_page=100):
+        self.sort = args.get('sort', default_sort)
+        if self.sort not in sorts:
+            self.sort = default_sort
+        self.sort_column, self.sort_field, default_desc = sorts[self.sort]
+        direction = args.get('dir', '').lower()
+        self.descending = default_desc if direction not in ('asc', 'desc') else direction == 'desc'
+        self.search = (args.get('q') or '').strip()
+        try:
+            per_page = int(args.get('per_page', per_page))
+        except (TypeError, ValueError):
+            pass
+        self.per_page = min(max(per_page, 1), max_per_page)
+        self.after = args.get('after')
+        self.before = args.get('before')
+
+    def link_args(self):
+        """Query arguments that keep sort, search and page size across page links."""
+        args = {'sort': self.sort, 'dir': 'desc' if self.descending else 'asc',
+                'per_page': self.per_page}
+        if self.search:
+            args['q'] = self.search
+        return args
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and '$dt' in value:
+        return datetime.fromisoformat(value['$dt'])
+    return value
+
+
+def _direction(descending):
+    return 'desc' if descending else 'asc'
+
+
+def encode_cursor(sort, descending, value, row_id):
+    """Cursor of the row with sort ``value`` and ``row_id`` under ``sort``/``descending``."""
+    values = [sort, _direction(descending), _encode_value(value), _encode_value(row_id)]
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, sort, descending):
+    """Return the cursor's ``[sort value, id]``.
+
+    None when the token is missing or malformed, or was made for another
+    sort or direction than ``sort``/``descending``.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != 4:
+        return None
+    if values[:2] != [sort, _direction(descending)]:
+        return None
+    return [_decode_value(v) for v in values[2:]]
+
+
+def _seek_clause(sort_column, id_column, value, greater):
+    """Rows past ``(value, id)`` in ``sort_column``/``id_column`` order, NULL highest.
+
+    ``greater`` seeks upwards (ascending order), otherwise downwards.
+    Binds ``:k_id``, and ``:k_sort`` unless ``value`` is NULL.
+    """
+    op = '>' if greater else '<'
+    if value is None:
+        if greater:
+            return f"({sort_column} IS NULL AND {id_column} {op} :k_id)"
+        return f"({sort_column} IS NOT NULL OR {id_column} {op} :k_id)"
+    clause = f"{sort_column} {op} :k_sort OR ({sort_column} = :k_sort AND {id_column} {op} :k_id)"
+    if greater:
+        clause += f" OR {sort_column} IS NULL"
+    return f"({clause})"
+
+
+def fetch_page(cur, select_sql, clauses, binds, sort_column, id_column,
+               key, per_page, after=None, before=None, descending=True, record=None,
+               sort=None):
+    """Fetch one keyset page.
+
+    ``select_sql`` is the SELECT ... FROM part without WHERE/ORDER BY;
+    ``clauses`` are extra AND-ed predicates; rows are fetched as ``record``
+    instances (see ``database.records``) and ``key(row)`` returns the
+    ``(sort value, id)`` pair of one. ``after`` continues past the
+    last row of the previous page, ``before`` walks back from the first row
+    of the next page. ``sort`` names the ordering in the cursors (the sort
+    column by default).
+    """
+    sort = sort or sort_column
+    backwards = bool(before) and not after
+    position = decode_cursor(before if backwards else after, sort, descending)
+    clauses = list(clauses)
+    binds = dict(binds)
+
+    forward_desc = descending != backwards
+    if position is not None:
+        value, binds['k_id'] = position
+        if value is not None:
+            binds['k_sort'] = value
+        clauses.append(_seek_clause(sort_column, id_column, value, not forward_desc))
+
+    direction = 'DESC NULLS FIRST' if forward_desc else 'ASC NULLS LAST'
+    id_direction = 'DESC' if forward_desc else 'ASC'
+    sql = select_sql
+    if clauses:
+        sql += "\nWHERE " + "\n  AND ".join(clauses)
+    sql += (f"\nORDER BY {sort_column} {direction}, {id_column} {id_direction}"
+            f"\nFETCH FIRST :k_limit ROWS ONLY")
+    binds['k_limit'] = per_page + 1
+
+    cur.execute(sql, binds)
+    if record is not None:
+        cur.rowfactory = record
+    rows = cur.fetchall()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+        has_next, has_prev = True, more
+    else:
+        has_next, has_prev = more, position is not None
+
+    next_cursor = encode_cursor(sort, descending, *key(rows[-1])) if has_next and rows else None
+    prev_cursor = encode_cursor(sort, descending, *key(rows[0])) if has_prev and rows else None
+    return Page(rows, has_next, has_prev, next_cursor, prev_cursor)
+
+
+def fetch_list_page(cur, select_sql, clauses, binds, id_column, id_field,
+                    params, search_columns=(), record=None):
+    """Keyset page of a sortable, searchable list.
+
+    The search term is matched case-insensitively as a substring of any of
+    ``search_columns``; sorting uses ``params.sort_column`` with
+    ``id_column`` as tie-breaker. Cursors carry ``params.sort`` and its
+    direction, so a cursor from another sort starts over at the first page.
+    """
+    clauses, binds = list(clauses), dict(binds)
+    if params.search and search_columns:
+        clauses.append("(" + " OR ".join(f"UPPER({column}) LIKE :q_search ESCAPE '\\'"
+                                         for column in search_columns) + ")")
+        escaped = params.search.upper().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        binds['q_search'] = f"%{escaped}%"
+
+    sort_field = params.sort_field
+    return fetch_page(cur, select_sql, clauses, binds, params.sort_column, id_column,
+                      lambda row: (getattr(row, sort_field), getattr(row, id_field)),
+                      params.per_page, after=params.after, before=params.before,
+                      descending=params.descending, record=record, sort=params.sort)
+
+
+def in_list(values, prefix='id'):
+    """``(placeholders, binds)`` for an ``IN (...)`` over ``values``."""
+    binds = {f"{prefix}{n}": value for n, value in enumerate(values)}
+    return ", ".join(f":{name}" for name in binds), binds
+
+
+def page_json(page, columns, params):
+    """JSON body of a list page: the ``columns`` of each record plus cursor links."""
+    return {
+        'items':       [{column: _json_value(getattr(row, column)) for column in columns}
+                        for row in page.rows],
+        'has_next':    page.has_next,
+        'has_prev':    page.has_prev,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        **params.link_args()
+    }
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def estimate_count(cur, table, clauses, binds, cap=1000):
+    """Cheap row count for page headers: ``(count, kind)``.
+
+    Unfiltered tables use the optimizer statistics (``kind == 'estimate'``);
+    filtered counts stop after ``cap`` matching rows (``kind == 'capped'``
+    when the cap was hit, ``'exact'`` otherwise).
+    """
+    if not clauses:
+        row = TABLE_NUM_ROWS.one(cur, {'table_name': table.upper()})
+        if row and row[0] is not None:
+            return row[0], 'estimate'
+
+    sql = f"SELECT COUNT(*) FROM (SELECT 1 FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " FETCH FIRST :count_cap ROWS ONLY)"
+    cur.execute(sql, dict(binds, count_cap=cap + 1))
+    count = cur.fetchone()[0]
+    if count > cap:
+        return cap, 'capped'
+    return count, 'exact'
@@ -0,0 +1,79 @@
+# database/records.py
+
+"""Row records.
+
+Queries whose rows reach templates or JSON hand them back as small
+``__slots__`` objects instead of tuples, by setting ``cursor.rowfactory``
+(``NamedStatement(record=...)``, ``fetch_page(record=...)``). Attributes are
+named after the columns, so ``transfer.asset_value`` replaces
+``transfer[7]``; money and percentages are converted to float once, when
+the row is fetched.
+
+Records of the domain lists live next to their SQL (``Transfer``,
+``AuditEntry``, ``WillSummary``, ``BeneficiarySummary``); the ones below
+belong to the route statements of ``database.statements``.
+"""
+
+
+def to_float(value):
+    """NUMBER column as float, keeping NULL as None."""
+    return None if value is None else float(value)
+
+
+class Record:
+    """Base of the row records; subclasses list their columns in ``__slots__``."""
+
+    __slots__ = ()
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({values})'
+
+
+class AssetSummary(Record):
+    __slots__ = ('name', 'description', 'value', 'asset_type')
+
+    def __init__(self, name, description, value, asset_type):
+        self.name = name
+        self.description = description
+        self.value = to_float(value)
+        self.asset_type = asset_type
+
+
+class AssetAllocation(Record):
+    """A beneficiary's share of one asset, as shown on the assign page."""
+
+    __slots__ = ('beneficiary_name', 'share_percent', 'conditions', 'estimated_value')
+
+    def __init__(self, beneficiary_name, share_percent, conditions, estimated_value):
+        self.beneficiary_name = beneficiary_name
+        self.share_percent = to_float(share_percent)
+        self.conditions = conditions
+        self.estimated_value = to_float(estimated_value)
+
+
+class AssetBeneficiary(Record):
+    __slots__ = ('beneficiary_id', 'full_name', 'relation', 'share_percent')
+
+    def __init__(self, beneficiary_id, full_name, relation, share_percent):
+        self.beneficiary_id = beneficiary_id
+        self.full_name = full_name
+        self.relation = relation
+        self.share_percent = to_float(share_percent)
+
+
+class InheritedAsset(Record):
+    """An asset allocated to a beneficiary, with the value of their share."""
+
+    __slots__ = ('asset_id', 'name', 'asset_type', 'value', 'share_percent', 'inheritance_value')
+
+    def __init__(self, asset_id, name, asset_type, value, share_percent, inheritance_value):
+        self.asset_id = asset_id
+        self.name = name
+        self.asset_type = asset_type
+        self.value = to_float(value)
+        self.share_percent = to_float(share_percent)
+        self.inheritance_value = to_float(inheritance_value)
@@ -0,0 +1,121 @@
+# database/roles.py
+
+import oracledb
+from config import Config
+from util import TTLCache
+from database.connection import db
+from database.statements import statements, SCALAR, ROW
+
+# Every role flag in one round trip, with the version they were read at.
+# One statement, so the flags and the version are from the same snapshot.
+ROLE_FLAGS_SQL = """
+    SELECT (SELECT initial_role FROM users WHERE user_id = :user_id) AS initial_role,
+           CASE WHEN EXISTS (SELECT 1 FROM wills WHERE user_id = :user_id)
+                THEN 1 ELSE 0 END AS is_testator,
+           CASE WHEN EXISTS (SELECT 1 FROM executors WHERE email = :email)
+                THEN 1 ELSE 0 END AS is_executor,
+           CASE WHEN EXISTS (SELECT 1 FROM beneficiaries WHERE email = :email)
+                THEN 1 ELSE 0 END AS is_beneficiary,
+           (SELECT role_version FROM users WHERE user_id = :user_id) AS role_version
+    FROM dual
+"""
+ROLE_FLAGS = statements.define('roles.flags', ROLE_FLAGS_SQL, ROW)
+
+# users.role_version is bumped by the trg_role_version_* triggers, in the
+# transaction of every write that can change a user's roles
+ROLE_VERSION_SQL = "SELECT role_version FROM users WHERE user_id = :user_id"
+ROLE_VERSION = statements.define('roles.version', ROLE_VERSION_SQL, SCALAR)
+
+
+class RoleResolver:
+    """Resolves a user's primary role and all of their roles.
+
+    Roles are resolved together with the user's ``role_version``, which the
+    database bumps in the same transaction as any write that can change
+    them (wills, executors, beneficiaries, ``users.initial_role``). The
+    session keeps the version its roles were resolved at; ``version`` reads
+    the current one with a primary key lookup, kept per user for
+    ``ROLE_VERSION_TTL`` seconds, so a change made through any worker is
+    seen within that time and a user's own writes (``invalidate``) at once.
+
+    Resolved roles are also cached per user and version, so a worker that
+    already resolved the current version re-uses it without a query.
+    """
+
+    def __init__(self, database=db, ttl=None, version_ttl=None):
+        self.database = database
+        self.ttl = ttl if ttl is not None else Config.ROLE_CACHE_TTL
+        self.cache = TTLCache(self.ttl)
+        self.versions = TTLCache(version_ttl if version_ttl is not None else Config.ROLE_VERSION_TTL)
+
+    def version(self, user_id):
+        """Current ``role_version`` of the user, or None if it cannot be read."""
+        version = self.versions.get(user_id)
+        if version is not None:
+            return version
+        try:
+            with self.database.get_cursor(commit=False) as cur:
+                version = ROLE_VERSION.scalar(cur, {'user_id': user_id})
+        except oracledb.Error as e:
+            print(f"Error reading role version: {e}")
+            return None
+        if version is not None:
+            self.versions.set(user_id, version)
+        return version
+
+    def invalidate(self, user_id):
+        """Forget the user's version after a write of theirs that can change their roles."""
+        self.versions.pop(user_id)
+
+    def resolve(self, user_id, email, version=None, strict=False):
+        """Return ``(primary_role, all_roles, role_version)`` for the user.
+
+        With the ``version`` just read by ``version()``, roles cached at that
+        version are returned without a query. Database errors fall back to
+        the plain ``user`` role (and a None version) unless ``strict`` is
+        set, in which case they propagate.
+        """
+        cached = self.cache.get(user_id)
+        if (version is not None and cached is not None
+                and cached[0] == email and cached[1] == version):
+            return cached[2], list(cached[3]), version
+
+        try:
+            with self.database.get_cursor(commit=False) as cur:
+                (initial_role, is_testator, is_executor, is_beneficiary,
+                 role_version) = ROLE_FLAGS.one(cur, {'user_id': user_id, 'email': email})
+        except oracledb.Error as e:
+            if strict:
+                raise
+            print(f"Error resolving user roles: {e}")
+            return 'user', ['user'], None  # Default fallback role, not cached
+
+        primary_role, all_roles = self.roles_from_flags(
+            initial_role, is_testator, is_executor, is_beneficiary)
+        self.cache.set(user_id, (email, role_version, primary_role, tuple(all_roles)))
+        if role_version is not None:
+            self.versions.set(user_id, role_version)
+        return primary_role, all_roles, role_version
+
+    @staticmethod
+    def roles_from_flags(initial_role, is_testator, is_executor, is_beneficiary):
+        # Registered admins stay admin; otherwise testator > executor > beneficiary > initial_role
+        roles = []
+        if initial_role == 'admin':
+            roles.append('admin')
+        if is_testator:
+            roles.append('testator')
+        if is_executor:
+            roles.append('executor')
+        if is_beneficiary:
+            roles.append('beneficiary')
+        if not roles and initial_role:
+            roles.append(initial_role)
+        if not roles:
+            roles.append('user')
+
+        primary_role = 'admin' if initial_role == 'admin' else roles[0]
+        return primary_role, roles
+
+
+roles = RoleResolver()
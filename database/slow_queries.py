@@ -0,0 +1,237 @@
+# database/slow_queries.py
+
+"""Slow-query log.
+
+``RequestMetrics`` times every statement run through ``db.get_cursor``
+during a request, execute and fetches together (see ``metrics.Statement``).
+Statements slower than ``SLOW_QUERY_MS`` are:
+
+- written as one JSON line to the ``dwm.slow_queries`` logger, with the
+  SQL fingerprint, redacted binds, rows fetched and the route;
+- aggregated per fingerprint for the admin page (``/admin/slow-queries``);
+- with ``SLOW_QUERY_EXPLAIN``, explained once per fingerprint at the end
+  of the request and the ``DBMS_XPLAN`` output kept with the aggregate.
+
+Fingerprints normalize literals and whitespace, so the keyset and
+filtered variants built by ``database.pagination`` group by shape.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import deque
+from datetime import date, datetime
+import oracledb
+from flask import g
+from database.connection import db
+
+logger = logging.getLogger('dwm.slow_queries')
+
+EXPLAIN_SQL = "EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}"
+
+PLAN_SQL = """
+    SELECT plan_table_output
+    FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :statement_id, 'TYPICAL'))"""
+
+# Only these can be explained; PL/SQL blocks and procedure calls cannot
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'(?<![\w:])\d+(?:\.\d+)?\b')
+_BIND_LISTS = re.compile(r'\(\s*:\w+(?:\s*,\s*:\w+)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL with comments dropped, literals as ``?`` and whitespace collapsed.
+
+    IN-lists of generated binds (``:id0, :id1, ...``) become ``(:list)`` so
+    batches of different sizes share a fingerprint.
+    """
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _BIND_LISTS.sub('(:list)', sql)
+    sql = _NUMBERS.sub('?', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def redact_binds(binds):
+    """Bind values safe to log: numbers, dates and NULLs as is, the rest by type.
+
+    Strings hold names, emails and will text, so only their length is kept;
+    ``executemany`` batches are reduced to their size.
+    """
+    if isinstance(binds, dict):
+        return {name: _redact(value) for name, value in binds.items()}
+    if isinstance(binds, (list, tuple)):
+        if binds and isinstance(binds[0], (dict, list, tuple)):
+            return f'<{len(binds)} rows>'
+        return [_redact(value) for value in binds]
+    return _redact(binds)
+
+
+def _redact(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return f'<str:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+class FingerprintStats:
+    """Running totals of the slow executions of one normalized statement."""
+
+    def __init__(self, normalized):
+        self.sql = normalized
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.routes = {}
+        self.last_binds = None
+        self.last_seen = None
+        self.plan = None
+
+    def add(self, statement, binds):
+        self.count += 1
+        self.total += statement.seconds
+        self.max = max(self.max, statement.seconds)
+        self.rows += statement.rows
+        route = statement.route or '-'
+        self.routes[route] = self.routes.get(route, 0) + 1
+        self.last_binds = binds
+        self.last_seen = datetime.now()
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class SlowQueryLog:
+    """Listener of ``RequestMetrics`` keeping the statements over the threshold."""
+
+    def __init__(self, database=db, max_fingerprints=500):
+        self.database = database
+        self.max_fingerprints = max_fingerprints
+        self.threshold = 0.5
+        self.explain_plans = False
+        self.explain_per_request = 3
+        self.recent = deque(maxlen=100)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, metrics):
+        self.threshold = app.config.get('SLOW_QUERY_MS', 500) / 1000
+        self.explain_plans = app.config.get('SLOW_QUERY_EXPLAIN', False)
+        self.explain_per_request = app.config.get('SLOW_QUERY_EXPLAIN_TOP', 3)
+        self.recent = deque(maxlen=app.config.get('SLOW_QUERY_RECENT', 100))
+        metrics.statement_listeners.append(self.observe)
+        app.teardown_request(self.capture_plans)
+
+    def observe(self, statement):
+        if statement.seconds < self.threshold:
+            return
+        normalized = normalize_sql(statement.sql)
+        key = fingerprint(normalized)
+        binds = redact_binds(statement.binds)
+        entry = {
+            'fingerprint': key,
+            'ms':          round(statement.seconds * 1000, 3),
+            'rows':        statement.rows,
+            'route':       statement.route,
+            'binds':       binds,
+            'sql':         normalized,
+        }
+        logger.warning(json.dumps(entry, default=str))
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    # Make room by dropping the cheapest fingerprint
+                    del self._stats[min(self._stats, key=lambda k: self._stats[k].total)]
+                stats = self._stats[key] = FingerprintStats(normalized)
+            stats.add(statement, binds)
+            needs_plan = self.explain_plans and stats.plan is None
+            entry['at'] = stats.last_seen
+            self.recent.appendleft(entry)
+        if needs_plan:
+            wanted = g.setdefault('_slow_query_plans', {})
+            if key not in wanted or wanted[key][0] < statement.seconds:
+                wanted[key] = (statement.seconds, statement.sql)
+
+    def top(self, limit=25):
+        """The ``limit`` fingerprints with the most slow time, worst first."""
+        with self._lock:
+            ranked = sorted(self._stats.items(), key=lambda item: item[1].total, reverse=True)
+        return ranked[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.recent.clear()
+
+    def capture_plans(self, exc=None):
+        """Explain the worst new slow statements of the request (teardown).
+
+        Skipped when the request failed, so a broken connection or session
+        is not used again; the statements are explained by a later request.
+        """
+        wanted = g.pop('_slow_query_plans', None)
+        if not wanted or exc is not None:
+            return
+        worst = sorted(wanted.items(), key=lambda item: item[1][0], reverse=True)
+        for key, (_, sql) in worst[:self.explain_per_request]:
+            plan = self.explain(key, sql)
+            if plan is None:
+                continue
+            with self._lock:
+                stats = self._stats.get(key)
+                if stats is not None:
+                    stats.plan = plan
+
+    def explain(self, key, sql):
+        """``DBMS_XPLAN.DISPLAY`` text of ``sql``, or None if it cannot be explained.
+
+        This is the optimizer's estimate from ``EXPLAIN PLAN``; binds are
+        left unset, so it may differ from the cursor's plan where bind
+        peeking matters. It runs on a connection of its own, never the
+        request's, and rolls back its ``PLAN_TABLE`` rows, so it neither
+        commits nor discards the request's work.
+        """
+        if _COMMENTS.sub(' ', sql).lstrip().split(None, 1)[0].upper() not in EXPLAINABLE:
+            return None
+        statement_id = f'dwm_{key}'
+        try:
+            conn = self.database.get_connection()
+        except oracledb.Error as err:
+            print(f"Error explaining slow query {key}: {err}")
+            return None
+        cur = conn.cursor()
+        try:
+            cur.execute(EXPLAIN_SQL.format(statement_id=statement_id, sql=sql))
+            cur.execute(PLAN_SQL, {'statement_id': statement_id})
+            lines = [row[0] for row in cur.fetchall()]
+        except oracledb.Error as err:
+            print(f"Error explaining slow query {key}: {err}")
+            return None
+        finally:
+            cur.close()
+            try:
+                conn.rollback()
+            except oracledb.Error:
+                pass
+            self.database.release_connection(conn)
+        return '\n'.join(line or '' for line in lines)
+
+
+slow_queries = SlowQueryLog()
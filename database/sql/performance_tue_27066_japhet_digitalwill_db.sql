@@ -0,0 +1,99 @@
+-- ================================================
+-- Performance objects for tue_27066_japhet_digitalwill_db
+-- Run after the schema script and before the procedures and triggers
+-- scripts, which reference these objects.
+-- ================================================
+
+
+-- ================================================
+-- Table: system_stat_counters
+-- Purpose: Pre-aggregated system statistics for /admin/system-stats
+-- Kept current by the trg_stat_counters_* compound triggers and corrected
+-- nightly by refresh_system_stat_counters (job SYSTEM_STAT_COUNTERS_REFRESH)
+-- Keys: users, wills, assets, beneficiaries, executors, transfers,
+--       asset_value, will_status:<status>
+-- Each key is striped over stat_counters_pkg's stripes: a session adds its
+-- deltas to the stripe of MOD(SID, stripes), so concurrent writers do not
+-- queue on one row lock per key. A key's value is the SUM over its stripes;
+-- the nightly refresh folds them back into stripe 0
+-- ================================================
+
+CREATE TABLE system_stat_counters (
+    stat_key      VARCHAR2(60) NOT NULL,
+    stripe        NUMBER(3) DEFAULT 0 NOT NULL,
+    stat_value    NUMBER DEFAULT 0 NOT NULL,
+    refreshed_at  DATE DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT pk_system_stat_counters PRIMARY KEY (stat_key, stripe)
+) ORGANIZATION INDEX;
+
+-- Recent activity and the keyset-paged wills/transfers lists read the
+-- newest rows of each table through these; the id breaks sort-key ties
+CREATE INDEX idx_wills_created_at         ON wills(created_at DESC, will_id DESC);
+CREATE INDEX idx_transfer_logs_date       ON transfer_logs(transfer_date DESC, transfer_id DESC);
+
+
+-- ================================================
+-- Holidays: indexable lookups for transfer_pkg.check_transfer_date
+-- holiday_mmdd is a virtual column so recurring holidays are matched on an
+-- indexed value instead of TO_CHAR(holiday_date, 'MM-DD') per row; exact
+-- dates use a function-based index on TRUNC(holiday_date)
+-- ================================================
+
+ALTER TABLE holidays ADD (
+    holiday_mmdd VARCHAR2(5) GENERATED ALWAYS AS (TO_CHAR(holiday_date, 'MM-DD')) VIRTUAL
+);
+
+CREATE INDEX idx_holidays_recurring_mmdd  ON holidays(is_recurring, holiday_mmdd);
+CREATE INDEX idx_holidays_day             ON holidays(TRUNC(holiday_date));
+
+-- Version counter read by the in-process calendar (database/holidays.py);
+-- trg_holidays_version bumps it on every change
+MERGE INTO system_stat_counters c
+USING (SELECT 'holidays_version' AS stat_key FROM dual) s
+ON (c.stat_key = s.stat_key AND c.stripe = 0)
+WHEN NOT MATCHED THEN
+    INSERT (stat_key, stat_value) VALUES (s.stat_key, 1);
+COMMIT;
+
+
+-- ================================================
+-- Indexes: wills, beneficiaries and admin user lists
+-- Purpose: the admin user list joins per-table counts grouped by user_id
+-- and email; a testator's wills page seeks (user_id, created_at);
+-- executors and beneficiaries are looked up by the signed-in user's email
+-- on every executor/beneficiary page; the beneficiaries list pages on
+-- (full_name, beneficiary_id)
+-- ================================================
+
+CREATE INDEX idx_wills_user_created       ON wills(user_id, created_at DESC);
+CREATE INDEX idx_executors_email          ON executors(email, will_id);
+CREATE INDEX idx_beneficiaries_email      ON beneficiaries(email);
+CREATE INDEX idx_beneficiaries_name       ON beneficiaries(full_name, beneficiary_id);
+
+
+-- ================================================
+-- Column: users.role_version
+-- Purpose: version of a user's roles, bumped by the trg_role_version_*
+-- triggers; read by primary key on every signed-in request to detect role
+-- changes made through any app worker
+-- ================================================
+
+ALTER TABLE users ADD (role_version NUMBER DEFAULT 0 NOT NULL);
+
+
+-- ================================================
+-- Indexes: audit_log keyset pagination and filters
+-- Purpose: /audit/logs seeks on (timestamp, audit_id) and each filter of the
+-- page leads its own composite index, so every page is a short range scan
+-- ================================================
+
+CREATE INDEX idx_audit_log_ts             ON audit_log(timestamp DESC, audit_id DESC);
+CREATE INDEX idx_audit_log_action_ts      ON audit_log(action, timestamp DESC, audit_id DESC);
+CREATE INDEX idx_audit_log_table_ts       ON audit_log(action_table, timestamp DESC, audit_id DESC);
+CREATE INDEX idx_audit_log_status_ts      ON audit_log(status, timestamp DESC, audit_id DESC);
+
+-- The page header reads user_tables.num_rows instead of COUNT(*)
+BEGIN
+    DBMS_STATS.GATHER_TABLE_STATS(USER, 'AUDIT_LOG');
+END;
+/
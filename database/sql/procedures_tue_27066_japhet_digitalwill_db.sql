@@ -1,3 +1,150 @@
+-- ================================================
+-- Package: audit_pkg
+-- Purpose: Shared audit_log writer for the procedures and triggers below
+-- Entries are buffered per session and written with one FORALL insert and
+-- a single autonomous COMMIT by audit_pkg.flush, instead of an autonomous
+-- transaction and COMMIT per entry. Every procedure flushes before it
+-- returns or re-raises, so error entries survive the caller's rollback.
+-- The web user and client IP come from CLIENT_IDENTIFIER / CLIENT_INFO,
+-- which the Flask app sets on each request connection.
+-- ================================================
+
+CREATE OR REPLACE PACKAGE audit_pkg IS
+    TYPE t_entry IS RECORD (
+        user_name    audit_log.user_name%TYPE,
+        action       audit_log.action%TYPE,
+        action_table audit_log.action_table%TYPE,
+        record_id    audit_log.record_id%TYPE,
+        old_values   audit_log.old_values%TYPE,
+        new_values   audit_log.new_values%TYPE,
+        status       audit_log.status%TYPE,
+        ip_address   audit_log.ip_address%TYPE,
+        logged_at    audit_log.timestamp%TYPE
+    );
+    TYPE t_entries IS TABLE OF t_entry INDEX BY PLS_INTEGER;
+
+    -- The buffer is flushed automatically once it holds this many entries
+    c_batch_size CONSTANT PLS_INTEGER := 100;
+
+    FUNCTION app_user RETURN VARCHAR2;
+    FUNCTION client_ip RETURN VARCHAR2;
+
+    FUNCTION new_entry (
+        p_action     IN VARCHAR2,
+        p_table      IN VARCHAR2,
+        p_record_id  IN VARCHAR2,
+        p_old_values IN VARCHAR2,
+        p_new_values IN VARCHAR2,
+        p_status     IN VARCHAR2
+    ) RETURN t_entry;
+
+    -- Buffer an entry for the next flush
+    PROCEDURE log (
+        p_action     IN VARCHAR2,
+        p_table      IN VARCHAR2,
+        p_record_id  IN VARCHAR2,
+        p_old_values IN VARCHAR2,
+        p_new_values IN VARCHAR2,
+        p_status     IN VARCHAR2
+    );
+
+    -- Write and commit the buffered entries in an autonomous transaction
+    PROCEDURE flush;
+
+    -- Write entries inside the caller's transaction (used by triggers, whose
+    -- audit rows must roll back with the change they describe)
+    PROCEDURE write (p_entries IN t_entries);
+END audit_pkg;
+/
+
+CREATE OR REPLACE PACKAGE BODY audit_pkg IS
+    g_buffer t_entries;
+
+    FUNCTION app_user RETURN VARCHAR2 IS
+    BEGIN
+        RETURN NVL(SYS_CONTEXT('USERENV', 'CLIENT_IDENTIFIER'),
+                   SYS_CONTEXT('USERENV', 'SESSION_USER'));
+    END app_user;
+
+    FUNCTION client_ip RETURN VARCHAR2 IS
+    BEGIN
+        RETURN NVL(SYS_CONTEXT('USERENV', 'CLIENT_INFO'),
+                   SYS_CONTEXT('USERENV', 'IP_ADDRESS'));
+    END client_ip;
+
+    FUNCTION new_entry (
+        p_action     IN VARCHAR2,
+        p_table      IN VARCHAR2,
+        p_record_id  IN VARCHAR2,
+        p_old_values IN VARCHAR2,
+        p_new_values IN VARCHAR2,
+        p_status     IN VARCHAR2
+    ) RETURN t_entry IS
+        v_entry t_entry;
+    BEGIN
+        v_entry.user_name    := app_user;
+        v_entry.action       := p_action;
+        v_entry.action_table := p_table;
+        v_entry.record_id    := p_record_id;
+        v_entry.old_values   := p_old_values;
+        v_entry.new_values   := p_new_values;
+        v_entry.status       := p_status;
+        v_entry.ip_address   := client_ip;
+        v_entry.logged_at    := SYSTIMESTAMP;
+        RETURN v_entry;
+    END new_entry;
+
+    PROCEDURE write (p_entries IN t_entries) IS
+    BEGIN
+        FORALL i IN INDICES OF p_entries
+            INSERT INTO audit_log (
+                user_name, action, action_table, record_id,
+                old_values, new_values, status, ip_address, timestamp
+            ) VALUES (
+                p_entries(i).user_name, p_entries(i).action,
+                p_entries(i).action_table, p_entries(i).record_id,
+                p_entries(i).old_values, p_entries(i).new_values,
+                p_entries(i).status, p_entries(i).ip_address,
+                p_entries(i).logged_at
+            );
+    END write;
+
+    PROCEDURE flush IS
+        PRAGMA AUTONOMOUS_TRANSACTION;
+    BEGIN
+        IF g_buffer.COUNT > 0 THEN
+            write(g_buffer);
+            COMMIT;
+            g_buffer.DELETE;
+        END IF;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            g_buffer.DELETE;
+            -- Silently fail as this is just logging
+    END flush;
+
+    PROCEDURE log (
+        p_action     IN VARCHAR2,
+        p_table      IN VARCHAR2,
+        p_record_id  IN VARCHAR2,
+        p_old_values IN VARCHAR2,
+        p_new_values IN VARCHAR2,
+        p_status     IN VARCHAR2
+    ) IS
+    BEGIN
+        g_buffer(g_buffer.COUNT + 1) := new_entry(
+            p_action, p_table, p_record_id,
+            p_old_values, p_new_values, p_status
+        );
+        IF g_buffer.COUNT >= c_batch_size THEN
+            flush;
+        END IF;
+    END log;
+END audit_pkg;
+/
+
+
 -- ================================================
 -- Procedure: assign_asset_to_beneficiary
 -- Purpose: Assigns a beneficiary to an asset with share % and conditions
@@ -16,7 +163,7 @@ CREATE OR REPLACE PROCEDURE assign_asset_to_beneficiary (
     v_will_status        VARCHAR2(20);
     v_will_id            NUMBER;
     
-    -- Procedure for audit logging with autonomous transaction
+    -- Buffered by audit_pkg; written in one batch by audit_pkg.flush
     PROCEDURE log_audit(
         p_action IN VARCHAR2,
         p_table IN VARCHAR2,
@@ -24,22 +171,9 @@ CREATE OR REPLACE PROCEDURE assign_asset_to_beneficiary (
         p_new_values IN VARCHAR2,
         p_status IN VARCHAR2
     ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id,
-            old_values, new_values, status, ip_address
-        ) VALUES (
-            SYS_CONTEXT('USERENV', 'SESSION_USER'),
-            p_action, p_table, NULL,
-            p_old_values, p_new_values, p_status,
-            SYS_CONTEXT('USERENV', 'IP_ADDRESS')
-        );
-        COMMIT;
-    EXCEPTION
-        WHEN OTHERS THEN
-            ROLLBACK;
-            -- Silently fail as this is just logging
+        audit_pkg.log(p_action, p_table, NULL,
+                      p_old_values, p_new_values, p_status);
     END log_audit;
     
 BEGIN
@@ -102,11 +236,165 @@ EXCEPTION
             SQLERRM, 
             'ERROR'
         );
+        audit_pkg.flush;
         RAISE;
 END;
 /
 
 
+-- ================================================
+-- Package: allocation_pkg
+-- Purpose: Set-based version of assign_asset_to_beneficiary
+-- allocate_will_assets takes a whole allocation matrix for a will as
+-- parallel arrays (one element per asset/beneficiary cell) and replaces the
+-- allocations of every asset it mentions. Will status, asset ownership,
+-- beneficiary existence and the 100% cap are checked once for the whole
+-- matrix; the rows are then written with one DELETE and one FORALL insert.
+-- trg_check_asset_share_percent skips its own checks while prevalidated
+-- returns TRUE.
+-- ================================================
+
+CREATE OR REPLACE PACKAGE allocation_pkg IS
+    TYPE t_numbers IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    TYPE t_texts   IS TABLE OF VARCHAR2(4000) INDEX BY PLS_INTEGER;
+
+    PROCEDURE allocate_will_assets (
+        p_will_id         IN NUMBER,
+        p_asset_ids       IN t_numbers,
+        p_beneficiary_ids IN t_numbers,
+        p_shares          IN t_numbers,
+        p_conditions      IN t_texts
+    );
+
+    -- TRUE only while allocate_will_assets writes a matrix it has already
+    -- checked; the flag itself is private so callers cannot set it
+    FUNCTION prevalidated RETURN BOOLEAN;
+END allocation_pkg;
+/
+
+CREATE OR REPLACE PACKAGE BODY allocation_pkg IS
+    TYPE t_flags IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    TYPE t_totals IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+
+    g_prevalidated BOOLEAN := FALSE;
+
+    FUNCTION prevalidated RETURN BOOLEAN IS
+    BEGIN
+        RETURN g_prevalidated;
+    END prevalidated;
+
+    PROCEDURE allocate_will_assets (
+        p_will_id         IN NUMBER,
+        p_asset_ids       IN t_numbers,
+        p_beneficiary_ids IN t_numbers,
+        p_shares          IN t_numbers,
+        p_conditions      IN t_texts
+    ) IS
+        v_will_status   wills.status%TYPE;
+        v_ids           t_numbers;
+        v_will_assets   t_flags;
+        v_beneficiaries t_flags;
+        v_totals        t_totals;
+        v_assets        t_numbers;
+        v_asset_id      PLS_INTEGER;
+    BEGIN
+        BEGIN
+            SELECT status INTO v_will_status
+            FROM wills
+            WHERE will_id = p_will_id;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                RAISE_APPLICATION_ERROR(-21001, 'Will ID ' || p_will_id || ' does not exist.');
+        END;
+
+        IF v_will_status = 'Executed' THEN
+            RAISE_APPLICATION_ERROR(-21003, 'Cannot assign asset. Will already executed.');
+        END IF;
+
+        -- Every asset of the will, and every beneficiary the matrix names,
+        -- in one query each
+        SELECT asset_id BULK COLLECT INTO v_ids
+        FROM assets
+        WHERE will_id = p_will_id;
+        FOR i IN 1 .. v_ids.COUNT LOOP
+            v_will_assets(v_ids(i)) := TRUE;
+        END LOOP;
+
+        SELECT beneficiary_id BULK COLLECT INTO v_ids
+        FROM beneficiaries
+        WHERE beneficiary_id IN (SELECT COLUMN_VALUE FROM TABLE(p_beneficiary_ids));
+        FOR i IN 1 .. v_ids.COUNT LOOP
+            v_beneficiaries(v_ids(i)) := TRUE;
+        END LOOP;
+
+        -- One pass over the matrix: membership and per-asset totals
+        FOR i IN 1 .. p_asset_ids.COUNT LOOP
+            IF NOT v_will_assets.EXISTS(p_asset_ids(i)) THEN
+                RAISE_APPLICATION_ERROR(-21001,
+                    'Asset ID ' || p_asset_ids(i) || ' does not belong to will ' || p_will_id || '.');
+            END IF;
+            IF NOT v_beneficiaries.EXISTS(p_beneficiary_ids(i)) THEN
+                RAISE_APPLICATION_ERROR(-21002,
+                    'Beneficiary ID ' || p_beneficiary_ids(i) || ' does not exist.');
+            END IF;
+            IF NVL(p_shares(i), 0) <= 0 OR p_shares(i) > 100 THEN
+                RAISE_APPLICATION_ERROR(-21004,
+                    'Share for asset ID ' || p_asset_ids(i) || ' must be between 0 and 100.');
+            END IF;
+            IF v_totals.EXISTS(p_asset_ids(i)) THEN
+                v_totals(p_asset_ids(i)) := v_totals(p_asset_ids(i)) + p_shares(i);
+            ELSE
+                v_totals(p_asset_ids(i)) := p_shares(i);
+            END IF;
+        END LOOP;
+
+        v_asset_id := v_totals.FIRST;
+        WHILE v_asset_id IS NOT NULL LOOP
+            IF v_totals(v_asset_id) > 100 THEN
+                RAISE_APPLICATION_ERROR(-21004,
+                    'Total share for asset ID ' || v_asset_id ||
+                    ' exceeds 100%. Current total: ' || v_totals(v_asset_id) || '%');
+            END IF;
+            v_assets(v_assets.COUNT + 1) := v_asset_id;
+            v_asset_id := v_totals.NEXT(v_asset_id);
+        END LOOP;
+
+        SAVEPOINT before_allocation;
+        g_prevalidated := TRUE;
+        BEGIN
+            FORALL i IN 1 .. v_assets.COUNT
+                DELETE FROM will_asset_beneficiaries
+                WHERE asset_id = v_assets(i);
+
+            FORALL i IN 1 .. p_asset_ids.COUNT
+                INSERT INTO will_asset_beneficiaries (
+                    asset_id, beneficiary_id, share_percent, conditions
+                ) VALUES (
+                    p_asset_ids(i), p_beneficiary_ids(i), p_shares(i), p_conditions(i)
+                );
+            g_prevalidated := FALSE;
+        EXCEPTION
+            WHEN OTHERS THEN
+                g_prevalidated := FALSE;
+                ROLLBACK TO before_allocation;
+                RAISE;
+        END;
+
+        audit_pkg.log('PROCEDURE', 'WILL_ASSET_BENEFICIARIES', p_will_id, NULL,
+                      p_asset_ids.COUNT || ' allocations for ' || v_assets.COUNT || ' assets',
+                      'SUCCESS');
+        audit_pkg.flush;
+    EXCEPTION
+        WHEN OTHERS THEN
+            audit_pkg.log('PROCEDURE', 'WILL_ASSET_BENEFICIARIES', p_will_id,
+                          'allocate_will_assets failed', SQLERRM, 'ERROR');
+            audit_pkg.flush;
+            RAISE;
+    END allocate_will_assets;
+END allocation_pkg;
+/
+
+
 -- ================================================
 -- Procedure: approve_will
 -- Purpose: Sets will status to 'Approved' after verifying executor presence
@@ -124,7 +412,7 @@ IS
     v_incomplete_assets NUMBER;
     v_user            VARCHAR2(100);
     
-    -- Audit subprocedure
+    -- Buffered by audit_pkg; written in one batch by audit_pkg.flush
     PROCEDURE log_audit(
         p_action IN VARCHAR2,
         p_table IN VARCHAR2,
@@ -132,21 +420,9 @@ IS
         p_new_values IN VARCHAR2,
         p_status IN VARCHAR2
     ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id,
-            old_values, new_values, status, ip_address
-        ) VALUES (
-            v_user,
-            p_action, p_table, p_will_id,
-            p_old_values, p_new_values, p_status,
-            SYS_CONTEXT('USERENV', 'IP_ADDRESS')
-        );
-        COMMIT;
-    EXCEPTION
-        WHEN OTHERS THEN
-            ROLLBACK;
+        audit_pkg.log(p_action, p_table, p_will_id,
+                      p_old_values, p_new_values, p_status);
     END log_audit;
     
     -- Status history update procedure
@@ -186,7 +462,7 @@ IS
     
 BEGIN
     -- Get user for logging
-    v_user := SYS_CONTEXT('USERENV', 'SESSION_USER');
+    v_user := audit_pkg.app_user;
 
     -- Ensure will exists and get current status
     SELECT COUNT(*), MAX(status)
@@ -260,6 +536,7 @@ BEGIN
         
         DBMS_OUTPUT.PUT_LINE('Will approved successfully.');
         COMMIT;
+        audit_pkg.flush;
     EXCEPTION
         WHEN OTHERS THEN
             ROLLBACK TO before_approval;
@@ -282,6 +559,7 @@ EXCEPTION
             SQLERRM,
             'ERROR'
         );
+        audit_pkg.flush;
         RAISE;
 END;
 /
@@ -300,7 +578,6 @@ CREATE OR REPLACE PROCEDURE transfer_asset (
 )
 IS
     v_user              VARCHAR2(100);
-    v_ip                VARCHAR2(20);
     v_asset_exists      NUMBER;
     v_beneficiary_exists NUMBER;
     v_is_linked         NUMBER;
@@ -312,7 +589,7 @@ IS
     -- We'll use a generic beneficiary identifier instead of trying to get the actual name
     v_beneficiary_ref   VARCHAR2(200);
     
-    -- Audit helper
+    -- Buffered by audit_pkg; written in one batch by audit_pkg.flush
     PROCEDURE log_audit(
         p_action IN VARCHAR2,
         p_table IN VARCHAR2,
@@ -320,26 +597,14 @@ IS
         p_new_values IN VARCHAR2,
         p_status IN VARCHAR2
     ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id,
-            old_values, new_values, status, ip_address
-        ) VALUES (
-            v_user, p_action, p_table, NULL,
-            p_old_values, p_new_values, p_status, v_ip
-        );
-        COMMIT;
-    EXCEPTION
-        WHEN OTHERS THEN
-            ROLLBACK;
-            -- Silently continue as this is just logging
+        audit_pkg.log(p_action, p_table, NULL,
+                      p_old_values, p_new_values, p_status);
     END log_audit;
     
 BEGIN
     -- Get context
-    v_user := SYS_CONTEXT('USERENV', 'SESSION_USER');
-    v_ip := SYS_CONTEXT('USERENV', 'IP_ADDRESS');
+    v_user := audit_pkg.app_user;
     
     -- Create a generic beneficiary reference
     v_beneficiary_ref := 'Beneficiary #' || p_beneficiary_id;
@@ -449,6 +714,7 @@ BEGIN
         );
         
         COMMIT;
+        audit_pkg.flush;
         DBMS_OUTPUT.PUT_LINE('Transfer initiated successfully for asset: ' || v_asset_name || 
                             ' to ' || v_beneficiary_ref);
     EXCEPTION
@@ -477,11 +743,228 @@ EXCEPTION
             SQLERRM,
             'ERROR'
         );
+        audit_pkg.flush;
         RAISE;
 END;
 /
 
 
+-- ================================================
+-- Package: transfer_pkg
+-- Purpose: Weekend/holiday calendar check and batch transfer execution
+-- check_transfer_date holds the rules enforced by
+-- trg_block_weekend_holiday_transfer. execute_will_transfers initiates
+-- every listed allocation of a will in one call: the calendar is checked
+-- once (the trigger skips its per-row check while calendar_checked
+-- returns TRUE), the rows are inserted with FORALL ... SAVE EXCEPTIONS and each
+-- allocation gets a result entry in p_results.
+-- ================================================
+
+CREATE OR REPLACE PACKAGE transfer_pkg IS
+    TYPE t_numbers IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    TYPE t_texts   IS TABLE OF VARCHAR2(4000) INDEX BY PLS_INTEGER;
+
+    -- Raises -20001 on weekends and -20002 on holidays
+    PROCEDURE check_transfer_date (p_date IN DATE);
+
+    -- TRUE only while execute_will_transfers inserts rows it has already
+    -- checked; the flag itself is private so callers cannot set it
+    FUNCTION calendar_checked RETURN BOOLEAN;
+
+    -- p_results(i): 'INITIATED', 'SKIPPED: <reason>' or 'ERROR: <message>'
+    PROCEDURE execute_will_transfers (
+        p_will_id         IN  NUMBER,
+        p_asset_ids       IN  t_numbers,
+        p_beneficiary_ids IN  t_numbers,
+        p_results         OUT t_texts
+    );
+END transfer_pkg;
+/
+
+CREATE OR REPLACE PACKAGE BODY transfer_pkg IS
+    TYPE t_pair_set IS TABLE OF BOOLEAN INDEX BY VARCHAR2(40);
+
+    g_calendar_checked BOOLEAN := FALSE;
+
+    e_bulk_errors EXCEPTION;
+    PRAGMA EXCEPTION_INIT(e_bulk_errors, -24381);
+
+    FUNCTION calendar_checked RETURN BOOLEAN IS
+    BEGIN
+        RETURN g_calendar_checked;
+    END calendar_checked;
+
+    FUNCTION pair_key (p_asset_id IN NUMBER, p_beneficiary_id IN NUMBER) RETURN VARCHAR2 IS
+    BEGIN
+        RETURN p_asset_id || ':' || p_beneficiary_id;
+    END pair_key;
+
+    PROCEDURE check_transfer_date (p_date IN DATE) IS
+        v_day_number   NUMBER;
+        v_is_holiday   NUMBER;
+        v_holiday_name VARCHAR2(100);
+    BEGIN
+        -- Get the day of week as number (1=Sunday, 2=Monday, ..., 7=Saturday)
+        v_day_number := TO_NUMBER(TO_CHAR(p_date, 'D'));
+
+        -- Block transfers on weekends (1=Sunday, 7=Saturday)
+        IF v_day_number IN (1, 7) THEN
+            RAISE_APPLICATION_ERROR(-20001, 
+                'Weekend Transfer Blocked: Asset transfers are not allowed on weekends. ' ||
+                'Today is ' || TO_CHAR(p_date, 'Day') || 
+                '. Please try again on a weekday (Monday-Friday).');
+        END IF;
+
+        -- Check for holidays (both exact and recurring); each branch is an
+        -- index range scan (idx_holidays_day, idx_holidays_recurring_mmdd)
+        SELECT COUNT(*), MAX(description) 
+        INTO v_is_holiday, v_holiday_name
+        FROM (
+            SELECT description FROM holidays
+            WHERE TRUNC(holiday_date) = TRUNC(p_date)
+            UNION ALL
+            SELECT description FROM holidays
+            WHERE is_recurring = 'Y'
+              AND holiday_mmdd = TO_CHAR(p_date, 'MM-DD')
+        );
+
+        IF v_is_holiday > 0 THEN
+            RAISE_APPLICATION_ERROR(-20002, 
+                'Holiday Transfer Blocked: Asset transfers are not allowed on public holidays. ' ||
+                'Today is ' || NVL(v_holiday_name, 'a public holiday') || 
+                ' (' || TO_CHAR(p_date, 'DD-MON-YYYY') || '). ' ||
+                'Please try again on a regular business day.');
+        END IF;
+    END check_transfer_date;
+
+    PROCEDURE execute_will_transfers (
+        p_will_id         IN  NUMBER,
+        p_asset_ids       IN  t_numbers,
+        p_beneficiary_ids IN  t_numbers,
+        p_results         OUT t_texts
+    ) IS
+        v_user        VARCHAR2(100) := audit_pkg.app_user;
+        v_will_status wills.status%TYPE;
+        v_assets      t_numbers;
+        v_bens        t_numbers;
+        v_allocated   t_pair_set;
+        v_transferred t_pair_set;
+        v_ins_assets  t_numbers;
+        v_ins_bens    t_numbers;
+        v_ins_pos     t_numbers;
+        v_initiated   PLS_INTEGER;
+    BEGIN
+        -- Lock the will so two executors cannot run the same batch twice
+        BEGIN
+            SELECT status INTO v_will_status
+            FROM wills
+            WHERE will_id = p_will_id
+            FOR UPDATE;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                RAISE_APPLICATION_ERROR(-23001, 'Will ID ' || p_will_id || ' does not exist.');
+        END;
+
+        IF v_will_status NOT IN ('Approved', 'Executing') THEN
+            RAISE_APPLICATION_ERROR(-23004, 'Cannot transfer asset unless will is Approved or Executing. Current status: ' || v_will_status);
+        END IF;
+
+        -- Once for the whole batch
+        check_transfer_date(SYSDATE);
+
+        -- Allocations of the will and transfers already under way, one query each
+        SELECT wab.asset_id, wab.beneficiary_id
+        BULK COLLECT INTO v_assets, v_bens
+        FROM will_asset_beneficiaries wab
+        JOIN assets a ON wab.asset_id = a.asset_id
+        WHERE a.will_id = p_will_id;
+        FOR i IN 1 .. v_assets.COUNT LOOP
+            v_allocated(pair_key(v_assets(i), v_bens(i))) := TRUE;
+        END LOOP;
+
+        SELECT t.asset_id, t.beneficiary_id
+        BULK COLLECT INTO v_assets, v_bens
+        FROM transfer_logs t
+        JOIN assets a ON t.asset_id = a.asset_id
+        WHERE a.will_id = p_will_id
+          AND t.transfer_status IN ('Initiated', 'Completed');
+        FOR i IN 1 .. v_assets.COUNT LOOP
+            v_transferred(pair_key(v_assets(i), v_bens(i))) := TRUE;
+        END LOOP;
+
+        FOR i IN 1 .. p_asset_ids.COUNT LOOP
+            IF NOT v_allocated.EXISTS(pair_key(p_asset_ids(i), p_beneficiary_ids(i))) THEN
+                p_results(i) := 'ERROR: This beneficiary is not assigned to this asset.';
+            ELSIF v_transferred.EXISTS(pair_key(p_asset_ids(i), p_beneficiary_ids(i))) THEN
+                p_results(i) := 'SKIPPED: Transfer already initiated or completed.';
+            ELSE
+                p_results(i) := 'INITIATED';
+                v_ins_assets(v_ins_assets.COUNT + 1) := p_asset_ids(i);
+                v_ins_bens(v_ins_bens.COUNT + 1) := p_beneficiary_ids(i);
+                v_ins_pos(v_ins_pos.COUNT + 1) := i;
+                -- Guards against the same pair listed twice
+                v_transferred(pair_key(p_asset_ids(i), p_beneficiary_ids(i))) := TRUE;
+            END IF;
+        END LOOP;
+
+        v_initiated := v_ins_assets.COUNT;
+        g_calendar_checked := TRUE;
+        BEGIN
+            FORALL j IN 1 .. v_ins_assets.COUNT SAVE EXCEPTIONS
+                INSERT INTO transfer_logs (
+                    asset_id, beneficiary_id, transfer_date,
+                    approved_by, transfer_status, notes
+                ) VALUES (
+                    v_ins_assets(j), v_ins_bens(j), SYSDATE,
+                    v_user, 'Initiated',
+                    'Transfer initiated by ' || v_user || ' on ' ||
+                    TO_CHAR(SYSDATE, 'DD-MON-YYYY HH24:MI:SS') || ' (batch)'
+                );
+        EXCEPTION
+            WHEN e_bulk_errors THEN
+                FOR k IN 1 .. SQL%BULK_EXCEPTIONS.COUNT LOOP
+                    p_results(v_ins_pos(SQL%BULK_EXCEPTIONS(k).ERROR_INDEX)) :=
+                        'ERROR: ' || SQLERRM(-SQL%BULK_EXCEPTIONS(k).ERROR_CODE);
+                END LOOP;
+                v_initiated := v_initiated - SQL%BULK_EXCEPTIONS.COUNT;
+            WHEN OTHERS THEN
+                -- Never leave the bypass set for the rest of a pooled session
+                g_calendar_checked := FALSE;
+                RAISE;
+        END;
+        g_calendar_checked := FALSE;
+
+        -- Update will status to Executing if currently Approved
+        IF v_initiated > 0 AND v_will_status = 'Approved' THEN
+            UPDATE wills
+            SET status = 'Executing',
+                last_updated_at = SYSDATE
+            WHERE will_id = p_will_id;
+
+            INSERT INTO will_status_history (
+                will_id, old_status, new_status, changed_by, change_date, reason
+            ) VALUES (
+                p_will_id, 'Approved', 'Executing', v_user, SYSDATE,
+                'Automatically changed due to asset transfer initiation'
+            );
+        END IF;
+
+        audit_pkg.log('INSERT', 'TRANSFER_LOGS', p_will_id, NULL,
+                      'Batch transfer: ' || v_initiated || ' of ' || p_asset_ids.COUNT || ' initiated',
+                      'SUCCESS');
+        audit_pkg.flush;
+    EXCEPTION
+        WHEN OTHERS THEN
+            g_calendar_checked := FALSE;
+            audit_pkg.log('PROCEDURE', 'TRANSFER_LOGS', p_will_id,
+                          'execute_will_transfers failed', SQLERRM, 'ERROR');
+            audit_pkg.flush;
+            RAISE;
+    END execute_will_transfers;
+END transfer_pkg;
+/
+
+
 -- ================================================
 -- Procedure: add_document
 -- Purpose: Attaches a document to a will or asset
@@ -496,11 +979,10 @@ CREATE OR REPLACE PROCEDURE add_document (
     p_file_type      IN VARCHAR2
 )
 IS
-    v_user VARCHAR2(100) := SYS_CONTEXT('USERENV', 'SESSION_USER');
-    v_ip   VARCHAR2(20)  := SYS_CONTEXT('USERENV', 'IP_ADDRESS');
+    v_user VARCHAR2(100) := audit_pkg.app_user;
     v_valid_entity NUMBER := 0; -- Changed from BOOLEAN to NUMBER
     v_entity_type VARCHAR2(20);
-    -- Audit helper
+    -- Buffered by audit_pkg; written in one batch by audit_pkg.flush
     PROCEDURE log_audit(
         p_action IN VARCHAR2,
         p_table IN VARCHAR2,
@@ -508,16 +990,9 @@ IS
         p_new_values IN VARCHAR2,
         p_status IN VARCHAR2
     ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id,
-            old_values, new_values, status, ip_address
-        ) VALUES (
-            v_user, p_action, 'DOCUMENTS', NULL,
-            p_old_values, p_new_values, p_status, v_ip
-        );
-        COMMIT;
+        audit_pkg.log(p_action, 'DOCUMENTS', NULL,
+                      p_old_values, p_new_values, p_status);
     END log_audit;
 BEGIN
     -- Normalize entity input
@@ -570,6 +1045,7 @@ BEGIN
     );
     
     COMMIT; -- Added explicit commit
+    audit_pkg.flush;
     
     DBMS_OUTPUT.PUT_LINE('Document successfully linked to ' || v_entity_type || ' ID ' || p_entity_id);
 EXCEPTION
@@ -582,6 +1058,7 @@ EXCEPTION
             'ERROR'
         );
         ROLLBACK; -- Added explicit rollback
+        audit_pkg.flush;
         RAISE;
 END;
 /
@@ -598,14 +1075,13 @@ CREATE OR REPLACE PROCEDURE set_primary_executor (
     p_executor_id IN NUMBER
 )
 IS
-    v_user         VARCHAR2(100) := SYS_CONTEXT('USERENV', 'SESSION_USER');
-    v_ip           VARCHAR2(20)  := SYS_CONTEXT('USERENV', 'IP_ADDRESS');
+    v_user         VARCHAR2(100) := audit_pkg.app_user;
     v_will_id      NUMBER;
     v_exec_exists  NUMBER;
     v_rows_updated NUMBER;
     v_current_primary NUMBER;
     
-    -- Audit helper
+    -- Buffered by audit_pkg; written in one batch by audit_pkg.flush
     PROCEDURE log_audit(
         p_action IN VARCHAR2,
         p_table IN VARCHAR2,
@@ -614,17 +1090,9 @@ IS
         p_status IN VARCHAR2,
         p_record_id IN NUMBER DEFAULT NULL
     ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
-        v_record_id NUMBER := NVL(p_record_id, p_executor_id);
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id,
-            old_values, new_values, status, ip_address
-        ) VALUES (
-            v_user, p_action, p_table, v_record_id,
-            p_old_values, p_new_values, p_status, v_ip
-        );
-        COMMIT;
+        audit_pkg.log(p_action, p_table, NVL(p_record_id, p_executor_id),
+                      p_old_values, p_new_values, p_status);
     END log_audit;
 
 BEGIN
@@ -718,6 +1186,7 @@ BEGIN
 
         DBMS_OUTPUT.PUT_LINE('Executor ' || p_executor_id || ' set as primary for will ' || v_will_id);
         COMMIT;
+        audit_pkg.flush;
     EXCEPTION
         WHEN OTHERS THEN
             ROLLBACK TO before_primary;
@@ -740,6 +1209,7 @@ EXCEPTION
             'Error: ' || SQLERRM || ' for executor ID ' || p_executor_id,
             'ERROR'
         );
+        audit_pkg.flush;
         RAISE;
 END;
 /
@@ -757,8 +1227,7 @@ CREATE OR REPLACE PROCEDURE delete_draft_will (
     p_confirm_text  IN VARCHAR2 DEFAULT NULL
 )
 IS
-    v_user            VARCHAR2(100) := SYS_CONTEXT('USERENV', 'SESSION_USER');
-    v_ip              VARCHAR2(20)  := SYS_CONTEXT('USERENV', 'IP_ADDRESS');
+    v_user            VARCHAR2(100) := audit_pkg.app_user;
     v_status          VARCHAR2(20);
     v_exists          NUMBER;
     v_asset_count     NUMBER;
@@ -768,7 +1237,7 @@ IS
     v_deleted_rows    NUMBER := 0;
     v_confirm_required VARCHAR2(20) := 'DELETE-CONFIRM';
     
-    -- Audit helper with enhanced details
+    -- Buffered by audit_pkg; written in one batch by audit_pkg.flush
     PROCEDURE log_audit(
         p_action     IN VARCHAR2,
         p_table      IN VARCHAR2,
@@ -777,16 +1246,9 @@ IS
         p_status     IN VARCHAR2,
         p_record_id  IN NUMBER DEFAULT p_will_id
     ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id,
-            old_values, new_values, status, ip_address
-        ) VALUES (
-            v_user, p_action, p_table, p_record_id,
-            p_old_values, p_new_values, p_status, v_ip
-        );
-        COMMIT;
+        audit_pkg.log(p_action, p_table, p_record_id,
+                      p_old_values, p_new_values, p_status);
     END log_audit;
     
     -- Helper to track deletion counts
@@ -942,6 +1404,7 @@ BEGIN
         
         DBMS_OUTPUT.PUT_LINE('Will ID ' || p_will_id || ' and ' || (v_deleted_rows-1) || ' related records deleted successfully.');
         COMMIT;
+        audit_pkg.flush;
     EXCEPTION
         WHEN OTHERS THEN
             ROLLBACK TO before_deletion;
@@ -963,6 +1426,133 @@ EXCEPTION
             'Error: ' || SQLERRM || ' (error code: ' || SQLCODE || ')',
             'ERROR'
         );
+        audit_pkg.flush;
         RAISE;
 END;
-/
\ No newline at end of file
+/
+
+-- ================================================
+-- Procedure: refresh_system_stat_counters
+-- Purpose: Recomputes every counter of system_stat_counters from the base
+-- tables into stripe 0 and drops the other stripes. The compound triggers
+-- keep the counters current between runs; the nightly
+-- SYSTEM_STAT_COUNTERS_REFRESH job corrects any drift
+-- ================================================
+
+CREATE OR REPLACE PROCEDURE refresh_system_stat_counters
+IS
+BEGIN
+    -- The triggers apply their deltas in the writing transaction. Waiting
+    -- for those in flight and holding writers off until COMMIT means every
+    -- delta is either in the counts below or lands on a stripe afterwards,
+    -- never lost to the DELETE
+    LOCK TABLE system_stat_counters IN EXCLUSIVE MODE;
+
+    MERGE INTO system_stat_counters c
+    USING (
+        SELECT 'users' AS stat_key, COUNT(*) AS stat_value FROM users
+        UNION ALL SELECT 'wills', COUNT(*) FROM wills
+        UNION ALL SELECT 'assets', COUNT(*) FROM assets
+        UNION ALL SELECT 'beneficiaries', COUNT(*) FROM beneficiaries
+        UNION ALL SELECT 'executors', COUNT(*) FROM executors
+        UNION ALL SELECT 'transfers', COUNT(*) FROM transfer_logs
+        UNION ALL SELECT 'asset_value', NVL(SUM(value), 0) FROM assets
+        UNION ALL
+        SELECT 'will_status:' || status, COUNT(*) FROM wills GROUP BY status
+    ) s
+    ON (c.stat_key = s.stat_key AND c.stripe = 0)
+    WHEN MATCHED THEN
+        UPDATE SET c.stat_value = s.stat_value, c.refreshed_at = SYSDATE
+    WHEN NOT MATCHED THEN
+        INSERT (stat_key, stripe, stat_value, refreshed_at)
+        VALUES (s.stat_key, 0, s.stat_value, SYSDATE);
+
+    -- Stripe 0 now holds the totals
+    DELETE FROM system_stat_counters WHERE stripe != 0;
+
+    -- Statuses that no longer have any will
+    UPDATE system_stat_counters c
+    SET stat_value = 0, refreshed_at = SYSDATE
+    WHERE c.stat_key LIKE 'will_status:%'
+      AND NOT EXISTS (SELECT 1 FROM wills w
+                      WHERE 'will_status:' || w.status = c.stat_key);
+
+    COMMIT;
+END;
+/
+
+-- ================================================
+-- Package: stat_counters_pkg
+-- Purpose: Collects counter deltas inside a trg_stat_counters_* trigger and
+-- applies them once per statement, to the stripe of the session's SID
+-- ================================================
+
+CREATE OR REPLACE PACKAGE stat_counters_pkg IS
+    TYPE t_deltas IS TABLE OF NUMBER INDEX BY VARCHAR2(60);
+    PROCEDURE add(p_deltas IN OUT NOCOPY t_deltas, p_key IN VARCHAR2, p_delta IN NUMBER);
+    PROCEDURE apply(p_deltas IN OUT NOCOPY t_deltas);
+END stat_counters_pkg;
+/
+
+CREATE OR REPLACE PACKAGE BODY stat_counters_pkg IS
+    -- Rows per counter; well above the number of sessions that write the
+    -- estate tables at the same time
+    c_stripes CONSTANT PLS_INTEGER := 16;
+
+    PROCEDURE add(p_deltas IN OUT NOCOPY t_deltas, p_key IN VARCHAR2, p_delta IN NUMBER) IS
+    BEGIN
+        IF p_key IS NULL OR NVL(p_delta, 0) = 0 THEN
+            RETURN;
+        END IF;
+        IF p_deltas.EXISTS(p_key) THEN
+            p_deltas(p_key) := p_deltas(p_key) + p_delta;
+        ELSE
+            p_deltas(p_key) := p_delta;
+        END IF;
+    END add;
+
+    PROCEDURE apply(p_deltas IN OUT NOCOPY t_deltas) IS
+        v_key    VARCHAR2(60) := p_deltas.FIRST;
+        v_stripe PLS_INTEGER;
+    BEGIN
+        IF v_key IS NULL THEN
+            RETURN;
+        END IF;
+        v_stripe := MOD(TO_NUMBER(SYS_CONTEXT('USERENV', 'SID')), c_stripes);
+
+        -- One MERGE per distinct key, not per row
+        WHILE v_key IS NOT NULL LOOP
+            IF p_deltas(v_key) != 0 THEN
+                MERGE INTO system_stat_counters c
+                USING (SELECT v_key AS stat_key, v_stripe AS stripe,
+                              p_deltas(v_key) AS delta FROM dual) s
+                ON (c.stat_key = s.stat_key AND c.stripe = s.stripe)
+                WHEN MATCHED THEN
+                    UPDATE SET c.stat_value = c.stat_value + s.delta
+                WHEN NOT MATCHED THEN
+                    INSERT (stat_key, stripe, stat_value)
+                    VALUES (s.stat_key, s.stripe, s.delta);
+            END IF;
+            v_key := p_deltas.NEXT(v_key);
+        END LOOP;
+        p_deltas.DELETE;
+    END apply;
+END stat_counters_pkg;
+/
+
+BEGIN
+    refresh_system_stat_counters;
+END;
+/
+
+BEGIN
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'SYSTEM_STAT_COUNTERS_REFRESH',
+        job_type        => 'STORED_PROCEDURE',
+        job_action      => 'REFRESH_SYSTEM_STAT_COUNTERS',
+        start_date      => TRUNC(SYSTIMESTAMP) + 1 + 2/24,
+        repeat_interval => 'FREQ=DAILY;BYHOUR=2;BYMINUTE=0',
+        enabled         => TRUE,
+        comments        => 'Recompute system_stat_counters to correct any drift');
+END;
+/
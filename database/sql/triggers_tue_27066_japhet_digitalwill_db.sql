@@ -7,45 +7,13 @@
 CREATE OR REPLACE TRIGGER trg_block_weekend_holiday_transfer 
 BEFORE INSERT ON transfer_logs 
 FOR EACH ROW 
-DECLARE
-    v_day_number NUMBER;
-    v_is_holiday NUMBER;
-    v_holiday_name VARCHAR2(100);
-    v_transfer_date DATE := NVL(:NEW.transfer_date, SYSDATE);
 BEGIN
-    -- Get the day of week as number (1=Sunday, 2=Monday, ..., 7=Saturday)
-    -- Using TO_CHAR with 'D' format which is NLS-independent
-    v_day_number := TO_NUMBER(TO_CHAR(v_transfer_date, 'D'));
-    
-    -- Block transfers on weekends (1=Sunday, 7=Saturday)
-    IF v_day_number IN (1, 7) THEN
-        RAISE_APPLICATION_ERROR(-20001, 
-            'Weekend Transfer Blocked: Asset transfers are not allowed on weekends. ' ||
-            'Today is ' || TO_CHAR(v_transfer_date, 'Day') || 
-            '. Please try again on a weekday (Monday-Friday).');
-    END IF;
-    
-    -- Check for holidays (both exact and recurring)
-    BEGIN
-        SELECT COUNT(*), MAX(description) 
-        INTO v_is_holiday, v_holiday_name
-        FROM holidays
-        WHERE (TRUNC(holiday_date) = TRUNC(v_transfer_date)) -- Exact match
-           OR (is_recurring = 'Y' AND 
-               TO_CHAR(holiday_date, 'MM-DD') = TO_CHAR(v_transfer_date, 'MM-DD'));
-    EXCEPTION
-        WHEN NO_DATA_FOUND THEN
-            v_is_holiday := 0;
-            v_holiday_name := NULL;
-    END;
-    
-    IF v_is_holiday > 0 THEN
-        RAISE_APPLICATION_ERROR(-20002, 
-            'Holiday Transfer Blocked: Asset transfers are not allowed on public holidays. ' ||
-            'Today is ' || NVL(v_holiday_name, 'a public holiday') || 
-            ' (' || TO_CHAR(v_transfer_date, 'DD-MON-YYYY') || '). ' ||
-            'Please try again on a regular business day.');
+    -- transfer_pkg.execute_will_transfers checks the calendar once per batch
+    IF transfer_pkg.calendar_checked THEN
+        RETURN;
     END IF;
+
+    transfer_pkg.check_transfer_date(NVL(:NEW.transfer_date, SYSDATE));
     
 EXCEPTION
     WHEN OTHERS THEN
@@ -61,6 +29,26 @@ EXCEPTION
 END;
 /
 
+-- ======================================
+-- Trigger: trg_holidays_version
+-- Purpose: Bump the holidays_version counter so the application's
+-- in-process calendar reloads the holidays table
+-- ======================================
+
+CREATE OR REPLACE TRIGGER trg_holidays_version
+AFTER INSERT OR UPDATE OR DELETE ON holidays
+BEGIN
+    MERGE INTO system_stat_counters c
+    USING (SELECT 'holidays_version' AS stat_key FROM dual) s
+    ON (c.stat_key = s.stat_key AND c.stripe = 0)
+    WHEN MATCHED THEN
+        UPDATE SET c.stat_value = c.stat_value + 1, c.refreshed_at = SYSDATE
+    WHEN NOT MATCHED THEN
+        INSERT (stat_key, stat_value, refreshed_at)
+        VALUES (s.stat_key, 1, SYSDATE);
+END;
+/
+
 -- Also let's create a simple test procedure to check weekend blocking
 CREATE OR REPLACE PROCEDURE test_weekend_blocking 
 IS
@@ -100,7 +88,7 @@ FOR EACH ROW
 DECLARE
     v_user VARCHAR2(100);
     v_client_info VARCHAR2(100);
-    v_ip_address VARCHAR2(15);
+    v_ip_address VARCHAR2(64);
     v_reason VARCHAR2(255);
     v_valid_transition BOOLEAN := TRUE;
     
@@ -177,9 +165,9 @@ BEGIN
     -- Only proceed if status actually changed
     IF :OLD.status != :NEW.status THEN
         -- Get user context information
-        v_user := SYS_CONTEXT('USERENV', 'SESSION_USER');
+        v_user := audit_pkg.app_user;
         v_client_info := SYS_CONTEXT('USERENV', 'CLIENT_IDENTIFIER');
-        v_ip_address := SYS_CONTEXT('USERENV', 'IP_ADDRESS');
+        v_ip_address := audit_pkg.client_ip;
         
         -- Get reason from context if provided, otherwise use default
         v_reason := NVL(SYS_CONTEXT('WILL_CTX', 'STATUS_CHANGE_REASON'), 
@@ -272,158 +260,172 @@ BEGIN
 END;
 /
 
--- Asset trigger with exception handling
+-- Asset trigger: touches each affected will once per statement instead of
+-- one autonomous UPDATE and COMMIT per asset row (bulk imports insert
+-- hundreds of assets in one statement)
 CREATE OR REPLACE TRIGGER trg_update_last_modified_on_assets
-AFTER INSERT OR UPDATE OR DELETE ON assets
-FOR EACH ROW
-DECLARE
-    v_will_id NUMBER := NVL(:NEW.will_id, :OLD.will_id);
-    PRAGMA AUTONOMOUS_TRANSACTION;
-BEGIN
-    IF v_will_id IS NOT NULL THEN
-        BEGIN
-            EXECUTE IMMEDIATE 
-                'UPDATE wills SET last_updated_at = SYSDATE WHERE will_id = :1'
-                USING v_will_id;
-            COMMIT; -- Must commit in autonomous transaction
-        EXCEPTION
-            WHEN OTHERS THEN
-                ROLLBACK;
-                -- Log error through separate insert to avoid recursion
-                EXECUTE IMMEDIATE
-                    'INSERT INTO audit_log (user_name, action, action_table, record_id, old_values, new_values, status) 
-                     VALUES (:1, :2, :3, :4, :5, :6, :7)'
-                    USING 
-                    SYS_CONTEXT('USERENV', 'SESSION_USER'),
-                    'UPDATE', 
-                    'ASSETS', 
-                    NVL(TO_CHAR(:NEW.asset_id), TO_CHAR(:OLD.asset_id)),
-                    'Error updating wills.last_updated_at', 
-                    SQLERRM, 
-                    'ERROR';
-                COMMIT;
-        END;
-    END IF;
-END;
+FOR INSERT OR UPDATE OR DELETE ON assets
+COMPOUND TRIGGER
+    TYPE t_will_set IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    TYPE t_will_ids IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    v_wills t_will_set;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF NVL(:NEW.will_id, :OLD.will_id) IS NOT NULL THEN
+            v_wills(NVL(:NEW.will_id, :OLD.will_id)) := TRUE;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_ids t_will_ids;
+        v_id  PLS_INTEGER := v_wills.FIRST;
+    BEGIN
+        WHILE v_id IS NOT NULL LOOP
+            v_ids(v_ids.COUNT + 1) := v_id;
+            v_id := v_wills.NEXT(v_id);
+        END LOOP;
+        v_wills.DELETE;
+
+        FORALL i IN 1 .. v_ids.COUNT
+            UPDATE wills SET last_updated_at = SYSDATE WHERE will_id = v_ids(i);
+    EXCEPTION
+        WHEN OTHERS THEN
+            audit_pkg.log('UPDATE', 'ASSETS', NULL,
+                          'Error updating wills.last_updated_at', SQLERRM, 'ERROR');
+            audit_pkg.flush;
+    END AFTER STATEMENT;
+END trg_update_last_modified_on_assets;
 /
 
--- Executor trigger with exception handling
+-- Executor trigger: touches each affected will once per statement, in the
+-- executor change's own transaction, so the will's version never moves
+-- before the executors it stands for are committed
 CREATE OR REPLACE TRIGGER trg_update_last_modified_on_executors
-AFTER INSERT OR UPDATE OR DELETE ON executors
-FOR EACH ROW
-DECLARE
-    v_will_id NUMBER := NVL(:NEW.will_id, :OLD.will_id);
-    PRAGMA AUTONOMOUS_TRANSACTION;
-BEGIN
-    IF v_will_id IS NOT NULL THEN
-        BEGIN
-            EXECUTE IMMEDIATE 
-                'UPDATE wills SET last_updated_at = SYSDATE WHERE will_id = :1'
-                USING v_will_id;
-            COMMIT; -- Must commit in autonomous transaction
-        EXCEPTION
-            WHEN OTHERS THEN
-                ROLLBACK;
-                -- Log error through separate insert to avoid recursion
-                EXECUTE IMMEDIATE
-                    'INSERT INTO audit_log (user_name, action, action_table, record_id, old_values, new_values, status) 
-                     VALUES (:1, :2, :3, :4, :5, :6, :7)'
-                    USING 
-                    SYS_CONTEXT('USERENV', 'SESSION_USER'),
-                    'UPDATE', 
-                    'EXECUTORS', 
-                    NVL(TO_CHAR(:NEW.executor_id), TO_CHAR(:OLD.executor_id)),
-                    'Error updating wills.last_updated_at', 
-                    SQLERRM, 
-                    'ERROR';
-                COMMIT;
-        END;
-    END IF;
-END;
+FOR INSERT OR UPDATE OR DELETE ON executors
+COMPOUND TRIGGER
+    TYPE t_will_set IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    TYPE t_will_ids IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    v_wills t_will_set;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF NVL(:NEW.will_id, :OLD.will_id) IS NOT NULL THEN
+            v_wills(NVL(:NEW.will_id, :OLD.will_id)) := TRUE;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_ids t_will_ids;
+        v_id  PLS_INTEGER := v_wills.FIRST;
+    BEGIN
+        WHILE v_id IS NOT NULL LOOP
+            v_ids(v_ids.COUNT + 1) := v_id;
+            v_id := v_wills.NEXT(v_id);
+        END LOOP;
+        v_wills.DELETE;
+
+        FORALL i IN 1 .. v_ids.COUNT
+            UPDATE wills SET last_updated_at = SYSDATE WHERE will_id = v_ids(i);
+    EXCEPTION
+        WHEN OTHERS THEN
+            audit_pkg.log('UPDATE', 'EXECUTORS', NULL,
+                          'Error updating wills.last_updated_at', SQLERRM, 'ERROR');
+            audit_pkg.flush;
+    END AFTER STATEMENT;
+END trg_update_last_modified_on_executors;
 /
 
--- Asset-beneficiary trigger with improved error handling and efficiency
+-- Asset-beneficiary trigger: collects the touched assets and updates each
+-- parent will once per statement, so a FORALL allocation of a whole will
+-- costs one UPDATE per will instead of an autonomous transaction per row
 CREATE OR REPLACE TRIGGER trg_update_last_modified_on_asset_beneficiaries
-AFTER INSERT OR UPDATE OR DELETE ON will_asset_beneficiaries
-FOR EACH ROW
-DECLARE
-    v_will_id NUMBER;
-    v_asset_id NUMBER := NVL(:NEW.asset_id, :OLD.asset_id);
-    v_mapping_id VARCHAR2(30) := NVL(TO_CHAR(:NEW.mapping_id), TO_CHAR(:OLD.mapping_id));
-    
-    -- Procedure for updating last_updated_at in autonomous transaction
-    PROCEDURE update_will_timestamp(p_will_id IN NUMBER) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
+FOR INSERT OR UPDATE OR DELETE ON will_asset_beneficiaries
+COMPOUND TRIGGER
+    TYPE t_id_set IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    TYPE t_ids IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    v_assets t_id_set;
+
+    AFTER EACH ROW IS
     BEGIN
-        EXECUTE IMMEDIATE 
-            'UPDATE wills SET last_updated_at = SYSDATE WHERE will_id = :1'
-            USING p_will_id;
-        COMMIT;
+        IF NVL(:NEW.asset_id, :OLD.asset_id) IS NOT NULL THEN
+            v_assets(NVL(:NEW.asset_id, :OLD.asset_id)) := TRUE;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_wills    t_id_set;
+        v_will_ids t_ids;
+        v_asset_id PLS_INTEGER := v_assets.FIRST;
+        v_will_id  NUMBER;
+    BEGIN
+        WHILE v_asset_id IS NOT NULL LOOP
+            BEGIN
+                SELECT will_id INTO v_will_id
+                FROM assets
+                WHERE asset_id = v_asset_id;
+                IF v_will_id IS NOT NULL THEN
+                    v_wills(v_will_id) := TRUE;
+                END IF;
+            EXCEPTION
+                WHEN NO_DATA_FOUND THEN
+                    -- Asset no longer exists, log the error
+                    audit_pkg.log('UPDATE', 'WILL_ASSET_BENEFICIARIES', NULL,
+                                  'Asset ID ' || v_asset_id || ' not found', NULL, 'WARNING');
+            END;
+            v_asset_id := v_assets.NEXT(v_asset_id);
+        END LOOP;
+        v_assets.DELETE;
+
+        v_will_id := v_wills.FIRST;
+        WHILE v_will_id IS NOT NULL LOOP
+            v_will_ids(v_will_ids.COUNT + 1) := v_will_id;
+            v_will_id := v_wills.NEXT(v_will_id);
+        END LOOP;
+
+        FORALL i IN 1 .. v_will_ids.COUNT
+            UPDATE wills SET last_updated_at = SYSDATE WHERE will_id = v_will_ids(i);
+        audit_pkg.flush;
     EXCEPTION
         WHEN OTHERS THEN
-            ROLLBACK;
-            RAISE;
-    END update_will_timestamp;
-    
-    -- Procedure for logging errors in autonomous transaction
-    PROCEDURE log_error(
-        p_action IN VARCHAR2,
-        p_record_id IN VARCHAR2,
-        p_old_values IN VARCHAR2,
-        p_new_values IN VARCHAR2,
-        p_status IN VARCHAR2
-    ) IS
-        PRAGMA AUTONOMOUS_TRANSACTION;
+            audit_pkg.log('UPDATE', 'WILL_ASSET_BENEFICIARIES', NULL,
+                          'Error updating wills.last_updated_at', SQLERRM, 'ERROR');
+            audit_pkg.flush;
+    END AFTER STATEMENT;
+END trg_update_last_modified_on_asset_beneficiaries;
+/
+
+-- Beneficiary trigger: names and relations are shown in every will that
+-- allocates to the beneficiary (cached fragments and ETags are keyed by the
+-- will's version), so a change moves those wills once per statement
+CREATE OR REPLACE TRIGGER trg_update_last_modified_on_beneficiaries
+FOR UPDATE OF full_name, relation ON beneficiaries
+COMPOUND TRIGGER
+    TYPE t_ids IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    v_beneficiary_ids t_ids;
+
+    AFTER EACH ROW IS
     BEGIN
-        INSERT INTO audit_log (
-            user_name, action, action_table, record_id, 
-            old_values, new_values, status
-        ) VALUES (
-            SYS_CONTEXT('USERENV', 'SESSION_USER'),
-            p_action, 'WILL_ASSET_BENEFICIARIES', p_record_id,
-            p_old_values, p_new_values, p_status
-        );
-        COMMIT;
+        v_beneficiary_ids(v_beneficiary_ids.COUNT + 1) := :NEW.beneficiary_id;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        FORALL i IN 1 .. v_beneficiary_ids.COUNT
+            UPDATE wills SET last_updated_at = SYSDATE
+            WHERE will_id IN (SELECT a.will_id
+                              FROM will_asset_beneficiaries wab
+                              JOIN assets a ON a.asset_id = wab.asset_id
+                              WHERE wab.beneficiary_id = v_beneficiary_ids(i));
+        v_beneficiary_ids.DELETE;
     EXCEPTION
         WHEN OTHERS THEN
-            ROLLBACK;
-    END log_error;
-    
-BEGIN
-    -- Only proceed if we have a valid asset ID
-    IF v_asset_id IS NOT NULL THEN
-        BEGIN
-            -- Get the will_id from assets
-            SELECT will_id INTO v_will_id
-            FROM assets
-            WHERE asset_id = v_asset_id;
-            
-            -- Update the will's timestamp if we found a valid will_id
-            IF v_will_id IS NOT NULL THEN
-                update_will_timestamp(v_will_id);
-            END IF;
-        EXCEPTION
-            WHEN NO_DATA_FOUND THEN
-                -- Asset no longer exists, log the error
-                log_error(
-                    'UPDATE',
-                    v_mapping_id,
-                    'Asset ID ' || v_asset_id || ' not found',
-                    NULL,
-                    'WARNING'
-                );
-            WHEN OTHERS THEN
-                -- Other errors, log them
-                log_error(
-                    'UPDATE',
-                    v_mapping_id,
-                    'Error updating wills.last_updated_at',
-                    SQLERRM,
-                    'ERROR'
-                );
-        END;
-    END IF;
-END;
+            v_beneficiary_ids.DELETE;
+            audit_pkg.log('UPDATE', 'BENEFICIARIES', NULL,
+                          'Error updating wills.last_updated_at', SQLERRM, 'ERROR');
+            audit_pkg.flush;
+    END AFTER STATEMENT;
+END trg_update_last_modified_on_beneficiaries;
 /
 
 -- ======================================
@@ -431,99 +433,95 @@ END;
 -- Purpose: Ensure total assigned share for an asset does not exceed 100%
 -- ======================================
 
+-- Compound so that multi-row statements (FORALL, INSERT ... SELECT) can sum
+-- the table in AFTER STATEMENT instead of hitting ORA-04091 per row; the
+-- asset/will checks run once per distinct asset. They are skipped while
+-- allocation_pkg.prevalidated is TRUE: allocate_will_assets has already
+-- checked the whole matrix.
 CREATE OR REPLACE TRIGGER trg_check_asset_share_percent
-BEFORE INSERT OR UPDATE ON will_asset_beneficiaries
-FOR EACH ROW
-DECLARE
-    v_total_share NUMBER := 0;
-    v_current_asset_id NUMBER := :NEW.asset_id;
-    v_asset_exists NUMBER;
-    v_will_status VARCHAR2(20);
-    v_will_id NUMBER;
-BEGIN
-    -- Validate asset_id is not NULL
-    IF v_current_asset_id IS NULL THEN
-        RAISE_APPLICATION_ERROR(-20010, 'Asset ID cannot be NULL');
-    END IF;
-    
-    -- Check if the asset exists
-    SELECT COUNT(*) INTO v_asset_exists
-    FROM assets
-    WHERE asset_id = v_current_asset_id;
-    
-    IF v_asset_exists = 0 THEN
-        RAISE_APPLICATION_ERROR(-20011, 'Asset ID ' || v_current_asset_id || ' does not exist');
-    END IF;
-    
-    -- Get the will_id first, then check status in a separate query
+FOR INSERT OR UPDATE ON will_asset_beneficiaries
+COMPOUND TRIGGER
+    TYPE t_id_set IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    v_checked t_id_set;
+
+    BEFORE EACH ROW IS
+        v_will_status VARCHAR2(20);
+        v_will_id NUMBER;
     BEGIN
-        SELECT will_id INTO v_will_id
-        FROM assets
-        WHERE asset_id = v_current_asset_id;
-        
-        IF v_will_id IS NULL THEN
-            RAISE_APPLICATION_ERROR(-20013, 
-                'Asset ID ' || v_current_asset_id || ' is not associated with a valid will');
+        IF allocation_pkg.prevalidated THEN
+            RETURN;
         END IF;
-        
-        -- Now check the will status
-        SELECT status INTO v_will_status
-        FROM wills
-        WHERE will_id = v_will_id;
-        
-        IF v_will_status = 'Executed' THEN
-            RAISE_APPLICATION_ERROR(-20012, 
-                'Cannot modify beneficiary shares for asset ID ' || v_current_asset_id || 
-                ' because the associated will has been executed');
+
+        -- Validate asset_id is not NULL
+        IF :NEW.asset_id IS NULL THEN
+            RAISE_APPLICATION_ERROR(-20010, 'Asset ID cannot be NULL');
         END IF;
-    EXCEPTION
-        WHEN NO_DATA_FOUND THEN
-            RAISE_APPLICATION_ERROR(-20013, 
-                'Asset ID ' || v_current_asset_id || ' is not associated with a valid will');
-    END;
-    
-    -- Calculate the total assigned share for the asset excluding the current mapping (if update)
+
+        IF NOT v_checked.EXISTS(:NEW.asset_id) THEN
+            -- Check the asset exists and its will is not executed
+            BEGIN
+                SELECT will_id INTO v_will_id
+                FROM assets
+                WHERE asset_id = :NEW.asset_id;
+            EXCEPTION
+                WHEN NO_DATA_FOUND THEN
+                    RAISE_APPLICATION_ERROR(-20011, 'Asset ID ' || :NEW.asset_id || ' does not exist');
+            END;
+
+            IF v_will_id IS NULL THEN
+                RAISE_APPLICATION_ERROR(-20013, 
+                    'Asset ID ' || :NEW.asset_id || ' is not associated with a valid will');
+            END IF;
+
+            BEGIN
+                SELECT status INTO v_will_status
+                FROM wills
+                WHERE will_id = v_will_id;
+            EXCEPTION
+                WHEN NO_DATA_FOUND THEN
+                    RAISE_APPLICATION_ERROR(-20013, 
+                        'Asset ID ' || :NEW.asset_id || ' is not associated with a valid will');
+            END;
+
+            IF v_will_status = 'Executed' THEN
+                RAISE_APPLICATION_ERROR(-20012, 
+                    'Cannot modify beneficiary shares for asset ID ' || :NEW.asset_id || 
+                    ' because the associated will has been executed');
+            END IF;
+
+            v_checked(:NEW.asset_id) := TRUE;
+        END IF;
+    END BEFORE EACH ROW;
+
+    AFTER STATEMENT IS
+        v_asset_id PLS_INTEGER := v_checked.FIRST;
+        v_total_share NUMBER;
     BEGIN
-        SELECT NVL(SUM(share_percent), 0)
-        INTO v_total_share
-        FROM will_asset_beneficiaries
-        WHERE asset_id = v_current_asset_id
-          AND ((:NEW.mapping_id IS NULL AND mapping_id IS NOT NULL) OR 
-               (mapping_id != :NEW.mapping_id));
-    EXCEPTION
-        WHEN OTHERS THEN
-            v_total_share := 0; -- Default if the query fails
-    END;
-    
-    -- Add the new/updated share value
-    v_total_share := v_total_share + NVL(:NEW.share_percent, 0);
-    
-    -- Validate total share does not exceed 100%
-    IF v_total_share > 100 THEN
-        RAISE_APPLICATION_ERROR(-20005,
-            'Total share for asset ID ' || v_current_asset_id || 
-            ' exceeds 100%. Current total: ' || v_total_share || '%');
-    END IF;
-    
-    -- Warn if total share is significantly under 100% (e.g., less than 90%)
-    IF v_total_share < 90 THEN
-        -- Use DBMS_OUTPUT instead of trying to INSERT, which can cause issues in BEFORE triggers
-        DBMS_OUTPUT.PUT_LINE('Warning: Asset ID ' || v_current_asset_id || 
-            ' is only allocated at ' || v_total_share || '% of its value');
-    END IF;
+        -- The statement's rows are visible now; check each touched asset once
+        WHILE v_asset_id IS NOT NULL LOOP
+            SELECT NVL(SUM(share_percent), 0)
+            INTO v_total_share
+            FROM will_asset_beneficiaries
+            WHERE asset_id = v_asset_id;
 
-EXCEPTION
-    WHEN NO_DATA_FOUND THEN
-        -- This would occur if the asset exists but no will is associated
-        RAISE_APPLICATION_ERROR(-20013, 
-            'Asset ID ' || v_current_asset_id || ' is not associated with a valid will');
-    WHEN OTHERS THEN
-        -- For BEFORE triggers, it's best to avoid INSERTs as these can cause recursive issues
-        -- Just raise the error with some context
-        RAISE_APPLICATION_ERROR(-20099, 
-            'Error in share percentage validation for asset ' || 
-            v_current_asset_id || ': ' || SQLERRM);
-END;
+            IF v_total_share > 100 THEN
+                v_checked.DELETE;
+                RAISE_APPLICATION_ERROR(-20005,
+                    'Total share for asset ID ' || v_asset_id || 
+                    ' exceeds 100%. Current total: ' || v_total_share || '%');
+            END IF;
+
+            -- Warn if total share is significantly under 100% (e.g., less than 90%)
+            IF v_total_share < 90 THEN
+                DBMS_OUTPUT.PUT_LINE('Warning: Asset ID ' || v_asset_id || 
+                    ' is only allocated at ' || v_total_share || '% of its value');
+            END IF;
+
+            v_asset_id := v_checked.NEXT(v_asset_id);
+        END LOOP;
+        v_checked.DELETE;
+    END AFTER STATEMENT;
+END trg_check_asset_share_percent;
 /
 -- Ensures all assets are fully allocated (100%) before a will can be executed
 CREATE OR REPLACE TRIGGER trg_validate_complete_allocation
@@ -569,47 +567,50 @@ BEGIN
 END;
 /
 
--- Example for one table - replicate for other important tables
+-- Audits every change to wills; rows are collected per row and written
+-- with one bulk insert per statement through audit_pkg.write, inside the
+-- same transaction as the change
 CREATE OR REPLACE TRIGGER trg_audit_wills
-AFTER INSERT OR UPDATE OR DELETE ON wills
-FOR EACH ROW
-DECLARE
-    v_action VARCHAR2(10);
-    v_old_values CLOB;
-    v_new_values CLOB;
-BEGIN
-    -- Determine the action
-    IF INSERTING THEN
-        v_action := 'INSERT';
-        v_old_values := NULL;
-    ELSIF UPDATING THEN
-        v_action := 'UPDATE';
-        v_old_values := '{"will_id":' || :OLD.will_id || 
-                       ',"title":"' || :OLD.title || 
-                       '","status":"' || :OLD.status || '"}';
-    ELSIF DELETING THEN
-        v_action := 'DELETE';
-        v_new_values := NULL;
-    END IF;
-    
-    -- Set new values for insert/update
-    IF NOT DELETING THEN
-        v_new_values := '{"will_id":' || :NEW.will_id || 
-                       ',"title":"' || :NEW.title || 
-                       '","status":"' || :NEW.status || '"}';
-    END IF;
-    
-    -- Insert audit record
-    INSERT INTO audit_log (
-        user_name, action, action_table, record_id, 
-        old_values, new_values, status, ip_address
-    ) VALUES (
-        SYS_CONTEXT('USERENV', 'SESSION_USER'),
-        v_action, 'WILLS', NVL(:NEW.will_id, :OLD.will_id),
-        v_old_values, v_new_values, 'ALLOWED',
-        SYS_CONTEXT('USERENV', 'IP_ADDRESS')
-    );
-END;
+FOR INSERT OR UPDATE OR DELETE ON wills
+COMPOUND TRIGGER
+    v_entries audit_pkg.t_entries;
+
+    AFTER EACH ROW IS
+        v_action VARCHAR2(10);
+        v_old_values CLOB;
+        v_new_values CLOB;
+    BEGIN
+        -- Determine the action
+        IF INSERTING THEN
+            v_action := 'INSERT';
+        ELSIF UPDATING THEN
+            v_action := 'UPDATE';
+            v_old_values := '{"will_id":' || :OLD.will_id || 
+                           ',"title":"' || :OLD.title || 
+                           '","status":"' || :OLD.status || '"}';
+        ELSIF DELETING THEN
+            v_action := 'DELETE';
+        END IF;
+        
+        -- Set new values for insert/update
+        IF NOT DELETING THEN
+            v_new_values := '{"will_id":' || :NEW.will_id || 
+                           ',"title":"' || :NEW.title || 
+                           '","status":"' || :NEW.status || '"}';
+        END IF;
+        
+        v_entries(v_entries.COUNT + 1) := audit_pkg.new_entry(
+            v_action, 'WILLS', NVL(:NEW.will_id, :OLD.will_id),
+            v_old_values, v_new_values, 'ALLOWED'
+        );
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        audit_pkg.write(v_entries);
+        v_entries.DELETE;
+    END AFTER STATEMENT;
+END trg_audit_wills;
 /
 
 -- Ensures only one primary executor per will
@@ -676,4 +677,170 @@ BEGIN
         'Cannot delete will with ID ' || :OLD.will_id || 
         ' because it has been approved or executed.');
 END;
-/
\ No newline at end of file
+/
+
+-- ======================================
+-- Triggers: trg_stat_counters_*
+-- Purpose: Keep system_stat_counters current. Deltas are collected per row
+-- and written once per statement to the session's stripe, so bulk DML costs
+-- one MERGE per key and concurrent sessions rarely wait on each other.
+-- ======================================
+
+CREATE OR REPLACE TRIGGER trg_stat_counters_wills
+FOR INSERT OR DELETE OR UPDATE OF status ON wills
+COMPOUND TRIGGER
+    v_deltas stat_counters_pkg.t_deltas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            stat_counters_pkg.add(v_deltas, 'wills', 1);
+            stat_counters_pkg.add(v_deltas, 'will_status:' || :NEW.status, 1);
+        ELSIF DELETING THEN
+            stat_counters_pkg.add(v_deltas, 'wills', -1);
+            stat_counters_pkg.add(v_deltas, 'will_status:' || :OLD.status, -1);
+        ELSIF :OLD.status != :NEW.status THEN
+            stat_counters_pkg.add(v_deltas, 'will_status:' || :OLD.status, -1);
+            stat_counters_pkg.add(v_deltas, 'will_status:' || :NEW.status, 1);
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        stat_counters_pkg.apply(v_deltas);
+    END AFTER STATEMENT;
+END trg_stat_counters_wills;
+/
+
+CREATE OR REPLACE TRIGGER trg_stat_counters_assets
+FOR INSERT OR DELETE OR UPDATE OF value ON assets
+COMPOUND TRIGGER
+    v_deltas stat_counters_pkg.t_deltas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            stat_counters_pkg.add(v_deltas, 'assets', 1);
+        ELSIF DELETING THEN
+            stat_counters_pkg.add(v_deltas, 'assets', -1);
+        END IF;
+        stat_counters_pkg.add(v_deltas, 'asset_value', NVL(:NEW.value, 0) - NVL(:OLD.value, 0));
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        stat_counters_pkg.apply(v_deltas);
+    END AFTER STATEMENT;
+END trg_stat_counters_assets;
+/
+
+CREATE OR REPLACE TRIGGER trg_stat_counters_users
+FOR INSERT OR DELETE ON users
+COMPOUND TRIGGER
+    v_deltas stat_counters_pkg.t_deltas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        stat_counters_pkg.add(v_deltas, 'users', CASE WHEN INSERTING THEN 1 ELSE -1 END);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        stat_counters_pkg.apply(v_deltas);
+    END AFTER STATEMENT;
+END trg_stat_counters_users;
+/
+
+CREATE OR REPLACE TRIGGER trg_stat_counters_beneficiaries
+FOR INSERT OR DELETE ON beneficiaries
+COMPOUND TRIGGER
+    v_deltas stat_counters_pkg.t_deltas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        stat_counters_pkg.add(v_deltas, 'beneficiaries', CASE WHEN INSERTING THEN 1 ELSE -1 END);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        stat_counters_pkg.apply(v_deltas);
+    END AFTER STATEMENT;
+END trg_stat_counters_beneficiaries;
+/
+
+CREATE OR REPLACE TRIGGER trg_stat_counters_executors
+FOR INSERT OR DELETE ON executors
+COMPOUND TRIGGER
+    v_deltas stat_counters_pkg.t_deltas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        stat_counters_pkg.add(v_deltas, 'executors', CASE WHEN INSERTING THEN 1 ELSE -1 END);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        stat_counters_pkg.apply(v_deltas);
+    END AFTER STATEMENT;
+END trg_stat_counters_executors;
+/
+
+CREATE OR REPLACE TRIGGER trg_stat_counters_transfers
+FOR INSERT OR DELETE ON transfer_logs
+COMPOUND TRIGGER
+    v_deltas stat_counters_pkg.t_deltas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        stat_counters_pkg.add(v_deltas, 'transfers', CASE WHEN INSERTING THEN 1 ELSE -1 END);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        stat_counters_pkg.apply(v_deltas);
+    END AFTER STATEMENT;
+END trg_stat_counters_transfers;
+/
+
+-- ======================================
+-- Triggers: trg_role_version_*
+-- Purpose: Bump users.role_version in the transaction of every write that
+-- can change a user's roles, so every app worker sees the change on the
+-- user's next request (database/roles.py compares it with the session's).
+-- Executors and beneficiaries are matched to users by email.
+-- ======================================
+
+CREATE OR REPLACE TRIGGER trg_role_version_users
+BEFORE UPDATE OF initial_role, email ON users
+FOR EACH ROW
+BEGIN
+    :NEW.role_version := :OLD.role_version + 1;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_role_version_wills
+AFTER INSERT OR DELETE OR UPDATE OF user_id ON wills
+FOR EACH ROW
+BEGIN
+    UPDATE users SET role_version = role_version + 1
+    WHERE user_id IN (:NEW.user_id, :OLD.user_id);
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_role_version_executors
+AFTER INSERT OR DELETE OR UPDATE OF email ON executors
+FOR EACH ROW
+BEGIN
+    UPDATE users SET role_version = role_version + 1
+    WHERE email IN (:NEW.email, :OLD.email);
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_role_version_beneficiaries
+AFTER INSERT OR DELETE OR UPDATE OF email ON beneficiaries
+FOR EACH ROW
+BEGIN
+    UPDATE users SET role_version = role_version + 1
+    WHERE email IN (:NEW.email, :OLD.email);
+END;
+/
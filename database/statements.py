@@ -0,0 +1,355 @@
+# database/statements.py
+
+"""Named SQL statements.
+
+Every fixed SQL text the app runs is defined once, under a name, with the
+number of rows it is expected to return:
+
+    ROLE_FLAGS = statements.define('roles.flags', ROLE_FLAGS_SQL, ROW)
+    initial_role, *flags = ROLE_FLAGS.one(cur, {'user_id': ..., 'email': ...})
+
+Sharing the one text keeps it byte-identical wherever it is used, so every
+caller hits the same shared-pool cursor on the server and the same entry
+of the driver's statement cache. ``define`` refuses a second text for a
+name, and a second name for a text.
+
+Before each execution the cursor is ``prepare``-d with the text and its
+``arraysize``/``prefetchrows`` are set from the expected cardinality: a
+single row comes back with the execute round trip, and lists are fetched
+in batches of their expected size. Statements defined with a ``record``
+class return their rows as instances of it (``database.records``).
+Executions, time, failures and rows are counted per name
+(``statements.stats()``, ``/api/admin/statement-stats``).
+
+Statements whose text is assembled per request (keyset pages, ``IN``
+lists, filters) are not registered; see ``database.pagination``.
+"""
+
+import threading
+import time
+from database.records import AssetSummary, AssetAllocation, AssetBeneficiary, InheritedAsset
+
+# Expected cardinality of a statement
+SCALAR = 'scalar'   # one row of one column
+ROW    = 'row'      # at most one row
+LIST   = 'list'     # any number of rows
+WRITE  = 'write'    # DML and PL/SQL without a result set
+
+# Rows per round trip of LIST statements unless given at define()
+DEFAULT_LIST_ROWS = 100
+
+
+class NamedStatement:
+    """One registered SQL text and how to fetch its rows."""
+
+    def __init__(self, registry, name, sql, cardinality, rows=None, record=None):
+        self.registry = registry
+        self.name = name
+        self.sql = sql
+        self.cardinality = cardinality
+        self.record = record
+        if cardinality in (SCALAR, ROW):
+            # prefetchrows of 2 also brings back the end of the result set,
+            # so fetchone() needs no second round trip
+            self.arraysize, self.prefetchrows = 1, 2
+        elif cardinality == LIST:
+            self.arraysize = rows or DEFAULT_LIST_ROWS
+            self.prefetchrows = self.arraysize + 1
+        else:
+            self.arraysize = self.prefetchrows = None
+
+    def execute(self, cur, binds=None):
+        """Execute on ``cur`` and return it for the caller to fetch from."""
+        return self._run(cur, cur.execute, binds, None)
+
+    def executemany(self, cur, rows, **kwargs):
+        """``executemany`` of ``rows`` (counted as the statement's rows)."""
+        return self._run(cur, cur.executemany, rows, lambda cur: (None, len(rows)), **kwargs)
+
+    def one(self, cur, binds=None):
+        """The first row, or None."""
+        return self._run(cur, cur.execute, binds, _fetch_one)
+
+    def scalar(self, cur, binds=None):
+        """The first column of the first row, or None."""
+        row = self.one(cur, binds)
+        return row[0] if row else None
+
+    def all(self, cur, binds=None):
+        return self._run(cur, cur.execute, binds, _fetch_all)
+
+    def _run(self, cur, execute, binds, fetch, **kwargs):
+        started = time.perf_counter()
+        rows = 0
+        failed = True
+        try:
+            cur.prepare(self.sql)
+            if self.arraysize is not None:
+                cur.arraysize = self.arraysize
+                cur.prefetchrows = self.prefetchrows
+            execute(None, binds, **kwargs)
+            if self.record is not None:
+                cur.rowfactory = self.record
+            if fetch is None:
+                result = cur
+            else:
+                result, rows = fetch(cur)
+            failed = False
+            return result
+        finally:
+            self.registry.record(self.name, time.perf_counter() - started, rows, failed)
+
+    def __repr__(self):
+        return f'<NamedStatement {self.name} ({self.cardinality})>'
+
+
+def _fetch_one(cur):
+    row = cur.fetchone()
+    return row, 0 if row is None else 1
+
+
+def _fetch_all(cur):
+    rows = cur.fetchall()
+    return rows, len(rows)
+
+
+class StatementStats:
+    """Execution totals of one named statement."""
+
+    def __init__(self):
+        self.executions = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+
+class StatementRegistry:
+    """The named statements of the app and their execution totals."""
+
+    def __init__(self):
+        self._statements = {}
+        self._names_by_sql = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def define(self, name, sql, cardinality=LIST, rows=None, record=None):
+        """Register ``sql`` as ``name`` and return its ``NamedStatement``.
+
+        Defining the same name with the same text again returns the
+        existing statement; any other clash raises ``ValueError``.
+        """
+        existing = self._statements.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Statement {name!r} is already defined with different SQL")
+            return existing
+        other = self._names_by_sql.get(sql)
+        if other is not None:
+            raise ValueError(f"Statement {name!r} repeats the SQL of {other!r}")
+        statement = NamedStatement(self, name, sql, cardinality, rows, record)
+        self._statements[name] = statement
+        self._names_by_sql[sql] = name
+        self._stats[name] = StatementStats()
+        return statement
+
+    def __getitem__(self, name):
+        return self._statements[name]
+
+    def __iter__(self):
+        return iter(self._statements.values())
+
+    def record(self, name, seconds, rows, failed):
+        with self._lock:
+            stats = self._stats[name]
+            stats.executions += 1
+            stats.failures += failed
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+
+    def stats(self):
+        """Per-statement totals, most time first, as JSON-ready dicts."""
+        with self._lock:
+            report = [{
+                'name':        name,
+                'cardinality': self._statements[name].cardinality,
+                'executions':  stats.executions,
+                'failures':    stats.failures,
+                'total_ms':    round(stats.seconds * 1000, 3),
+                'mean_ms':     round(stats.seconds * 1000 / stats.executions, 3) if stats.executions else 0,
+                'max_ms':      round(stats.max_seconds * 1000, 3),
+                'rows':        stats.rows
+            } for name, stats in self._stats.items()]
+        return sorted(report, key=lambda item: item['total_ms'], reverse=True)
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = StatementStats()
+
+
+statements = StatementRegistry()
+
+
+# ─── Route statements ───────────────────────────
+# Queries of the views in app.py; the domain modules under database/
+# define their own next to the code that runs them.
+
+USER_LOGIN = statements.define('users.login', """
+    SELECT user_id, full_name, email, password_hash
+    FROM users
+    WHERE email = :user_email
+""", ROW)
+
+USER_EMAIL_TAKEN = statements.define('users.email_taken', """
+    SELECT COUNT(*) FROM users WHERE email = :user_email
+""", SCALAR)
+
+USER_INSERT = statements.define('users.insert', """
+    INSERT INTO users (
+        full_name, email, password_hash, phone_number,
+        date_of_birth, address, initial_role
+    ) VALUES (
+        :user_name, :user_email, :password_hash, :user_phone,
+        CASE WHEN :user_dob IS NOT NULL THEN TO_DATE(:user_dob,'YYYY-MM-DD') ELSE NULL END,
+        :user_addr, :initial_role
+    )
+""", WRITE)
+
+# Each count is aggregated once and joined, not recomputed per user
+USER_ADMIN_LIST = statements.define('users.admin_list', """
+    SELECT u.user_id, u.full_name, u.email, u.initial_role, u.created_at,
+           NVL(w.cnt, 0) as wills_count,
+           NVL(e.cnt, 0) as executor_count,
+           NVL(b.cnt, 0) as beneficiary_count
+    FROM users u
+    LEFT JOIN (SELECT user_id, COUNT(*) cnt FROM wills GROUP BY user_id) w
+           ON w.user_id = u.user_id
+    LEFT JOIN (SELECT email, COUNT(*) cnt FROM executors GROUP BY email) e
+           ON e.email = u.email
+    LEFT JOIN (SELECT email, COUNT(*) cnt FROM beneficiaries GROUP BY email) b
+           ON b.email = u.email
+    ORDER BY u.created_at DESC
+""", LIST, rows=500)
+
+WILL_INSERT = statements.define('wills.insert', """
+    INSERT INTO wills(user_id, title, description, status)
+    VALUES(:user_id_param, :will_title, :will_desc, 'Draft')
+""", WRITE)
+
+# Status of a will, if the user owns it
+WILL_OWNED_STATUS = statements.define('wills.owned_status', """
+    SELECT status FROM wills
+    WHERE will_id = :will_id_param AND user_id = :user_id_param
+""", SCALAR)
+
+ASSET_ADD = statements.define('assets.add', """
+    INSERT INTO assets(
+        will_id, name, description, asset_type,
+        value, location, acquisition_date
+    ) VALUES (
+        :will_id_param, :asset_name, :asset_desc, :asset_type_param,
+        :asset_value, :asset_location,
+        CASE WHEN :acq_date IS NOT NULL
+             THEN TO_DATE(:acq_date,'YYYY-MM-DD')
+             ELSE NULL END
+    )
+""", WRITE)
+
+ASSET_BY_ID = statements.define('assets.by_id', """
+    SELECT name, description, value, asset_type
+    FROM assets
+    WHERE asset_id = :asset_id_param
+""", ROW, record=AssetSummary)
+
+# Share already allocated on an asset
+ASSET_ALLOCATED_PERCENT = statements.define('allocations.asset_total', """
+    SELECT NVL(SUM(share_percent), 0)
+    FROM will_asset_beneficiaries
+    WHERE asset_id = :asset_id_param
+""", SCALAR)
+
+ASSET_ALLOCATIONS = statements.define('allocations.of_asset', """
+    SELECT b.full_name, wab.share_percent, wab.conditions,
+           (SELECT value FROM assets WHERE asset_id = :asset_id_param) * wab.share_percent / 100 as estimated_value
+    FROM will_asset_beneficiaries wab
+    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
+    WHERE wab.asset_id = :asset_id_param
+    ORDER BY wab.share_percent DESC
+""", LIST, rows=20, record=AssetAllocation)
+
+ASSET_BENEFICIARIES = statements.define('allocations.asset_beneficiaries', """
+    SELECT b.beneficiary_id, b.full_name, b.relation, wab.share_percent
+    FROM will_asset_beneficiaries wab
+    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
+    WHERE wab.asset_id = :asset_id_param
+    ORDER BY b.full_name
+""", LIST, rows=20, record=AssetBeneficiary)
+
+# Any allocation, for the weekend transfer demonstration
+ALLOCATION_SAMPLE = statements.define('allocations.sample', """
+    SELECT wab.asset_id, wab.beneficiary_id, a.name, b.full_name
+    FROM will_asset_beneficiaries wab
+    JOIN assets a ON wab.asset_id = a.asset_id
+    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
+    WHERE ROWNUM = 1
+""", ROW)
+
+BENEFICIARY_CHOICES = statements.define('beneficiaries.choices', """
+    SELECT beneficiary_id, full_name, relation, email
+    FROM beneficiaries
+    ORDER BY full_name
+""", LIST, rows=500)
+
+BENEFICIARY_INSERT = statements.define('beneficiaries.insert', """
+    INSERT INTO beneficiaries(
+        full_name, relation, email, phone_number,
+        address, date_of_birth, notes
+    ) VALUES (
+        :ben_name, :ben_relation, :ben_email, :ben_phone, :ben_address,
+        CASE WHEN :ben_dob IS NOT NULL
+             THEN TO_DATE(:ben_dob,'YYYY-MM-DD')
+             ELSE NULL END,
+        :ben_notes
+    )
+""", WRITE)
+
+# Assets allocated to the signed-in beneficiary, with their transfer status
+BENEFICIARY_MY_ASSETS = statements.define('beneficiaries.my_assets', """
+    SELECT a.name, a.description, a.asset_type, a.value, a.location,
+           wab.share_percent, wab.conditions,
+           (a.value * wab.share_percent / 100) as my_share_value,
+           w.title as will_title, w.status as will_status,
+           CASE WHEN tl.transfer_id IS NOT NULL THEN tl.transfer_status ELSE 'Not Transferred' END as transfer_status
+    FROM will_asset_beneficiaries wab
+    JOIN assets a ON wab.asset_id = a.asset_id
+    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
+    JOIN wills w ON a.will_id = w.will_id
+    LEFT JOIN transfer_logs tl ON a.asset_id = tl.asset_id AND b.beneficiary_id = tl.beneficiary_id
+    WHERE b.email = :ben_email
+    ORDER BY w.title, a.name
+""", LIST, rows=50)
+
+BENEFICIARY_ASSETS = statements.define('beneficiaries.assets', """
+    SELECT a.asset_id, a.name, a.asset_type, a.value, wab.share_percent,
+           (a.value * wab.share_percent / 100) as inheritance_value
+    FROM will_asset_beneficiaries wab
+    JOIN assets a ON wab.asset_id = a.asset_id
+    WHERE wab.beneficiary_id = :ben_id_param
+    ORDER BY a.name
+""", LIST, rows=50, record=InheritedAsset)
+
+EXECUTOR_COUNT = statements.define('executors.count', """
+    SELECT COUNT(*) FROM executors WHERE will_id = :will_id_param
+""", SCALAR)
+
+EXECUTOR_INSERT = statements.define('executors.insert', """
+    INSERT INTO executors(
+        will_id, full_name, email, phone_number, relation, is_primary
+    ) VALUES (
+        :will_id_param, :exec_name, :exec_email, :exec_phone, :exec_relation, :exec_primary
+    )
+""", WRITE)
+
+HEALTH_PING = statements.define('health.ping', "SELECT 1 FROM dual", SCALAR)
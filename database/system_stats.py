@@ -0,0 +1,97 @@
+# database/system_stats.py
+
+import oracledb
+from database.statements import statements, ROW, LIST
+
+# Order of the stats tuple rendered by admin/system_stats.html
+STAT_KEYS = ('users', 'wills', 'assets', 'beneficiaries',
+             'executors', 'transfers', 'asset_value')
+STATUS_PREFIX = 'will_status:'
+
+# Counters are striped per session (see stat_counters_pkg); sum the stripes
+COUNTERS_SQL = """
+    SELECT stat_key, SUM(stat_value)
+    FROM system_stat_counters
+    GROUP BY stat_key
+"""
+COUNTERS = statements.define('system_stats.counters', COUNTERS_SQL, LIST)
+
+# Each branch walks its date index for the newest 20 rows only
+RECENT_ACTIVITY_SQL = """
+    SELECT activity, description, activity_date
+    FROM (
+        SELECT * FROM (
+            SELECT 'Will Created' AS activity, w.title AS description,
+                   w.created_at AS activity_date
+            FROM wills w
+            WHERE w.created_at >= SYSDATE - 30
+            ORDER BY w.created_at DESC
+            FETCH FIRST 20 ROWS ONLY
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'Transfer Initiated' AS activity,
+                   a.name || ' to ' || b.full_name AS description,
+                   t.transfer_date AS activity_date
+            FROM transfer_logs t
+            JOIN assets a ON t.asset_id = a.asset_id
+            JOIN beneficiaries b ON t.beneficiary_id = b.beneficiary_id
+            WHERE t.transfer_date >= SYSDATE - 30
+            ORDER BY t.transfer_date DESC
+            FETCH FIRST 20 ROWS ONLY
+        )
+    )
+    ORDER BY activity_date DESC
+    FETCH FIRST 20 ROWS ONLY
+"""
+RECENT_ACTIVITY = statements.define('system_stats.recent_activity', RECENT_ACTIVITY_SQL, LIST, rows=20)
+
+# Used until system_stat_counters has been created
+LIVE_STATS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM users) as total_users,
+        (SELECT COUNT(*) FROM wills) as total_wills,
+        (SELECT COUNT(*) FROM assets) as total_assets,
+        (SELECT COUNT(*) FROM beneficiaries) as total_beneficiaries,
+        (SELECT COUNT(*) FROM executors) as total_executors,
+        (SELECT COUNT(*) FROM transfer_logs) as total_transfers,
+        (SELECT NVL(SUM(value), 0) FROM assets) as total_asset_value
+    FROM dual
+"""
+LIVE_STATS = statements.define('system_stats.live', LIVE_STATS_SQL, ROW)
+
+LIVE_STATUS_SQL = """
+    SELECT status, COUNT(*) as count
+    FROM wills
+    GROUP BY status
+    ORDER BY status
+"""
+LIVE_STATUS = statements.define('system_stats.live_status', LIVE_STATUS_SQL, LIST, rows=10)
+
+ORA_TABLE_NOT_FOUND = 942
+
+
+def load_system_stats(cur):
+    """Return ``(stats, status_distribution, recent_activity)`` for the admin page.
+
+    The totals and the will status distribution come from the
+    ``system_stat_counters`` summary table in a single lookup, so the cost
+    does not grow with the estate tables.
+    """
+    try:
+        counters = dict(COUNTERS.all(cur))
+        stats = tuple(counters.get(key, 0) for key in STAT_KEYS)
+        status_distribution = sorted(
+            (key[len(STATUS_PREFIX):], value)
+            for key, value in counters.items()
+            if key.startswith(STATUS_PREFIX) and value
+        )
+    except oracledb.DatabaseError as err:
+        error_obj, = err.args
+        if getattr(error_obj, 'code', None) != ORA_TABLE_NOT_FOUND:
+            raise
+        stats = LIVE_STATS.one(cur)
+        status_distribution = LIVE_STATUS.all(cur)
+
+    recent_activity = RECENT_ACTIVITY.all(cur)
+    return stats, status_distribution, recent_activity
@@ -0,0 +1,125 @@
+# database/transfers.py
+
+"""Batch execution of a will's pending transfers.
+
+The pending allocations are read in one query and handed to
+``transfer_pkg.execute_will_transfers`` as PL/SQL arrays; the procedure
+checks the calendar once, inserts every transfer with one FORALL and
+returns a result per allocation through an OUT array.
+"""
+
+import oracledb
+from database.statements import statements, ROW, LIST
+from database.records import Record, to_float
+
+# Transfer list rows, fetched as Transfer records
+TRANSFER_LIST_SQL = """
+    SELECT t.transfer_id, a.name AS asset_name, b.full_name AS beneficiary_name,
+           t.transfer_date, t.transfer_status, t.approved_by, t.notes,
+           a.value, wab.share_percent,
+           (a.value * wab.share_percent / 100) AS transfer_value
+    FROM transfer_logs t
+    JOIN assets a ON t.asset_id = a.asset_id
+    JOIN beneficiaries b ON t.beneficiary_id = b.beneficiary_id
+    LEFT JOIN will_asset_beneficiaries wab ON t.asset_id = wab.asset_id
+                                           AND t.beneficiary_id = wab.beneficiary_id"""
+
+TRANSFER_COLUMNS = ('transfer_id', 'asset_name', 'beneficiary_name', 'transfer_date',
+                    'transfer_status', 'approved_by', 'notes', 'asset_value',
+                    'share_percent', 'transfer_value')
+
+# Transfers of the wills a testator owns or an executor is named on
+TRANSFER_INVOLVED_CLAUSE = """a.will_id IN (
+        SELECT will_id FROM wills WHERE user_id = :user_id_param
+        UNION
+        SELECT will_id FROM executors WHERE email = :exec_email)"""
+
+# name -> (sort column, record attribute, descending by default)
+TRANSFER_SORTS = {
+    'date':        ('t.transfer_date', 'transfer_date', True),
+    'status':      ('t.transfer_status', 'transfer_status', False),
+    'asset':       ('a.name', 'asset_name', False),
+    'beneficiary': ('b.full_name', 'beneficiary_name', False),
+}
+
+TRANSFER_SEARCH_COLUMNS = ('a.name', 'b.full_name', 't.notes')
+
+
+class Transfer(Record):
+    """Row of the transfers list."""
+
+    __slots__ = TRANSFER_COLUMNS
+
+    def __init__(self, transfer_id, asset_name, beneficiary_name, transfer_date,
+                 transfer_status, approved_by, notes, asset_value, share_percent, transfer_value):
+        self.transfer_id = transfer_id
+        self.asset_name = asset_name
+        self.beneficiary_name = beneficiary_name
+        self.transfer_date = transfer_date
+        self.transfer_status = transfer_status
+        self.approved_by = approved_by
+        self.notes = notes
+        self.asset_value = to_float(asset_value)
+        self.share_percent = to_float(share_percent)
+        self.transfer_value = to_float(transfer_value)
+
+
+WILL_ACCESS_SQL = """
+    SELECT w.status,
+           CASE WHEN w.user_id = :user_id THEN 1 ELSE 0 END AS is_owner,
+           (SELECT COUNT(*) FROM executors e
+            WHERE e.will_id = w.will_id AND e.email = :email) AS is_executor
+    FROM wills w
+    WHERE w.will_id = :will_id
+"""
+WILL_ACCESS = statements.define('transfers.will_access', WILL_ACCESS_SQL, ROW)
+
+# Allocations with no transfer under way yet
+PENDING_TRANSFERS_SQL = """
+    SELECT wab.asset_id, a.name, wab.beneficiary_id, b.full_name, wab.share_percent
+    FROM will_asset_beneficiaries wab
+    JOIN assets a ON wab.asset_id = a.asset_id
+    JOIN beneficiaries b ON wab.beneficiary_id = b.beneficiary_id
+    WHERE a.will_id = :will_id
+      AND NOT EXISTS (
+          SELECT 1 FROM transfer_logs t
+          WHERE t.asset_id = wab.asset_id
+            AND t.beneficiary_id = wab.beneficiary_id
+            AND t.transfer_status IN ('Initiated', 'Completed')
+      )
+    ORDER BY a.name, b.full_name
+"""
+PENDING_TRANSFERS = statements.define('transfers.pending', PENDING_TRANSFERS_SQL, LIST)
+
+
+def pending_transfers(cur, will_id):
+    return PENDING_TRANSFERS.all(cur, {'will_id': will_id})
+
+
+def execute_params(cur, will_id, pending):
+    """``(params, results_var)`` for ``transfer_pkg.execute_will_transfers``."""
+    results = cur.arrayvar(oracledb.DB_TYPE_VARCHAR, len(pending), 4000)
+    params = [
+        will_id,
+        cur.arrayvar(oracledb.DB_TYPE_NUMBER, [row[0] for row in pending]),
+        cur.arrayvar(oracledb.DB_TYPE_NUMBER, [row[2] for row in pending]),
+        results
+    ]
+    return params, results
+
+
+def transfer_results(pending, results):
+    """Pair each pending allocation with its procedure result."""
+    report = []
+    for (asset_id, asset_name, beneficiary_id, beneficiary_name, share), result in zip(pending, results):
+        status, _, message = (result or 'ERROR: No result').partition(': ')
+        report.append({
+            'asset_id':         asset_id,
+            'asset_name':       asset_name,
+            'beneficiary_id':   beneficiary_id,
+            'beneficiary_name': beneficiary_name,
+            'share_percent':    float(share) if share is not None else 0,
+            'status':           status.lower(),
+            'message':          message or None
+        })
+    return report
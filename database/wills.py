@@ -0,0 +1,353 @@
+# database/wills.py
+
+import hashlib
+from config import Config
+from util import TTLCache
+from database.connection import db
+from database.pagination import in_list
+from database.statements import statements, ROW, LIST
+from database.records import Record, to_float
+
+# Will list rows are WillSummary records; attach_will_counts() fills in
+# asset_count and executor_count.
+WILL_PAGE_SQL = """
+    SELECT w.will_id, w.title, w.description, w.status, w.created_at
+    FROM wills w"""
+
+WILL_COLUMNS = ('will_id', 'title', 'description', 'status', 'created_at',
+                'asset_count', 'executor_count')
+
+# name -> (sort column, record attribute, descending by default)
+WILL_SORTS = {
+    'created': ('w.created_at', 'created_at', True),
+    'title':   ('w.title', 'title', False),
+    'status':  ('w.status', 'status', False),
+}
+
+WILL_SEARCH_COLUMNS = ('w.title', 'w.description')
+
+# Asset and executor counts of the wills on one page only, grouped once
+WILL_COUNTS_SQL = """
+    SELECT will_id, SUM(is_asset), SUM(is_executor)
+    FROM (
+        SELECT will_id, 1 AS is_asset, 0 AS is_executor FROM assets WHERE will_id IN ({ids})
+        UNION ALL
+        SELECT will_id, 0, 1 FROM executors WHERE will_id IN ({ids})
+    )
+    GROUP BY will_id
+"""
+
+
+class WillSummary(Record):
+    """Row of the wills list."""
+
+    __slots__ = WILL_COLUMNS
+
+    def __init__(self, will_id, title, description, status, created_at):
+        self.will_id = will_id
+        self.title = title
+        self.description = description
+        self.status = status
+        self.created_at = created_at
+        self.asset_count = 0
+        self.executor_count = 0
+
+
+def attach_will_counts(cur, rows):
+    """Fill in the asset and executor counts of the wills of a page."""
+    if not rows:
+        return rows
+    by_id = {row.will_id: row for row in rows}
+    placeholders, binds = in_list(list(by_id), 'will_')
+    cur.execute(WILL_COUNTS_SQL.format(ids=placeholders), binds)
+    for will_id, assets, executors in cur.fetchall():
+        by_id[will_id].asset_count, by_id[will_id].executor_count = assets, executors
+    return rows
+
+
+# Header of a will with its owner. Doubles as the freshness probe of the
+# cache: every change to the will, its assets, executors or allocations
+# updates the wills row (see the trg_update_last_modified_on_* triggers),
+# which moves last_updated_at and ORA_ROWSCN. ORA_ROWSCN also catches
+# changes made within the same second.
+WILL_HEADER_SQL = """
+    SELECT w.will_id, w.user_id, w.title, w.description, w.status,
+           w.created_at, w.last_updated_at, w.ORA_ROWSCN,
+           u.full_name, u.email
+    FROM wills w
+    JOIN users u ON w.user_id = u.user_id
+    WHERE w.will_id = :will_id
+"""
+WILL_HEADER = statements.define('wills.header', WILL_HEADER_SQL, ROW)
+
+# Assets with their allocations, and the executors, as two implicit result
+# sets of one call
+WILL_DETAIL_SQL = """
+    DECLARE
+        c_assets    SYS_REFCURSOR;
+        c_executors SYS_REFCURSOR;
+    BEGIN
+        OPEN c_assets FOR
+            SELECT a.asset_id, a.name, a.description, a.asset_type, a.value, a.location,
+                   wab.beneficiary_id, b.full_name, b.relation,
+                   wab.share_percent, wab.conditions
+            FROM assets a
+            LEFT JOIN will_asset_beneficiaries wab ON wab.asset_id = a.asset_id
+            LEFT JOIN beneficiaries b ON b.beneficiary_id = wab.beneficiary_id
+            WHERE a.will_id = :will_id
+            ORDER BY a.name, a.asset_id, b.full_name;
+        DBMS_SQL.RETURN_RESULT(c_assets);
+
+        OPEN c_executors FOR
+            SELECT executor_id, full_name, email, phone_number, relation, is_primary
+            FROM executors
+            WHERE will_id = :will_id
+            ORDER BY is_primary DESC, full_name;
+        DBMS_SQL.RETURN_RESULT(c_executors);
+    END;
+"""
+WILL_DETAIL = statements.define('wills.detail', WILL_DETAIL_SQL, LIST)
+
+
+# Version probe for conditional GETs: one primary key lookup returning the
+# will's version and what the access check needs. ``{will}`` is
+# ``:will_id`` or a subquery resolving it from an asset.
+WILL_VERSION_SQL = """
+    SELECT w.will_id, w.last_updated_at, w.ORA_ROWSCN, w.user_id,
+           CASE WHEN EXISTS (SELECT 1 FROM executors e
+                             WHERE e.email = :email AND e.will_id = w.will_id)
+                THEN 1 ELSE 0 END AS is_executor
+    FROM wills w
+    WHERE w.will_id = {will}
+"""
+
+WILL_BY_ASSET = "(SELECT will_id FROM assets WHERE asset_id = :asset_id)"
+
+WILL_VERSION = statements.define('wills.version', WILL_VERSION_SQL.format(will=':will_id'), ROW)
+WILL_VERSION_BY_ASSET = statements.define('wills.version_by_asset',
+                                          WILL_VERSION_SQL.format(will=WILL_BY_ASSET), ROW)
+
+
+def can_view_will(owner_id, is_executor, user_id, all_roles):
+    """Admins, the testator who owns the will and its executors may view it."""
+    return ('admin' in all_roles
+            or ('testator' in all_roles and owner_id == user_id)
+            or ('executor' in all_roles and bool(is_executor)))
+
+
+class WillVersion:
+    """Result of the version probe of a will."""
+
+    __slots__ = ('will_id', 'last_updated_at', 'scn', 'user_id', 'is_executor')
+
+    def __init__(self, will_id, last_updated_at, scn, user_id, is_executor):
+        self.will_id = will_id
+        self.last_updated_at = last_updated_at
+        self.scn = scn
+        self.user_id = user_id
+        self.is_executor = bool(is_executor)
+
+    @property
+    def key(self):
+        """The cache version of ``WillLoader``."""
+        return (self.last_updated_at, self.scn)
+
+    def can_view(self, user_id, all_roles):
+        return can_view_will(self.user_id, self.is_executor, user_id, all_roles)
+
+    def etag(self, *variant):
+        """Weak ETag of a representation of this version of the will.
+
+        ``variant`` holds whatever else the representation depends on
+        (endpoint, viewer), so two users or two views never share a tag.
+        """
+        stamp = self.last_updated_at.isoformat() if self.last_updated_at else ''
+        raw = ':'.join(str(part) for part in (self.will_id, stamp, self.scn) + variant)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class Allocation:
+    __slots__ = ('asset', 'beneficiary_id', 'beneficiary_name', 'relation',
+                 'share_percent', 'conditions')
+
+    def __init__(self, asset, beneficiary_id, beneficiary_name, relation, share_percent, conditions):
+        self.asset = asset
+        self.beneficiary_id = beneficiary_id
+        self.beneficiary_name = beneficiary_name
+        self.relation = relation
+        self.share_percent = float(share_percent or 0)
+        self.conditions = conditions
+
+    @property
+    def estimated_value(self):
+        return self.asset.value * self.share_percent / 100
+
+
+class Asset:
+    __slots__ = ('asset_id', 'name', 'description', 'asset_type', 'value', 'location',
+                 'allocations')
+
+    def __init__(self, asset_id, name, description, asset_type, value, location):
+        self.asset_id = asset_id
+        self.name = name
+        self.description = description
+        self.asset_type = asset_type
+        self.value = float(value or 0)
+        self.location = location
+        self.allocations = []
+
+    @property
+    def allocated_percent(self):
+        return sum(allocation.share_percent for allocation in self.allocations)
+
+
+class Executor:
+    """Executor of a will; also the rowfactory of the executors result set."""
+
+    __slots__ = ('executor_id', 'full_name', 'email', 'phone_number', 'relation', 'is_primary')
+
+    def __init__(self, executor_id, full_name, email, phone_number, relation, is_primary):
+        self.executor_id = executor_id
+        self.full_name = full_name
+        self.email = email
+        self.phone_number = phone_number
+        self.relation = relation
+        self.is_primary = is_primary == 'Y'
+
+
+class BeneficiaryShare:
+    """What one beneficiary inherits under a will."""
+
+    __slots__ = ('beneficiary_id', 'full_name', 'relation', 'assigned_assets', 'total_inheritance')
+
+    def __init__(self, beneficiary_id, full_name, relation):
+        self.beneficiary_id = beneficiary_id
+        self.full_name = full_name
+        self.relation = relation
+        self.assigned_assets = 0
+        self.total_inheritance = 0.0
+
+
+class WillAggregate:
+    """A will with its owner, assets, allocations and executors.
+
+    Instances are shared between requests through the cache and must be
+    treated as read-only.
+    """
+
+    def __init__(self, header, assets, executors):
+        (self.will_id, self.user_id, self.title, self.description, self.status,
+         self.created_at, self.last_updated_at, self.scn, self.owner_name, self.owner_email) = header
+        self.assets = assets
+        self.executors = executors
+
+    @property
+    def version(self):
+        """Same as ``WillVersion.key``; keys the cached fragments of the will's pages."""
+        return (self.last_updated_at, self.scn)
+
+    @property
+    def allocations(self):
+        return [allocation for asset in self.assets for allocation in asset.allocations]
+
+    @property
+    def total_value(self):
+        return sum(asset.value for asset in self.assets)
+
+    @property
+    def beneficiaries(self):
+        """Per-beneficiary totals, largest inheritance first."""
+        shares = {}
+        for allocation in self.allocations:
+            share = shares.get(allocation.beneficiary_id)
+            if share is None:
+                share = shares[allocation.beneficiary_id] = BeneficiaryShare(
+                    allocation.beneficiary_id, allocation.beneficiary_name, allocation.relation)
+            share.assigned_assets += 1
+            share.total_inheritance += allocation.estimated_value
+        return sorted(shares.values(), key=lambda share: -share.total_inheritance)
+
+    def has_executor(self, email):
+        return any(executor.email == email for executor in self.executors)
+
+    def can_view(self, user_id, email, all_roles):
+        return can_view_will(self.user_id, self.has_executor(email), user_id, all_roles)
+
+    def stats(self):
+        """Counts of the summary report and ``/api/will/<id>/stats``."""
+        # Average share over every allocation, counting unallocated assets as 0
+        shares = [allocation.share_percent for allocation in self.allocations]
+        shares += [0] * sum(1 for asset in self.assets if not asset.allocations)
+        return {
+            'total_assets':        len(self.assets),
+            'total_value':         self.total_value,
+            'total_beneficiaries': len({a.beneficiary_id for a in self.allocations}),
+            'total_executors':     len(self.executors),
+            'primary_executors':   sum(1 for executor in self.executors if executor.is_primary),
+            'avg_allocation':      sum(shares) / len(shares) if shares else 0
+        }
+
+
+class WillLoader:
+    """Loads will aggregates, caching each per will.
+
+    Every load reads the will header (one primary key lookup); the assets,
+    allocations and executors are fetched in one more round trip only when
+    the header's version differs from the cached one.
+    """
+
+    def __init__(self, database=db, ttl=None):
+        self.database = database
+        self.cache = TTLCache(ttl if ttl is not None else Config.WILL_CACHE_TTL)
+
+    def probe(self, email, will_id=None, asset_id=None):
+        """``WillVersion`` of a will (or of an asset's will), or None."""
+        if will_id is not None:
+            statement, binds = WILL_VERSION, {'will_id': will_id}
+        else:
+            statement, binds = WILL_VERSION_BY_ASSET, {'asset_id': asset_id}
+        with self.database.get_cursor(commit=False) as cur:
+            row = statement.one(cur, dict(binds, email=email))
+        return WillVersion(*row) if row else None
+
+    def load(self, will_id, version=None):
+        """Return the will's aggregate, or None when it does not exist.
+
+        With the ``version`` key of a fresh probe, a cached aggregate of
+        that version is returned without reading the header again.
+        """
+        cached = self.cache.get(will_id)
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self.database.get_cursor(commit=False) as cur:
+            header = WILL_HEADER.one(cur, {'will_id': will_id})
+            if header is None:
+                self.cache.pop(will_id)
+                return None
+
+            version = (header[6], header[7])
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            WILL_DETAIL.execute(cur, {'will_id': will_id})
+            asset_results, executor_results = cur.getimplicitresults()
+            asset_rows = asset_results.fetchall()
+            executor_results.rowfactory = Executor
+            executors = executor_results.fetchall()
+
+        assets = {}
+        for (asset_id, name, description, asset_type, value, location,
+             beneficiary_id, beneficiary_name, relation, share, conditions) in asset_rows:
+            asset = assets.get(asset_id)
+            if asset is None:
+                asset = assets[asset_id] = Asset(asset_id, name, description, asset_type, value, location)
+            if beneficiary_id is not None:
+                asset.allocations.append(Allocation(asset, beneficiary_id, beneficiary_name,
+                                                    relation, share, conditions))
+        will = WillAggregate(header, list(assets.values()), executors)
+        self.cache.set(will_id, (version, will))
+        return will
+
+
+will_loader = WillLoader()
@@ -0,0 +1,382 @@
+# metrics.py
+
+"""Per-endpoint request metrics.
+
+For every request it records:
+
+- wall time
+- time spent inside ``db.get_cursor`` blocks
+- statements executed and rows fetched through those cursors
+- template render time
+
+Totals per endpoint, and render counts and time per template, are exposed
+in the Prometheus text format by ``RequestMetrics.render``. With ``METRICS_DEBUG_HEADER`` each response
+also carries its own figures in a ``Server-Timing`` header.
+
+Each statement is also timed from execute through its fetches and handed
+to ``statement_listeners`` (the slow-query log, ``database.slow_queries``).
+
+Views declare how many statements they may run with ``@query_budget``;
+going over is logged and counted, and raises ``QueryBudgetExceeded`` with
+``QUERY_BUDGET_STRICT`` (on under ``TestingConfig``).
+"""
+
+import threading
+import time
+from flask import (
+    g, request, current_app, has_request_context, before_render_template, template_rendered
+)
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more statements or fetched more rows than its budget."""
+
+
+def query_budget(statements, rows=None):
+    """Declare the most statements (and rows fetched) a view may use per request.
+
+    Place it directly under ``@app.route`` and count the worst case: cache
+    misses, the role version check and role refresh, and will version
+    probes included. The check runs when the view returns, so the audit
+    flush at teardown and streamed bodies are not counted.
+    """
+    def deco(f):
+        f.query_budget = (statements, rows)
+        return f
+    return deco
+
+
+class RequestStats:
+    """Figures of the request in flight, kept on ``flask.g``."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.statements = 0
+        self.rows = 0
+        self.render_time = 0.0
+        self._render_started = None
+        self._template = None
+
+
+class Statement:
+    """One statement of a request, timed from execute through its fetches."""
+
+    def __init__(self, sql, binds):
+        self.sql = sql
+        self.binds = binds
+        self.seconds = 0.0
+        self.rows = 0
+        self.route = None
+
+
+class CountingCursor:
+    """Cursor proxy counting statements and fetched rows for the request.
+
+    Each statement is also timed, execute and fetches together, and handed
+    to ``RequestMetrics.statement_done`` when the next one starts or the
+    ``get_cursor`` block ends. Result cursors of ``getimplicitresults``
+    add their fetches to the statement that opened them.
+    """
+
+    def __init__(self, cursor, stats, metrics, statement=None):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_stats', stats)
+        object.__setattr__(self, '_metrics', metrics)
+        object.__setattr__(self, '_statement', statement)
+        object.__setattr__(self, '_owns_statement', statement is None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        rows = iter(self._cursor)
+        while True:
+            started = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                self._fetched(started, 0)
+                return
+            self._fetched(started, 1)
+            yield row
+
+    def execute(self, statement, parameters=None, **kwargs):
+        # A None statement runs the one given to prepare()
+        self._begin(statement if statement is not None else self._cursor.statement,
+                    parameters if parameters is not None else kwargs)
+        return self._timed(self._cursor.execute, statement, parameters, **kwargs)
+
+    def executemany(self, statement, parameters, **kwargs):
+        self._begin(statement if statement is not None else self._cursor.statement, parameters)
+        return self._timed(self._cursor.executemany, statement, parameters, **kwargs)
+
+    def callproc(self, name, parameters=None, *args, **kwargs):
+        self._begin(f'CALL {name}', parameters)
+        return self._timed(self._cursor.callproc, name, parameters, *args, **kwargs)
+
+    def callfunc(self, name, return_type, parameters=None, *args, **kwargs):
+        self._begin(f'CALL {name}', parameters)
+        return self._timed(self._cursor.callfunc, name, return_type, parameters, *args, **kwargs)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def getimplicitresults(self):
+        return [CountingCursor(result, self._stats, self._metrics, self._statement)
+                for result in self._cursor.getimplicitresults()]
+
+    def finish(self):
+        """Report the statement in progress, if this cursor started it."""
+        statement = self._statement
+        if statement is not None and self._owns_statement:
+            object.__setattr__(self, '_statement', None)
+            self._metrics.statement_done(statement)
+
+    def _begin(self, sql, binds):
+        self.finish()
+        self._stats.statements += 1
+        object.__setattr__(self, '_statement', Statement(sql, binds))
+
+    def _timed(self, call, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            self._statement.seconds += time.perf_counter() - started
+
+    def _fetched(self, started, rows):
+        self._stats.rows += rows
+        if self._statement is not None:
+            self._statement.seconds += time.perf_counter() - started
+            self._statement.rows += rows
+
+
+class EndpointTotals:
+    def __init__(self):
+        self.requests = {}      # (method, status) -> count
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.wall_time = 0.0
+        self.db_time = 0.0
+        self.statements = 0
+        self.rows = 0
+        self.render_time = 0.0
+
+
+class TemplateTotals:
+    def __init__(self):
+        self.count = 0
+        self.render_time = 0.0
+        self.max = 0.0
+
+
+class RequestMetrics:
+    """Aggregates ``RequestStats`` per endpoint; one instance per process."""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._templates = {}     # template name -> TemplateTotals
+        self._over_budget = {}   # endpoint -> requests over their query budget
+        self._lock = threading.Lock()
+        self.debug_header = False
+        self.strict_budgets = False
+        # Callables given each finished Statement (see database.slow_queries)
+        self.statement_listeners = []
+
+    def init_app(self, app, database):
+        self.debug_header = app.config.get('METRICS_DEBUG_HEADER', False)
+        self.strict_budgets = app.config.get('QUERY_BUDGET_STRICT', False)
+        database.cursor_observer = self
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+
+    # ─── Database hooks (see DatabaseConnection.get_cursor) ─────
+
+    def wrap(self, cursor):
+        stats = self.current()
+        return cursor if stats is None else CountingCursor(cursor, stats, self)
+
+    def block_done(self, cursor, elapsed):
+        if isinstance(cursor, CountingCursor):
+            cursor.finish()
+        stats = self.current()
+        if stats is not None:
+            stats.db_time += elapsed
+
+    def statement_done(self, statement):
+        if not self.statement_listeners:
+            return
+        statement.route = request.endpoint if has_request_context() else None
+        for listener in self.statement_listeners:
+            listener(statement)
+
+    # ─── Request hooks ──────────────────────────
+
+    @staticmethod
+    def current():
+        """``RequestStats`` of the request in flight, or None."""
+        return g.get('_request_stats') if has_request_context() else None
+
+    def _start(self):
+        g._request_stats = RequestStats()
+
+    def _render_started(self, sender, template, context, **extra):
+        stats = self.current()
+        if stats is not None:
+            stats._render_started = time.perf_counter()
+            stats._template = template.name
+
+    def _render_finished(self, sender, template, context, **extra):
+        stats = self.current()
+        if stats is not None and stats._render_started is not None:
+            elapsed = time.perf_counter() - stats._render_started
+            stats.render_time += elapsed
+            stats._render_started = None
+            self.record_render(stats._template or 'unnamed', elapsed)
+
+    def _finish(self, response):
+        stats = self.current()
+        if stats is None:
+            return response
+        wall_time = time.perf_counter() - stats.started
+        endpoint = request.endpoint or 'unmatched'
+        self.record(endpoint, request.method, response.status_code, wall_time, stats)
+        if self.debug_header:
+            response.headers['Server-Timing'] = (
+                f'app;dur={wall_time * 1000:.1f}, '
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} statements, {stats.rows} rows", '
+                f'render;dur={stats.render_time * 1000:.1f}')
+        budget = getattr(current_app.view_functions.get(request.endpoint), 'query_budget', None)
+        if budget is not None:
+            self.check_budget(endpoint, budget, stats)
+        return response
+
+    def check_budget(self, endpoint, budget, stats):
+        statements, rows = budget
+        problems = []
+        if stats.statements > statements:
+            problems.append(f'{stats.statements} statements (budget {statements})')
+        if rows is not None and stats.rows > rows:
+            problems.append(f'{stats.rows} rows (budget {rows})')
+        if not problems:
+            return
+        with self._lock:
+            self._over_budget[endpoint] = self._over_budget.get(endpoint, 0) + 1
+        message = f"{endpoint} ran {' and '.join(problems)}"
+        if self.strict_budgets:
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning('Query budget exceeded: %s', message)
+
+    def record(self, endpoint, method, status, wall_time, stats):
+        with self._lock:
+            totals = self._endpoints.get(endpoint)
+            if totals is None:
+                totals = self._endpoints[endpoint] = EndpointTotals()
+            key = (method, status)
+            totals.requests[key] = totals.requests.get(key, 0) + 1
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if wall_time <= bound:
+                    totals.buckets[i] += 1
+            totals.count += 1
+            totals.wall_time += wall_time
+            totals.db_time += stats.db_time
+            totals.statements += stats.statements
+            totals.rows += stats.rows
+            totals.render_time += stats.render_time
+
+    def record_render(self, template, elapsed):
+        with self._lock:
+            totals = self._templates.get(template)
+            if totals is None:
+                totals = self._templates[template] = TemplateTotals()
+            totals.count += 1
+            totals.render_time += elapsed
+            totals.max = max(totals.max, elapsed)
+
+    # ─── Exposition ─────────────────────────────
+
+    def render(self, gauges=None):
+        """Prometheus text exposition of the totals plus ``gauges`` ({name: value})."""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = [
+                '# HELP dwm_http_requests_total Requests handled, by endpoint, method and status.',
+                '# TYPE dwm_http_requests_total counter',
+            ]
+            for endpoint, totals in endpoints:
+                for (method, status), count in sorted(totals.requests.items()):
+                    lines.append(f'dwm_http_requests_total{{endpoint="{endpoint}",method="{method}",'
+                                 f'status="{status}"}} {count}')
+
+            lines += ['# HELP dwm_http_request_duration_seconds Wall time of requests.',
+                      '# TYPE dwm_http_request_duration_seconds histogram']
+            for endpoint, totals in endpoints:
+                for bound, count in zip(DURATION_BUCKETS, totals.buckets):
+                    lines.append(f'dwm_http_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                                 f'le="{bound}"}} {count}')
+                lines.append(f'dwm_http_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                             f'le="+Inf"}} {totals.count}')
+                lines.append(f'dwm_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} '
+                             f'{totals.wall_time:.6f}')
+                lines.append(f'dwm_http_request_duration_seconds_count{{endpoint="{endpoint}"}} '
+                             f'{totals.count}')
+
+            for name, attr, help_text in (
+                    ('dwm_db_time_seconds_total', 'db_time', 'Time spent inside db.get_cursor blocks.'),
+                    ('dwm_db_statements_total', 'statements', 'Statements executed.'),
+                    ('dwm_db_rows_fetched_total', 'rows', 'Rows fetched.'),
+                    ('dwm_template_render_seconds_total', 'render_time', 'Template render time.')):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for endpoint, totals in endpoints:
+                    value = getattr(totals, attr)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+
+            templates = sorted(self._templates.items())
+            for name, attr, kind, help_text in (
+                    ('dwm_template_renders_total', 'count', 'counter', 'Renders, by template.'),
+                    ('dwm_template_render_by_template_seconds_total', 'render_time', 'counter',
+                     'Render time, by template.'),
+                    ('dwm_template_render_max_seconds', 'max', 'gauge',
+                     'Slowest render since start, by template.')):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for template, totals in templates:
+                    value = getattr(totals, attr)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{template="{template}"}} {value}')
+
+            lines += ['# HELP dwm_query_budget_exceeded_total Requests over their view\'s query budget.',
+                      '# TYPE dwm_query_budget_exceeded_total counter']
+            for endpoint, count in sorted(self._over_budget.items()):
+                lines.append(f'dwm_query_budget_exceeded_total{{endpoint="{endpoint}"}} {count}')
+
+        for name, value in (gauges or {}).items():
+            lines += [f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
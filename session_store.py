@@ -0,0 +1,75 @@
+# session_store.py
+
+"""Session backends selected by ``SESSION_BACKEND``.
+
+``cookie``      Flask's signed cookie session (default once ``SECRET_KEY``
+                is set). The session only holds the signed-in user's id,
+                name, email and roles, so it fits a cookie and needs no
+                server-side storage, but anyone holding the key can forge
+                one: outside development and testing it is refused with
+                the default key.
+``memory``      Server-side sessions in a bounded in-process cache with TTL
+                eviction (default without ``SECRET_KEY``). Not shared
+                between workers.
+``redis``       Server-side sessions in Redis (``SESSION_REDIS_URL``),
+                shared by every worker; needs the ``redis`` package.
+``filesystem``  The previous Flask-Session file store, kept for comparison.
+"""
+
+import os
+from cachelib import SimpleCache
+from flask_session import Session
+from flask_session.sessions import FileSystemSessionInterface, ServerSideSession
+from config import DEFAULT_SECRET_KEY
+
+SESSION_BACKENDS = ('cookie', 'memory', 'redis', 'filesystem')
+
+
+class MemorySession(ServerSideSession):
+    pass
+
+
+class MemorySessionInterface(FileSystemSessionInterface):
+    """Flask-Session's cache-backed interface over a ``SimpleCache``.
+
+    Entries expire after the permanent session lifetime and the cache
+    holds at most ``threshold`` sessions, dropping expired and then the
+    oldest entries when full.
+    """
+
+    session_class = MemorySession
+
+    def __init__(self, threshold, key_prefix, use_signer=False, permanent=True):
+        self.cache = SimpleCache(threshold=threshold)
+        self.key_prefix = key_prefix
+        self.use_signer = use_signer
+        self.permanent = permanent
+        self.has_same_site_capability = hasattr(self, "get_cookie_samesite")
+
+
+def init_session(app):
+    backend = app.config['SESSION_BACKEND']
+    if backend not in SESSION_BACKENDS:
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}; "
+                         f"expected one of {', '.join(SESSION_BACKENDS)}")
+
+    if backend == 'cookie':
+        if app.config.get('SECRET_KEY') in (None, '', DEFAULT_SECRET_KEY) and not (app.debug or app.testing):
+            raise ValueError("SESSION_BACKEND 'cookie' needs a SECRET_KEY of its own; "
+                             "set SECRET_KEY or use a server-side backend")
+        return  # Flask's default SecureCookieSessionInterface
+    if backend == 'memory':
+        app.session_interface = MemorySessionInterface(
+            app.config['SESSION_MEMORY_THRESHOLD'],
+            app.config['SESSION_KEY_PREFIX'],
+            use_signer=app.config['SESSION_USE_SIGNER'],
+            permanent=app.config['SESSION_PERMANENT'])
+        return
+
+    if backend == 'redis' and app.config.get('SESSION_REDIS') is None:
+        import redis
+        app.config['SESSION_REDIS'] = redis.from_url(app.config['SESSION_REDIS_URL'])
+    if backend == 'filesystem':
+        os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
+    app.config['SESSION_TYPE'] = backend
+    Session(app)
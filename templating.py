@@ -0,0 +1,121 @@
+# templating.py
+
+"""Jinja setup: on-disk bytecode cache and cached template fragments.
+
+``TEMPLATE_BYTECODE_DIR`` keeps every compiled template as bytecode, so a
+new worker loads it instead of parsing and compiling the source again.
+Entries carry the checksum of their source and are rebuilt when a
+template changes. ``flask --app app precompile-templates`` fills the
+directory ahead of a deploy; empty the setting to disable it.
+
+``{% cache 'name', key... %}...{% endcache %}`` renders its body once per
+key and keeps the HTML in ``fragment_cache``. Keys must hold everything
+the body shows, typically the will id and its version (``will.version``,
+moved by every change to the will, its assets, allocations and the names
+of its beneficiaries) plus the viewer's role where the body has
+role-dependent actions. ``FRAGMENT_CACHE_TTL`` only bounds how long
+unused entries are kept.
+"""
+
+import os
+import threading
+import click
+from jinja2 import FileSystemBytecodeCache, TemplateError, nodes
+from jinja2.ext import Extension
+from config import Config
+from util import TTLCache
+
+
+class FragmentCache:
+    """Rendered template fragments by key, with hit and miss counts."""
+
+    def __init__(self, ttl, maxsize=2048):
+        self.cache = TTLCache(ttl, maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def render(self, key, render):
+        html = self.cache.get(key)
+        with self._lock:
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if html is None:
+            html = render()
+            self.cache.set(key, html)
+        return html
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.cache)}
+
+    def clear(self):
+        self.cache.clear()
+
+
+class FragmentCacheExtension(Extension):
+    """The ``{% cache %}`` tag; renders straight through without a ``fragment_cache``."""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_fragment', [nodes.Tuple(key, 'load')])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, key, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        return cache.render(key, caller)
+
+
+fragment_cache = FragmentCache(Config.FRAGMENT_CACHE_TTL)
+
+
+def precompile_templates(app):
+    """Compile every template of ``app`` into the bytecode cache.
+
+    Returns the names compiled and ``(name, error)`` of those that failed.
+    """
+    env = app.jinja_env
+    compiled, failed = [], []
+    for name in env.list_templates(extensions=('html',)):
+        try:
+            env.get_template(name)
+        except TemplateError as err:
+            failed.append((name, err))
+        else:
+            compiled.append(name)
+    return compiled, failed
+
+
+def init_templating(app):
+    directory = app.config.get('TEMPLATE_BYTECODE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        fragment_cache.cache.ttl = app.config.get('FRAGMENT_CACHE_TTL', fragment_cache.cache.ttl)
+        app.jinja_env.fragment_cache = fragment_cache
+
+    @app.cli.command('precompile-templates')
+    def precompile_templates_command():
+        """Fill TEMPLATE_BYTECODE_DIR with every template's bytecode."""
+        if app.jinja_env.bytecode_cache is None:
+            raise click.ClickException('TEMPLATE_BYTECODE_DIR is not set.')
+        compiled, failed = precompile_templates(app)
+        click.echo(f'Compiled {len(compiled)} templates into {directory}')
+        for name, err in failed:
+            click.echo(f'Could not compile {name}: {err}', err=True)
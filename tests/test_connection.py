@@ -0,0 +1,180 @@
+# tests/test_connection.py
+
+"""``DatabaseConnection`` pooling and request scoping, against ``FakePool``."""
+
+import threading
+import time
+import oracledb
+import pytest
+from flask import Flask
+from database.connection import DatabaseConnection
+from database.fake import FakePool
+
+
+def make_db(**pool_overrides):
+    """A pooled ``DatabaseConnection`` whose pool takes ``pool_overrides``."""
+    return DatabaseConnection(
+        pooled=True,
+        pool_factory=lambda **params: FakePool(**dict(params, **pool_overrides)))
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def test_cursor_outside_app_context_acquires_and_releases():
+    pool_db = make_db(min=1, max=2)
+    with pool_db.get_cursor() as cur:
+        cur.execute("SELECT 1 FROM dual")
+        assert pool_db.pool.busy == 1
+    assert pool_db.pool.busy == 0
+    assert pool_db.pool.opened == 1
+    assert pool_db.pool_stats()['acquires'] == 1
+
+
+def test_pool_uses_timed_wait():
+    pool_db = make_db()
+    assert pool_db.pool.getmode == oracledb.POOL_GETMODE_TIMEDWAIT
+
+
+def test_timed_wait_gives_up_and_counts_a_timeout():
+    pool_db = make_db(min=1, max=1, wait_timeout=20)
+    held = pool_db.get_connection()
+    started = time.perf_counter()
+    with pytest.raises(oracledb.DatabaseError):
+        pool_db.get_connection()
+    assert time.perf_counter() - started >= 0.02
+    stats = pool_db.pool_stats()
+    assert stats['timeouts'] == 1
+    assert stats['acquires'] == 1
+    pool_db.release_connection(held)
+
+
+def test_pool_stats_count_waits_and_busy():
+    pool_db = make_db(min=1, max=1, wait_timeout=2000)
+    held = pool_db.get_connection()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool_db.get_connection()))
+    waiter.start()
+    time.sleep(0.05)
+    pool_db.release_connection(held)
+    waiter.join(timeout=2)
+
+    assert acquired
+    stats = pool_db.pool_stats()
+    assert stats['acquires'] == 2
+    assert stats['waits'] == 1
+    assert stats['wait_time_ms'] > 0
+    assert (stats['busy'], stats['open'], stats['max']) == (1, 1, 1)
+    pool_db.release_connection(acquired[0])
+    assert pool_db.pool_stats()['busy'] == 0
+
+
+def test_request_blocks_share_one_connection(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor() as first:
+            pass
+        with pool_db.get_cursor() as second:
+            pass
+        assert first.connection is second.connection
+        assert pool_db.pool.busy == 1
+    assert pool_db.pool.busy == 0
+    assert pool_db.pool_stats()['acquires'] == 1
+
+
+def test_read_only_block_rolls_back_uncommitted_work(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor(commit=False) as cur:
+            cur.execute("UPDATE wills SET status = 'Draft'")
+        conn = cur.connection
+        assert not conn.transaction_in_progress
+    assert conn.commits == 0
+    assert conn.rollbacks == 1
+    assert pool_db.pool.busy == 0
+
+
+def test_unchanged_connection_skips_commit_and_rollback(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor() as cur:
+            cur.execute("SELECT 1 FROM dual")
+        conn = cur.connection
+    assert (conn.commits, conn.rollbacks) == (0, 0)
+
+
+def test_committed_block_leaves_nothing_to_roll_back(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor() as cur:
+            cur.execute("UPDATE wills SET status = 'Draft'")
+        conn = cur.connection
+    assert (conn.commits, conn.rollbacks) == (1, 0)
+
+
+def test_failed_block_rolls_back_and_releases():
+    pool_db = make_db(min=1, max=2)
+    with pytest.raises(ValueError):
+        with pool_db.get_cursor() as cur:
+            cur.execute("UPDATE wills SET status = 'Draft'")
+            raise ValueError
+    assert cur.connection.rollbacks == 1
+    assert pool_db.pool.busy == 0
+
+
+def test_client_identity_is_cleared_on_release(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.client_identity = lambda: ('user@example.com', 'dashboard')
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor() as cur:
+            assert cur.connection.client_identifier == 'user@example.com'
+        conn = cur.connection
+    assert conn.client_identifier is None
+    assert conn.clientinfo is None
+
+
+def test_read_only_block_rolls_back_before_the_next_block_commits(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor(commit=False) as cur:
+            cur.execute("UPDATE wills SET status = 'Draft'")
+        with pool_db.get_cursor() as cur:
+            cur.execute("SELECT 1 FROM dual")
+        conn = cur.connection
+        assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_nested_block_leaves_the_transaction_to_the_outer_block(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor() as outer:
+            outer.execute("UPDATE wills SET status = 'Approved'")
+            with pool_db.get_cursor(commit=False) as inner:
+                inner.execute("SELECT 1 FROM dual")
+            conn = outer.connection
+            assert (conn.commits, conn.rollbacks) == (0, 0)
+        assert (conn.commits, conn.rollbacks) == (1, 0)
+
+
+def test_nested_error_does_not_roll_back_the_outer_block(app):
+    pool_db = make_db(min=1, max=2)
+    pool_db.init_app(app)
+    with app.app_context():
+        with pool_db.get_cursor() as outer:
+            outer.execute("UPDATE wills SET status = 'Approved'")
+            with pytest.raises(ValueError):
+                with pool_db.get_cursor(commit=False):
+                    raise ValueError
+            conn = outer.connection
+            assert conn.rollbacks == 0
+            assert conn.transaction_in_progress
+        assert (conn.commits, conn.rollbacks) == (1, 0)
@@ -0,0 +1,223 @@
+# tests/test_query_budgets.py
+
+"""Every endpoint, reads and writes, against its ``@query_budget``.
+
+The app runs under ``TestingConfig`` on the in-memory stand-in of
+``benchmarks/standin.py``, with the in-process caches cleared before each
+request so every cache miss is paid. A request fails when its view went
+over budget or sent a statement the stand-in could not answer. The clock
+of the views is set to a business day, so transfers are not blocked.
+"""
+
+import io
+import os
+import sys
+from datetime import datetime
+import pytest
+from flask import request
+from jinja2 import TemplateError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from database.connection import db  # noqa: E402
+from metrics import request_metrics  # noqa: E402
+from standin import StandIn, StandInData, PASSWORD  # noqa: E402
+from bench_routes import sign_in, clear_caches  # noqa: E402
+
+ASSET_CSV = b"name,asset_type,value\nSavings account,Bank Account,250000\n"
+
+# (endpoint, method, path, who is signed in, request kwargs)
+CASES = [
+    ('index',                   'GET',  '/', None, {}),
+    ('health_check',            'GET',  '/health', None, {}),
+    ('login',                   'GET',  '/login', None, {}),
+    ('login',                   'POST', '/login', None,
+     {'data': {'email': '{email}', 'password': PASSWORD}}),
+    ('register',                'GET',  '/register', None, {}),
+    ('register',                'POST', '/register', None,
+     {'data': {'full_name': 'New Testator', 'email': 'new.testator@example.rw',
+               'password': 'Secret123!', 'confirm_password': 'Secret123!',
+               'initial_role': 'testator'}}),
+    ('logout',                  'GET',  '/logout', 'testator', {}),
+    ('dashboard',               'GET',  '/dashboard', 'testator', {}),
+    ('switch_role',             'GET',  '/switch-role/executor', 'testator', {}),
+    ('list_wills',              'GET',  '/wills', 'testator', {}),
+    ('create_will',             'GET',  '/wills/create', 'testator', {}),
+    ('create_will',             'POST', '/wills/create', 'testator',
+     {'data': {'title': 'Second will', 'description': 'Drafted in a test'}}),
+    ('view_will',               'GET',  '/wills/{will_id}', 'testator', {}),
+    ('approve_will',            'POST', '/wills/{will_id}/approve', 'testator', {}),
+    ('add_asset',               'GET',  '/wills/{will_id}/assets/add', 'testator', {}),
+    ('add_asset',               'POST', '/wills/{will_id}/assets/add', 'testator',
+     {'data': {'name': 'Family house', 'asset_type': 'Real Estate', 'value': '1500000'}}),
+    ('import_assets',           'GET',  '/wills/{will_id}/assets/import', 'testator', {}),
+    ('import_assets',           'POST', '/wills/{will_id}/assets/import', 'testator',
+     {'data': {'file': (io.BytesIO(ASSET_CSV), 'assets.csv')}}),
+    ('assign_asset',            'GET',  '/assets/{asset_id}/assign', 'testator', {}),
+    ('assign_asset',            'POST', '/assets/{asset_id}/assign', 'testator',
+     {'data': {'beneficiary_id': '{beneficiary_id}', 'share_percent': '10'}}),
+    ('manage_beneficiaries',    'GET',  '/beneficiaries', 'testator', {}),
+    ('manage_beneficiaries',    'POST', '/beneficiaries', 'testator',
+     {'data': {'full_name': 'New Heir', 'relation': 'Child'}}),
+    ('add_executor',            'POST', '/wills/{will_id}/executors/add', 'testator',
+     {'data': {'full_name': 'New Executor', 'email': 'executor@example.rw'}}),
+    ('list_transfers',          'GET',  '/transfers', 'testator', {}),
+    ('initiate_transfer',       'POST', '/transfers/initiate', 'testator',
+     {'data': {'asset_id': '{asset_id}', 'beneficiary_id': '{beneficiary_id}'}}),
+    ('execute_will_transfers',  'POST', '/wills/{will_id}/transfers/execute', 'testator',
+     {'json': {}}),
+    ('get_transfer_form_data',  'GET',  '/api/transfer-form/{asset_id}', 'testator', {}),
+    ('upload_document',         'GET',  '/documents/upload/will/{will_id}', 'testator', {}),
+    ('upload_document',         'POST', '/documents/upload/will/{will_id}', 'testator',
+     {'data': {'title': 'Signed copy', 'file_type': 'PDF'}}),
+    ('will_summary_report',     'GET',  '/reports/will-summary/{will_id}', 'testator', {}),
+    ('set_primary_executor',    'POST', '/executors/{executor_id}/set-primary', 'testator', {}),
+    ('delete_will',             'POST', '/wills/{will_id}/delete', 'testator',
+     {'data': {'confirm_text': 'DELETE'}}),
+    ('check_weekend_status',    'GET',  '/api/weekend-check', 'testator', {}),
+    ('api_list_wills',          'GET',  '/api/wills', 'testator', {}),
+    ('api_list_transfers',      'GET',  '/api/transfers', 'testator', {}),
+    ('api_list_beneficiaries',  'GET',  '/api/beneficiaries', 'testator', {}),
+    ('get_will_stats',          'GET',  '/api/will/{will_id}/stats', 'testator', {}),
+    ('will_allocations',        'GET',  '/api/wills/{will_id}/allocations', 'testator', {}),
+    ('will_allocations',        'POST', '/api/wills/{will_id}/allocations', 'testator',
+     {'json': {'allocations': [{'asset_id': '{asset_id}', 'beneficiary_id': '{beneficiary_id}',
+                                'share_percent': 50}]}}),
+    ('get_beneficiary_assets',  'GET',  '/api/beneficiary/{beneficiary_id}/assets', 'testator', {}),
+    ('view_my_assets',          'GET',  '/assets/my', 'testator', {}),
+    ('system_statistics',       'GET',  '/admin/system-stats', 'admin', {}),
+    ('test_weekend_transfer',   'GET',  '/admin/test-weekend-transfer', 'admin', {}),
+    ('view_audit_logs',         'GET',  '/audit/logs', 'admin', {}),
+    ('export_audit_logs',       'GET',  '/audit/logs/export?format=ndjson', 'admin', {}),
+    ('manage_users',            'GET',  '/admin/users', 'admin', {}),
+    ('pool_statistics',         'GET',  '/api/admin/pool-stats', 'admin', {}),
+    ('statement_statistics',    'GET',  '/api/admin/statement-stats', 'admin', {}),
+    ('request_metrics_export',  'GET',  '/admin/metrics', 'admin', {}),
+    ('slow_query_log',          'GET',  '/admin/slow-queries', 'admin', {}),
+    ('slow_query_log',          'POST', '/admin/slow-queries', 'admin', {}),
+]
+
+# Pages that fail to render in the tree, and how; their views still run their statements
+BROKEN_PAGES = {
+    ('GET', 'assign_asset'): ValueError,        # links back to view_will without a will_id
+    ('GET', 'upload_document'): TemplateError,  # documents/upload.html is missing
+    ('GET', 'view_my_assets'): TemplateError,   # beneficiaries/my_assets.html is missing
+}
+
+
+class BusinessDay(datetime):
+    """``datetime`` whose ``now()`` is a Wednesday that is not a holiday."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 10, 14, 10, 30)
+
+
+@pytest.fixture(scope='module')
+def standin():
+    return StandIn(StandInData(users=12, audit_per_user=5))
+
+
+@pytest.fixture(scope='module')
+def app(standin):
+    saved = os.environ.get('FLASK_ENV'), db.pooled, db.pool_factory
+    os.environ['FLASK_ENV'] = 'testing'
+    db.pooled = True
+    db.pool_factory = standin.pool_factory(latency=0)
+    import app as app_module
+    app_module.datetime = BusinessDay
+    app = app_module.create_app()
+    app.used = {}
+
+    # Runs before the audit flush, like the budget check itself
+    @app.teardown_request
+    def capture(exc):
+        stats = request_metrics.current()
+        if stats is not None and request.endpoint:
+            app.used[request.endpoint] = (stats.statements, stats.rows)
+
+    yield app
+    app_module.datetime = datetime
+    db.close()
+    env, db.pooled, db.pool_factory = saved
+    if env is None:
+        os.environ.pop('FLASK_ENV', None)
+    else:
+        os.environ['FLASK_ENV'] = env
+
+
+@pytest.fixture(scope='module')
+def ids(standin):
+    """Signed-in users and the records their requests touch."""
+    data = standin.data
+    # A testator who is also an executor and a beneficiary, with a Draft will
+    testator = next(user for user in data.users[1:]
+                    if data.roles_of(user[0])[1:] == (1, 1, 1)
+                    and any(will[4] == 'Draft' for will in data.wills_by_user[user[0]]))
+    will = next(will for will in data.wills_by_user[testator[0]] if will[4] == 'Draft')
+    asset = data.assets_by_will[will[0]][0]
+    return {
+        'users': {'admin': data.users[0], 'testator': testator},
+        'email': testator[2],
+        'will_id': will[0],
+        'asset_id': asset[0],
+        'beneficiary_id': data.allocations_by_asset[asset[0]][0][1],
+        'executor_id': data.executors_by_will[will[0]][0][0],
+    }
+
+
+def _fill(value, ids):
+    """``value`` with its ``{name}`` placeholders taken from ``ids``."""
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    if isinstance(value, tuple) and isinstance(value[0], io.BytesIO):
+        return (io.BytesIO(value[0].getvalue()), value[1])
+    return value
+
+
+def test_cases_cover_every_endpoint(app):
+    endpoints = {endpoint for endpoint in app.view_functions if endpoint != 'static'}
+    assert endpoints == {case[0] for case in CASES}
+
+
+@pytest.mark.parametrize('endpoint, method, path, who, kwargs', CASES,
+                         ids=[f'{case[1]} {case[0]}' for case in CASES])
+def test_endpoint_stays_within_budget(app, standin, ids, endpoint, method, path, who, kwargs):
+    client = app.test_client()
+    if who is not None:
+        sign_in(client, standin.data, ids['users'][who])
+    kwargs = _fill(kwargs, ids)
+    standin.unanswered.clear()
+    app.used.pop(endpoint, None)
+    clear_caches()
+
+    broken = BROKEN_PAGES.get((method, endpoint))
+    if broken is not None:
+        with pytest.raises(broken):
+            client.open(_fill(path, ids), method=method, **kwargs)
+    else:
+        response = client.open(_fill(path, ids), method=method, **kwargs)
+        response.get_data()   # drain streamed bodies
+        assert response.status_code < 500, response.get_data(as_text=True)[:500]
+
+    assert not standin.unanswered
+    statements, rows = app.used[endpoint]
+    budget, row_budget = app.view_functions[endpoint].query_budget
+    assert statements <= budget
+    if row_budget is not None:
+        assert rows <= row_budget
+
+
+def test_warm_role_version_costs_no_statement(app, standin, ids):
+    client = app.test_client()
+    sign_in(client, standin.data, ids['users']['admin'])
+    clear_caches()
+    client.get('/api/admin/pool-stats')
+    assert app.used['pool_statistics'][0] == 1   # the role version
+    client.get('/api/admin/pool-stats')
+    assert app.used['pool_statistics'][0] == 0